@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Sharded atlas build for the Zork I-III Cartographic Atlas.
+
+Each game (Z1, Z2, Z3) is a shard declared in atlas.json with its own:
+
+- schema (title pattern, ID space and exit link prefix are derived from it)
+- input directory of room Markdown
+- output directory of normalized JSON
+- compile cache under <cache_dir>/<game>/, backed by the shared compile store
+  (scripts/atlas_store.py) that every branch and worktree reads from
+- Internal ID registry (registry/<game>.json unless the shard sets "registry")
+
+Shards compile in parallel and never share state, so adding a Zork II shard does not
+slow down or invalidate Zork I builds. After compiling, a small cross-shard manifest
+(build/atlas_manifest.json by default) records each shard's schema hash, room count and
+an output digest.
+
+With --near-duplicates, each built shard is also run through the MinHash/LSH
+near-duplicate report (scripts/atlas_near_duplicates.py).
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import atlas_metrics as metrics
+from normalize_rooms_schema_authoritative import (
+    SchemaError,
+    compile_rooms,
+    load_schema,
+    normalizer_fingerprint,
+    schema_sha256,
+)
+
+DEFAULT_CONFIG_PATH = Path("atlas.json")
+# The layout from before atlas.json existed: a single Zork I shard. Used when the default
+# atlas.json is missing (in the working tree, or at an old revision for atlas_diff.py).
+DEFAULT_CONFIG: Dict[str, Any] = {
+    "shards": [{"game": "Z1", "schema": "schema/room_schema_v1.0.json", "in": "rooms", "out": "normalized"}],
+}
+
+
+class ConfigError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class Shard:
+    game: str
+    schema: Path
+    in_dir: Path
+    out_dir: Path
+    cache_dir: Path
+    registry: Path
+
+
+@dataclass(frozen=True)
+class AtlasConfig:
+    shards: List[Shard]
+    manifest: Path
+
+
+def load_config(config_path: Path = DEFAULT_CONFIG_PATH) -> AtlasConfig:
+    if not config_path.exists():
+        if config_path == DEFAULT_CONFIG_PATH:
+            return parse_config(DEFAULT_CONFIG, config_path.resolve().parent, "the default config (no atlas.json)")
+        raise ConfigError(f"Atlas config not found: {config_path}")
+    try:
+        data = json.loads(config_path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError as e:
+        raise ConfigError(f"Atlas config JSON is invalid ({config_path}): {e}") from e
+    return parse_config(data, config_path.resolve().parent, config_path)
+
+
+def parse_config(data: Any, root: Path, source: object) -> AtlasConfig:
+    """Build the config from parsed atlas.json data; paths resolve against root, source names it in errors."""
+    if not isinstance(data, dict):
+        raise ConfigError(f"Atlas config must be a JSON object: {source}")
+    cache_root = root / data.get("cache_dir", ".atlas-cache")
+    manifest = root / data.get("manifest", "build/atlas_manifest.json")
+
+    shards: List[Shard] = []
+    seen: set = set()
+    for entry in data.get("shards", []):
+        try:
+            game = entry["game"]
+            shard = Shard(
+                game=game,
+                schema=root / entry["schema"],
+                in_dir=root / entry["in"],
+                out_dir=root / entry["out"],
+                cache_dir=cache_root / game,
+                registry=root / entry.get("registry", f"registry/{game}.json"),
+            )
+        except (KeyError, TypeError) as e:
+            raise ConfigError(f"Shard entry must define game, schema, in and out: {entry!r}") from e
+        if game in seen:
+            raise ConfigError(f"Duplicate shard for game {game!r}")
+        seen.add(game)
+        shards.append(shard)
+
+    if not shards:
+        raise ConfigError(f"No shards declared in {source}")
+    return AtlasConfig(shards=shards, manifest=manifest)
+
+
+def build_shard(shard: Shard, fail_fast: bool = False, shared_cache: bool = True) -> Dict[str, Any]:
+    """Compile one shard; returns its manifest entry (errors included). Runs in a worker process."""
+    entry: Dict[str, Any] = {"game": shard.game, "errors": []}
+    if not shard.in_dir.is_dir():
+        entry["skipped"] = f"input directory not found: {shard.in_dir}"
+        return entry
+
+    try:
+        schema = load_schema(shard.schema)
+        digest = schema_sha256(shard.schema)
+    except SchemaError as e:
+        entry["errors"].append(f"SCHEMA ERROR: {e}")
+        return entry
+
+    if schema.game != shard.game:
+        entry["errors"].append(
+            f"Schema {shard.schema.name} declares game {schema.game!r}, but the shard is {shard.game!r}"
+        )
+        return entry
+
+    store = None
+    if shared_cache:
+        from atlas_store import open_store
+
+        store = open_store(normalizer_fingerprint())
+
+    result = compile_rooms(
+        shard.in_dir,
+        shard.out_dir,
+        schema=schema,
+        schema_digest=digest,
+        fail_fast=fail_fast,
+        cache_dir=shard.cache_dir,
+        store=store,
+    )
+
+    # Registry problems (duplicate or reused IDs) are reported, not fatal: the compiled
+    # output is still correct, and `atlas_registry.py check` is the enforcing gate. After
+    # a failed compile the output is incomplete, so the registry is left alone (it would
+    # otherwise retire the IDs of every room that failed to compile).
+    id_problems: List[str] = []
+    if not result.errors:
+        from atlas_registry import update_shard_registry
+
+        try:
+            _, id_problems = update_shard_registry(shard)
+        except ConfigError as e:
+            id_problems = [str(e)]
+
+    outputs_digest = hashlib.sha256()
+    for name in sorted(result.outputs):
+        outputs_digest.update(f"{name}\0{result.outputs[name]}\n".encode("utf-8"))
+
+    entry.update(
+        {
+            "schema_sha256": digest,
+            "rooms": result.count_ok,
+            "cached": result.count_cached,
+            "shared": result.count_shared,
+            "written": result.count_written,
+            "outputs_sha256": outputs_digest.hexdigest(),
+            "errors": result.errors,
+            "warnings": [f"registry: {msg}" for msg in id_problems],
+        }
+    )
+    return entry
+
+
+def write_manifest(config: AtlasConfig, entries: List[Dict[str, Any]], root: Path) -> None:
+    """Merge freshly built shard entries into the manifest; entries for shards not built this run are kept."""
+    try:
+        existing = json.loads(config.manifest.read_text(encoding="utf-8")).get("shards", [])
+    except (OSError, ValueError, AttributeError):
+        existing = []
+    by_game = {e["game"]: e for e in existing if isinstance(e, dict) and "game" in e}
+
+    for shard, entry in zip(config.shards, entries):
+        if "schema_sha256" not in entry:
+            continue
+        by_game[shard.game] = {
+            "game": shard.game,
+            "schema": shard.schema.relative_to(root).as_posix(),
+            "schema_sha256": entry["schema_sha256"],
+            "in": shard.in_dir.relative_to(root).as_posix(),
+            "out": shard.out_dir.relative_to(root).as_posix(),
+            "rooms": entry["rooms"],
+            "outputs_sha256": entry["outputs_sha256"],
+        }
+
+    shards_out = [by_game[g] for g in sorted(by_game)]
+    config.manifest.parent.mkdir(parents=True, exist_ok=True)
+    config.manifest.write_text(json.dumps({"shards": shards_out}, indent=2) + "\n", encoding="utf-8")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Compile every atlas shard (Z1/Z2/Z3) in parallel.")
+    ap.add_argument("--config", type=Path, default=DEFAULT_CONFIG_PATH, help="Atlas config (default: atlas.json)")
+    ap.add_argument("--game", action="append", help="Only build the given game shard (repeatable)")
+    ap.add_argument("--jobs", type=int, default=None, help="Worker processes (default: one per shard)")
+    ap.add_argument("--fail-fast", action="store_true", help="Stop each shard on its first error")
+    ap.add_argument(
+        "--no-shared-cache",
+        action="store_true",
+        help="Do not use the shared compile store ($XDG_CACHE_HOME/zork-atlas)",
+    )
+    ap.add_argument(
+        "--near-duplicates",
+        action="store_true",
+        help="Report near-duplicate room descriptions per shard after compiling",
+    )
+    args = ap.parse_args(argv)
+
+    try:
+        config = load_config(args.config)
+    except ConfigError as e:
+        print(f"[atlas_build] CONFIG ERROR: {e}", file=sys.stderr)
+        return 2
+
+    if args.game:
+        unknown = sorted(set(args.game) - {s.game for s in config.shards})
+        if unknown:
+            print(f"[atlas_build] Unknown shard(s): {unknown}", file=sys.stderr)
+            return 2
+        config = AtlasConfig(
+            shards=[s for s in config.shards if s.game in args.game],
+            manifest=config.manifest,
+        )
+
+    if len(config.shards) == 1:
+        entries = [build_shard(config.shards[0], args.fail_fast, not args.no_shared_cache)]
+    else:
+        jobs = args.jobs or len(config.shards)
+        n = len(config.shards)
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            entries = list(pool.map(build_shard, config.shards, [args.fail_fast] * n, [not args.no_shared_cache] * n))
+
+    built = [e for e in entries if "rooms" in e]
+    cached = sum(e["cached"] + e["shared"] for e in built)
+    rooms = sum(e["rooms"] for e in built)
+    metrics.lap("compile")
+    metrics.count(
+        mode="build",
+        shards=len(entries),
+        files=rooms,
+        cache_hits=cached,
+        cache_misses=rooms - cached,
+        written=sum(e["written"] for e in built),
+    )
+
+    failed = False
+    for entry in entries:
+        game = entry["game"]
+        if entry.get("skipped"):
+            print(f"[atlas_build] {game}: skipped ({entry['skipped']})")
+            continue
+        for msg in entry["errors"]:
+            print(f"[atlas_build] {game}: {msg}", file=sys.stderr)
+        if entry["errors"]:
+            failed = True
+            continue
+        for msg in entry.get("warnings", ()):
+            print(f"[atlas_build] {game}: WARNING: {msg}", file=sys.stderr)
+        print(
+            f"[atlas_build] {game}: OK {entry['rooms']} room(s) "
+            f"({entry['cached']} cached, {entry['shared']} shared, {entry['written']} written)"
+        )
+
+    if failed:
+        return 1
+
+    write_manifest(config, entries, args.config.resolve().parent)
+    print(f"[atlas_build] Manifest: {config.manifest}")
+    metrics.lap("manifest")
+
+    if args.near_duplicates:
+        from atlas_near_duplicates import shard_report
+
+        for shard, entry in zip(config.shards, entries):
+            if not entry.get("skipped"):
+                lines, _ = shard_report(shard)
+                print("\n".join(lines))
+        metrics.lap("near-duplicates")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(metrics.timed(main, "build"))
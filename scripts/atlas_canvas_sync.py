@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Incremental sync of the Obsidian world canvas with the compiled atlas.
+
+canvas/Zork - World.canvas is laid out by hand, so it is never regenerated. Instead the
+sync diffs it against the compiled rooms (normalized/*.json of every shard) and the
+exit graph, and patches only what differs:
+
+- room file nodes: duplicates of the same room file are merged into the first one,
+  nodes for rooms that no longer exist are removed, missing rooms are added next to
+  their already-placed exit neighbours (offset in the exit's direction, snapped to the
+  nearest free cell of a spatial grid)
+- exit edges: one edge per (room, direction, target), labelled with the direction;
+  edges for exits that no longer exist are removed
+
+Existing node ids, coordinates and key order are kept; new ids are derived from the
+room file / exit so reruns are stable. Nodes the sync does not manage (text, groups,
+other files) and unlabelled hand-drawn edges are left alone. Output keeps Obsidian's
+layout (tab indent, one node per line, no trailing newline) so git diffs stay minimal.
+
+    python scripts/atlas_canvas_sync.py [--dry-run | --check]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sys
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from atlas_build import DEFAULT_CONFIG_PATH, AtlasConfig, ConfigError, load_config
+from atlas_model import Direction, Room
+
+DEFAULT_CANVAS_PATH = Path("canvas/Zork - World.canvas")
+NODE_SIZE = 400
+GRID_STEP = NODE_SIZE + 100
+
+DIRECTION_VECTORS: Dict[Direction, Tuple[int, int]] = {
+    Direction.N: (0, -1),
+    Direction.S: (0, 1),
+    Direction.E: (1, 0),
+    Direction.W: (-1, 0),
+    Direction.NE: (1, -1),
+    Direction.NW: (-1, -1),
+    Direction.SE: (1, 1),
+    Direction.SW: (-1, 1),
+    Direction.U: (0, -1),
+    Direction.D: (0, 1),
+}
+SIDES = {(0, -1): ("top", "bottom"), (0, 1): ("bottom", "top"), (-1, 0): ("left", "right")}
+DIRECTION_LABELS = {d.value for d in Direction}
+
+Edge = Tuple[str, str, str]  # (from file, direction, to file)
+
+
+def _stable_id(*parts: str) -> str:
+    """16 hex chars, the same shape as Obsidian's own ids."""
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def _sides(direction: str) -> Tuple[str, str]:
+    dx, dy = DIRECTION_VECTORS.get(Direction(direction), (1, 0))
+    return SIDES.get((0, dy) if dy else (dx, 0), ("right", "left"))
+
+
+# ----------------------------
+# Canvas I/O
+# ----------------------------
+
+def render_canvas(canvas: Dict[str, Any]) -> str:
+    """Serialize the way Obsidian does: tab indent, one compact object per line, no trailing newline."""
+    parts = []
+    for key, value in canvas.items():
+        if isinstance(value, list):
+            if value:
+                items = ",\n".join("\t\t" + json.dumps(v, ensure_ascii=False, separators=(",", ":")) for v in value)
+                parts.append(f'\t"{key}":[\n{items}\n\t]')
+            else:
+                parts.append(f'\t"{key}":[]')
+        else:
+            parts.append(f"\t{json.dumps(key)}:{json.dumps(value, ensure_ascii=False, separators=(',', ':'))}")
+    return "{\n" + ",\n".join(parts) + "\n}"
+
+
+# ----------------------------
+# Spatial grid
+# ----------------------------
+
+class OccupancyGrid:
+    """Cells of GRID_STEP x GRID_STEP that any node rectangle touches are occupied."""
+
+    def __init__(self, nodes: Iterable[Dict[str, Any]]) -> None:
+        self.cells: Set[Tuple[int, int]] = set()
+        for n in nodes:
+            self.occupy(n["x"], n["y"], n.get("width", NODE_SIZE), n.get("height", NODE_SIZE))
+
+    def occupy(self, x: int, y: int, w: int, h: int) -> None:
+        for cx in range(x // GRID_STEP, (x + w - 1) // GRID_STEP + 1):
+            for cy in range(y // GRID_STEP, (y + h - 1) // GRID_STEP + 1):
+                self.cells.add((cx, cy))
+
+    def nearest_free(self, x: float, y: float) -> Tuple[int, int]:
+        """Top-left corner of the free cell closest to (x, y), searched ring by ring."""
+        ox, oy = round(x / GRID_STEP), round(y / GRID_STEP)
+        if (ox, oy) not in self.cells:
+            self.cells.add((ox, oy))
+            return ox * GRID_STEP, oy * GRID_STEP
+        radius = 1
+        while True:
+            ring = [(ox + d, oy - radius) for d in range(-radius, radius + 1)]
+            ring += [(ox + d, oy + radius) for d in range(-radius, radius + 1)]
+            ring += [(ox - radius, oy + d) for d in range(-radius + 1, radius)]
+            ring += [(ox + radius, oy + d) for d in range(-radius + 1, radius)]
+            free = [c for c in ring if c not in self.cells]
+            if free:
+                cell = min(free, key=lambda c: ((c[0] - ox) ** 2 + (c[1] - oy) ** 2, c))
+                self.cells.add(cell)
+                return cell[0] * GRID_STEP, cell[1] * GRID_STEP
+            radius += 1
+
+
+# ----------------------------
+# Sync
+# ----------------------------
+
+def load_room_files(config_path: Path) -> Tuple[List[str], Set[Edge]]:
+    """Vault-relative room file paths and exit edges of every room compiled under config_path."""
+    config = load_config(config_path)
+    return room_graph(config, config_path.resolve().parent, _compiled_rooms(config))
+
+
+def _compiled_rooms(config: AtlasConfig) -> List[Tuple[str, Dict[str, Any]]]:
+    return [
+        (shard.game, json.loads(p.read_text(encoding="utf-8")))
+        for shard in config.shards
+        for p in sorted(shard.out_dir.glob("*.json"))
+    ]
+
+
+def room_graph(config: AtlasConfig, root: Path, rooms: Iterable[Tuple[str, Dict[str, Any]]]) -> Tuple[List[str], Set[Edge]]:
+    """
+    Room file paths and (from, direction, to) exit edges for already loaded (game, room
+    JSON) pairs. A room's path is where its Markdown actually is under the shard's input
+    directory relative to root (rooms may sit in subdirectories; the file stem is the
+    room title).
+    """
+    shards = {shard.game: shard for shard in config.shards}
+    md_paths: Dict[str, Dict[str, str]] = {}
+    files: List[str] = []
+    title_to_file: Dict[str, str] = {}
+    parsed: List[Room] = []
+    for game, data in rooms:
+        shard = shards[game]
+        if game not in md_paths:
+            md_paths[game] = {md.stem: md.relative_to(shard.in_dir).as_posix() for md in sorted(shard.in_dir.glob("**/*.md"))}
+        room = Room.from_dict(data)
+        f = f"{shard.in_dir.relative_to(root).as_posix()}/{md_paths[game].get(room.title, room.title + '.md')}"
+        files.append(f)
+        title_to_file[room.title] = f
+        parsed.append(room)
+
+    edges: Set[Edge] = set()
+    for room in parsed:
+        src = title_to_file[room.title]
+        for e in room.exits:
+            dst = title_to_file.get(e.target)
+            if dst is not None and dst != src:
+                edges.add((src, e.direction.value, dst))
+    return files, edges
+
+
+def room_prefixes(config: AtlasConfig, root: Path) -> Tuple[str, ...]:
+    """Path prefixes of the room file nodes the sync manages (one per shard input directory)."""
+    return tuple(shard.in_dir.relative_to(root).as_posix() + "/" for shard in config.shards)
+
+
+def sync_canvas(
+    canvas: Dict[str, Any],
+    room_files: List[str],
+    exit_edges: Set[Edge],
+    managed_prefixes: Tuple[str, ...],
+) -> Dict[str, List[str]]:
+    """Patch canvas in place; returns a change summary."""
+    summary: Dict[str, List[str]] = {
+        "duplicate nodes removed": [],
+        "stale nodes removed": [],
+        "nodes added": [],
+        "edges removed": [],
+        "edges added": [],
+    }
+    nodes: List[Dict[str, Any]] = canvas.setdefault("nodes", [])
+    edges: List[Dict[str, Any]] = canvas.setdefault("edges", [])
+    wanted = set(room_files)
+
+    def managed(node: Dict[str, Any]) -> bool:
+        f = node.get("file", "")
+        return node.get("type") == "file" and f.endswith(".md") and f.startswith(managed_prefixes)
+
+    # 1. Nodes: merge duplicates into the first occurrence, drop stale rooms.
+    file_to_id: Dict[str, str] = {}
+    remap: Dict[str, Optional[str]] = {}
+    kept: List[Dict[str, Any]] = []
+    for node in nodes:
+        if not managed(node):
+            kept.append(node)
+            continue
+        f = node["file"]
+        if f not in wanted:
+            remap[node["id"]] = None
+            summary["stale nodes removed"].append(f)
+        elif f in file_to_id:
+            remap[node["id"]] = file_to_id[f]
+            summary["duplicate nodes removed"].append(f"{f} ({node['id']})")
+        else:
+            file_to_id[f] = node["id"]
+            kept.append(node)
+    nodes[:] = kept
+
+    # 2. Missing rooms: place next to placed neighbours, breadth-first outwards.
+    by_id = {n["id"]: n for n in nodes}
+    grid = OccupancyGrid(n for n in nodes if "x" in n and "y" in n)
+    neighbours: Dict[str, List[Tuple[str, int, int]]] = {}  # file -> (neighbour, dx, dy) offset from neighbour
+    for src, direction, dst in sorted(exit_edges):  # sorted: placement must not depend on hash order
+        dx, dy = DIRECTION_VECTORS.get(Direction(direction), (1, 0))
+        neighbours.setdefault(dst, []).append((src, dx, dy))
+        neighbours.setdefault(src, []).append((dst, -dx, -dy))
+
+    missing = [f for f in room_files if f not in file_to_id]
+    pending = dict.fromkeys(missing)  # insertion-ordered set: the next disconnected room is O(1)
+    queue = deque(f for f in missing if any(n in file_to_id for n, _, _ in neighbours.get(f, ())))
+
+    # Layout bounds, kept up to date as rooms are placed, for rooms with no placed neighbour.
+    placed = [n for n in nodes if "x" in n and "y" in n]
+    left = min((n["x"] for n in placed), default=0)
+    bottom = max((n["y"] + n.get("height", NODE_SIZE) for n in placed), default=0)
+
+    def place(f: str, x: float, y: float) -> None:
+        nonlocal left, bottom
+        px, py = grid.nearest_free(x, y)
+        node = {"id": _stable_id("node", f), "type": "file", "file": f, "x": px, "y": py,
+                "width": NODE_SIZE, "height": NODE_SIZE}
+        nodes.append(node)
+        by_id[node["id"]] = node
+        file_to_id[f] = node["id"]
+        left, bottom = min(left, px), max(bottom, py + NODE_SIZE)
+        del pending[f]
+        summary["nodes added"].append(f)
+        queue.extend(n for n, _, _ in neighbours.get(f, ()) if n in pending)
+
+    while pending:
+        while queue:
+            f = queue.popleft()
+            if f not in pending:
+                continue
+            anchors = [
+                (by_id[file_to_id[n]], dx, dy) for n, dx, dy in neighbours.get(f, ()) if n in file_to_id
+            ]
+            x = sum(a["x"] + dx * GRID_STEP for a, dx, _ in anchors) / len(anchors)
+            y = sum(a["y"] + dy * GRID_STEP for a, _, dy in anchors) / len(anchors)
+            place(f, x, y)
+        if pending:
+            # Disconnected from everything placed so far: start below the current layout.
+            place(next(iter(pending)), left, bottom + GRID_STEP)
+
+    # 3. Edges: keep hand-drawn ones, drop edges of removed nodes, reconcile exit edges.
+    id_to_file = {v: k for k, v in file_to_id.items()}
+    want = {(file_to_id[s], d, file_to_id[t]): (s, d, t) for s, d, t in exit_edges}
+    have: Set[Tuple[str, str, str]] = set()
+    kept_edges: List[Dict[str, Any]] = []
+    for edge in edges:
+        src, dst = edge.get("fromNode"), edge.get("toNode")
+        if src in remap or dst in remap:
+            src, dst = remap.get(src, src), remap.get(dst, dst)
+            if src is None or dst is None:
+                summary["edges removed"].append(f"{edge.get('id')} (node removed)")
+                continue
+            edge = {**edge, "fromNode": src, "toNode": dst}
+        label = edge.get("label")
+        if src in id_to_file and dst in id_to_file and label in DIRECTION_LABELS:
+            key = (src, label, dst)
+            if key not in want or key in have:
+                summary["edges removed"].append(f"{id_to_file[src]} {label} → {id_to_file[dst]}")
+                continue
+            have.add(key)
+        kept_edges.append(edge)
+
+    for key in sorted(want.keys() - have, key=lambda k: want[k]):
+        s, d, t = want[key]
+        from_side, to_side = _sides(d)
+        kept_edges.append({"id": _stable_id("edge", s, d, t), "fromNode": key[0], "fromSide": from_side,
+                           "toNode": key[2], "toSide": to_side, "label": d})
+        summary["edges added"].append(f"{s} {d} → {t}")
+    edges[:] = kept_edges
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Patch the Obsidian world canvas to match the compiled atlas.")
+    ap.add_argument("--config", type=Path, default=DEFAULT_CONFIG_PATH, help="Atlas config (default: atlas.json)")
+    ap.add_argument("--canvas", type=Path, default=DEFAULT_CANVAS_PATH, help=f"Canvas file (default: {DEFAULT_CANVAS_PATH})")
+    mode = ap.add_mutually_exclusive_group()
+    mode.add_argument("--dry-run", action="store_true", help="Print the changes without writing")
+    mode.add_argument("--check", action="store_true", help="Exit 1 if the canvas is out of sync")
+    ap.add_argument("-v", "--verbose", action="store_true", help="List every change, not just counts")
+    args = ap.parse_args(argv)
+
+    try:
+        config = load_config(args.config)
+    except ConfigError as e:
+        print(f"[canvas] CONFIG ERROR: {e}", file=sys.stderr)
+        return 2
+    root = args.config.resolve().parent
+    room_files, exit_edges = room_graph(config, root, _compiled_rooms(config))
+    prefixes = room_prefixes(config, root)
+
+    original = args.canvas.read_text(encoding="utf-8") if args.canvas.exists() else ""
+    canvas = json.loads(original) if original.strip() else {"nodes": [], "edges": []}
+    summary = sync_canvas(canvas, room_files, exit_edges, prefixes)
+    rendered = render_canvas(canvas)
+
+    for what, items in summary.items():
+        if items:
+            print(f"[canvas] {what}: {len(items)}")
+            if args.verbose or args.dry_run:
+                for item in items:
+                    print(f"  {item}")
+
+    if rendered == original:
+        print("[canvas] Up to date.")
+        return 0
+    if args.check:
+        print(f"[canvas] {args.canvas} is out of sync; run scripts/atlas_canvas_sync.py.", file=sys.stderr)
+        return 1
+    if args.dry_run:
+        return 0
+
+    tmp = args.canvas.with_suffix(".canvas.tmp")
+    tmp.write_text(rendered, encoding="utf-8")
+    tmp.replace(args.canvas)
+    print(f"[canvas] Wrote {args.canvas}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Optional long-lived atlas daemon for editors and git hooks.
+
+Keeps the parsed schema, the JSON Schema validator, every parsed room and the exit
+graph in memory and serves compile / validate / query requests over a Unix domain
+socket, so repeated hook and editor runs skip schema loading, the jsonschema import
+and reparsing. A parsed room is reused only while the sha256 of its Markdown, the
+sha256 of the schema and the normalizer fingerprint are all unchanged; a validation
+verdict only while the sha256 of the JSON file, the schema and the fingerprint are.
+Output files the daemon wrote itself are validated from the parsed room, without
+decoding the JSON again.
+
+The daemon only compiles inside the directory it serves (--root, default: the current
+directory), and refuses requests from a client whose normalizer code differs from the
+code it loaded; refused requests are answered with "refused": true and the client
+compiles in-process.
+
+Protocol: one JSON object per line in each direction.
+
+    {"op": "ping"}
+    {"op": "compile", "schema": ..., "in": ..., "out": ..., "glob": "**/*.md", "fail_fast": false,
+     "fingerprint": <normalizer_fingerprint() of the client>}
+    {"op": "validate", "schema": ..., "out": ..., "files": [<name>.json, ...] (default: all),
+     "all_errors": false, "fingerprint": ...}
+        -> {"files": {<name>.json: [<sha256>, "ok" | <error>]}, "validated": n}
+    {"op": "query", "what": "room" | "exits" | "graph", "title": ...}
+    {"op": "shutdown"}
+
+Responses are {"ok": true, "result": ...} or {"ok": false, "error": "...", "refused": bool}.
+
+Usage:
+    python scripts/atlas_daemon.py serve [--root DIR]   # foreground; background it as you like
+    python scripts/atlas_daemon.py status
+    python scripts/atlas_daemon.py stop
+
+Clients (normalizer CLI and atlas_engine.py for compile, atlas_engine.py for validate,
+and so validate_rooms_json.py and the compile gate) call daemon_request(), which returns
+None when no daemon is listening so callers fall back to in-process work.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+SOCKET_ENV = "ATLAS_DAEMON_SOCKET"
+DEFAULT_SOCKET_PATH = Path(".atlas-cache/atlasd.sock")
+CLIENT_TIMEOUT_S = 60.0
+
+
+def default_socket_path() -> Path:
+    return Path(os.environ.get(SOCKET_ENV) or DEFAULT_SOCKET_PATH).resolve()
+
+
+# ----------------------------
+# Client
+# ----------------------------
+
+def daemon_request(payload: Dict[str, Any], socket_path: Optional[Path] = None) -> Optional[Dict[str, Any]]:
+    """
+    Send one request to the daemon. Returns the decoded response, or None if no daemon
+    is reachable (no socket file, stale socket, or no AF_UNIX on this platform) or its
+    reply is not a JSON object.
+    """
+    path = socket_path or default_socket_path()
+    if not hasattr(socket, "AF_UNIX") or not path.exists():
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CLIENT_TIMEOUT_S)
+            sock.connect(str(path))
+            sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as f:
+                line = f.readline()
+    except OSError:
+        return None
+    if not line:
+        return None
+    try:
+        response = json.loads(line)
+    except ValueError:
+        return None
+    return response if isinstance(response, dict) else None
+
+
+# ----------------------------
+# In-memory state
+# ----------------------------
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class Refused(Exception):
+    """A request the daemon will not serve; the client should do the work in-process."""
+
+
+RoomKey = Tuple[str, str, str]     # (schema sha256, normalizer fingerprint, md sha256)
+VerdictKey = Tuple[str, str, str]  # (schema sha256, normalizer fingerprint, JSON sha256)
+
+
+class AtlasState:
+    """Parsed schema, rooms and exit graph, shared across requests under one lock."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root.resolve()
+        self.lock = threading.Lock()
+        self.schemas: Dict[str, Tuple[str, Any]] = {}        # schema path -> (sha256, RoomSchema)
+        self.rooms: Dict[str, Tuple[RoomKey, Any]] = {}      # md path -> (key, atlas_model.Room)
+        self.outputs: Dict[str, Tuple[str, str]] = {}       # JSON path -> (its sha256, md path) as last written
+        self.validators: Dict[str, Any] = {}                 # schema sha256 -> (validator, best_match)
+        self.verdicts: Dict[Tuple[str, bool], Tuple[VerdictKey, str]] = {}  # (JSON path, all_errors) -> (key, verdict)
+
+    def schema(self, schema_path: Path):
+        from normalize_rooms_schema_authoritative import RoomSchema
+
+        data = schema_path.read_bytes()
+        digest = _sha256(data)
+        cached = self.schemas.get(str(schema_path))
+        if cached and cached[0] == digest:
+            return digest, cached[1]
+        room_schema = RoomSchema.from_json_schema(json.loads(data.decode("utf-8")))
+        if cached:
+            self.forget(schema_digest=cached[0])
+        self.schemas[str(schema_path)] = (digest, room_schema)
+        return digest, room_schema
+
+    def forget(self, *, schema_digest: str) -> None:
+        """Drop rooms, the validator and verdicts of a schema version that is no longer on disk."""
+        for path in [p for p, (key, _) in self.rooms.items() if key[0] == schema_digest]:
+            del self.rooms[path]
+        self.validators.pop(schema_digest, None)
+        for path in [p for p, (key, _) in self.verdicts.items() if key[0] == schema_digest]:
+            del self.verdicts[path]
+
+    def validator(self, schema_digest: str, schema_path: Path) -> Any:
+        cached = self.validators.get(schema_digest)
+        if cached is None:
+            try:
+                import jsonschema
+            except ImportError:
+                raise RuntimeError("Missing dependency: jsonschema (python -m pip install jsonschema)") from None
+            schema = json.loads(schema_path.read_bytes().decode("utf-8"))
+            cached = (jsonschema.validators.validator_for(schema)(schema), jsonschema.exceptions.best_match)
+            self.validators[schema_digest] = cached
+        return cached
+
+    def _check_fingerprint(self, req: Dict[str, Any]) -> str:
+        from normalize_rooms_schema_authoritative import normalizer_fingerprint
+
+        fingerprint = normalizer_fingerprint()
+        if req.get("fingerprint") != fingerprint:
+            raise Refused("the client's normalizer code differs from the daemon's (restart the daemon)")
+        return fingerprint
+
+    def _inside_root(self, name: str, value: Any) -> Path:
+        path = Path(str(value)).resolve()
+        if path != self.root and self.root not in path.parents:
+            raise Refused(f"{name} path {path} is outside the served root {self.root}")
+        return path
+
+    def compile(self, req: Dict[str, Any]) -> Dict[str, Any]:
+        from normalize_rooms_schema_authoritative import ParseError, parse_room_markdown, render_room_json
+
+        fingerprint = self._check_fingerprint(req)
+        in_dir = self._inside_root("in", req["in"])
+        out_dir = self._inside_root("out", req["out"])
+        schema_digest, schema = self.schema(self._inside_root("schema", req["schema"]))
+        out_dir.mkdir(parents=True, exist_ok=True)
+
+        result: Dict[str, Any] = {
+            "count_ok": 0,
+            "count_total": 0,
+            "count_cached": 0,
+            "count_written": 0,
+            "errors": [],
+        }
+        md_files = sorted(in_dir.glob(req.get("glob", "**/*.md")))
+        result["count_total"] = len(md_files)
+        seen = set()
+
+        for md in md_files:
+            key = str(md)
+            seen.add(key)
+            room_key = (schema_digest, fingerprint, _sha256(md.read_bytes()))
+            cached = self.rooms.get(key)
+            if cached and cached[0] == room_key:
+                room = cached[1]
+                result["count_cached"] += 1
+            else:
+                try:
+                    room, _ = parse_room_markdown(md, schema=schema)
+                except ParseError as e:
+                    self.rooms.pop(key, None)
+                    result["errors"].append(str(e))
+                    if req.get("fail_fast"):
+                        break
+                    continue
+                self.rooms[key] = (room_key, room)
+
+            out_path = out_dir / (md.stem + ".json")
+            data = render_room_json(room.to_dict()).encode("utf-8")
+            try:
+                unchanged = out_path.read_bytes() == data
+            except OSError:
+                unchanged = False
+            if not unchanged:
+                out_path.write_bytes(data)
+                result["count_written"] += 1
+            self.outputs[str(out_path)] = (_sha256(data), key)
+            result["count_ok"] += 1
+
+        # Forget rooms whose files vanished from this input directory.
+        for key in [k for k in self.rooms if Path(k).parent == in_dir and k not in seen]:
+            del self.rooms[key]
+
+        return result
+
+    def validate(self, req: Dict[str, Any]) -> Dict[str, Any]:
+        from atlas_engine import schema_verdict
+
+        fingerprint = self._check_fingerprint(req)
+        out_dir = self._inside_root("out", req["out"])
+        schema_path = self._inside_root("schema", req["schema"])
+        schema_digest, _ = self.schema(schema_path)
+        all_errors = bool(req.get("all_errors"))
+        names = req.get("files")
+        paths = [out_dir / n for n in names] if names is not None else sorted(out_dir.glob("*.json"))
+
+        files: Dict[str, List[str]] = {}
+        validated = 0
+        for path in paths:
+            path = self._inside_root("file", path)
+            try:
+                data = path.read_bytes()
+            except OSError:
+                continue  # vanished since the client listed it; the client validates it itself
+            digest = _sha256(data)
+            key = (schema_digest, fingerprint, digest)
+            cached = self.verdicts.get((str(path), all_errors))
+            if cached and cached[0] == key:
+                verdict = cached[1]
+            else:
+                validator, best_match = self.validator(schema_digest, schema_path)
+                instance = None
+                written = self.outputs.get(str(path))
+                if written and written[0] == digest and written[1] in self.rooms:
+                    room_key, room = self.rooms[written[1]]
+                    if room_key[:2] == (schema_digest, fingerprint):
+                        instance = room.to_dict()  # the bytes on disk are this room, rendered
+                verdict = schema_verdict(validator, best_match, data, all_errors=all_errors, instance=instance)
+                self.verdicts[(str(path), all_errors)] = (key, verdict)
+                validated += 1
+            files[path.name] = [digest, verdict]
+        return {"files": files, "validated": validated}
+
+    def exit_graph(self) -> Dict[str, List[Tuple[str, str]]]:
+        graph: Dict[str, List[Tuple[str, str]]] = {}
+        for _, room in self.rooms.values():
+            graph[room.title] = [(e.direction.value, e.target) for e in room.exits]
+        return graph
+
+    def query(self, req: Dict[str, Any]) -> Any:
+        what = req.get("what")
+        if what == "graph":
+            return self.exit_graph()
+        title = req.get("title")
+        for _, room in self.rooms.values():
+            if room.title == title:
+                if what == "room":
+                    return room.to_dict()
+                if what == "exits":
+                    return [str(e) for e in room.exits]
+                break
+        else:
+            raise KeyError(f"Unknown room (compile first?): {title!r}")
+        raise ValueError(f"Unknown query: {what!r}")
+
+
+# ----------------------------
+# Server
+# ----------------------------
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        line = self.rfile.readline()
+        if not line:
+            return
+        server: AtlasServer = self.server  # type: ignore[assignment]
+        try:
+            req = json.loads(line)
+            op = req.get("op")
+            with server.state.lock:
+                if op == "ping":
+                    result: Any = {"pid": os.getpid(), "rooms": len(server.state.rooms), "verdicts": len(server.state.verdicts)}
+                elif op == "compile":
+                    result = server.state.compile(req)
+                elif op == "validate":
+                    result = server.state.validate(req)
+                elif op == "query":
+                    result = server.state.query(req)
+                elif op == "shutdown":
+                    result = "bye"
+                    threading.Thread(target=server.shutdown, daemon=True).start()
+                else:
+                    raise ValueError(f"Unknown op: {op!r}")
+            response = {"ok": True, "result": result}
+        except Refused as e:
+            response = {"ok": False, "error": str(e), "refused": True}
+        except Exception as e:
+            response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+
+    class AtlasServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+
+        def __init__(self, path: Path, root: Path) -> None:
+            self.state = AtlasState(root)
+            super().__init__(str(path), _Handler)
+
+
+def serve(socket_path: Path, root: Path) -> int:
+    if not hasattr(socketserver, "ThreadingUnixStreamServer"):
+        print("[atlasd] ERROR: Unix domain sockets are not available on this platform.", file=sys.stderr)
+        return 2
+    if daemon_request({"op": "ping"}, socket_path) is not None:
+        print(f"[atlasd] Already running on {socket_path}", file=sys.stderr)
+        return 1
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    socket_path.unlink(missing_ok=True)  # stale socket from a crashed daemon
+
+    server = AtlasServer(socket_path, root)
+    print(f"[atlasd] Listening on {socket_path} (serving {server.state.root})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        socket_path.unlink(missing_ok=True)
+    print("[atlasd] Stopped.")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Atlas compile daemon (Unix domain socket).")
+    ap.add_argument("command", choices=["serve", "status", "stop"])
+    ap.add_argument("--socket", type=Path, default=None, help=f"Socket path (default: ${SOCKET_ENV} or {DEFAULT_SOCKET_PATH})")
+    ap.add_argument("--root", type=Path, default=Path("."), help="Only compile inside this directory (default: .)")
+    args = ap.parse_args(argv)
+
+    socket_path = args.socket.resolve() if args.socket else default_socket_path()
+
+    if args.command == "serve":
+        return serve(socket_path, args.root)
+
+    response = daemon_request({"op": "ping" if args.command == "status" else "shutdown"}, socket_path)
+    if response is None:
+        print(f"[atlasd] Not running ({socket_path})")
+        return 1
+    if args.command == "status":
+        print(f"[atlasd] Running on {socket_path}: {response['result']}")
+    else:
+        print("[atlasd] Shutdown requested.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Semantic atlas diff between two git revisions, read straight from git objects.
+
+    python scripts/atlas_diff.py REV1 [REV2]      # REV2 defaults to HEAD
+    python scripts/atlas_diff.py z1-atlas-v1.0 HEAD --json
+
+atlas.json is read at each revision (`git show REV:atlas.json`), so shards added,
+removed or moved between the two are diffed from where they lived at the time; a
+revision from before atlas.json (such as the v1.0 release) is read as the single Z1
+shard it was. For every shard output directory, `git ls-tree` lists the normalized
+JSON blobs at both revisions. Files whose blob id is identical are skipped without
+being read; the remaining blobs are streamed through one `git cat-file --batch`
+process. Cost is proportional to the number of changed rooms, not the atlas size.
+
+Reported per game:
+- rooms added / removed (a remove + add sharing an Internal ID is a rename, unless the
+  ID is on more than one removed or added room; those are left paired by path)
+- exits added, removed and redirected (same direction, different target)
+- objects and hazards added / removed, description changed
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from atlas_build import DEFAULT_CONFIG, DEFAULT_CONFIG_PATH, AtlasConfig, ConfigError, parse_config
+from atlas_git import CatFileBatch, GitError, git, ls_tree
+from atlas_model import Room
+
+LIST_SECTIONS = {"objects": "Objects present", "hazards": "Hazards/NPCs"}
+DESCRIPTION_SECTION = "Description (verbatim)"
+
+
+def _section(room: Room, name: str) -> Any:
+    return room.section(name) if name in room.order else None
+
+
+def _internal_id(room: Room) -> Optional[str]:
+    notes = _section(room, "Mapping notes")
+    return notes.get("Internal ID") if notes is not None else None
+
+
+def exit_changes(old: Room, new: Room) -> Dict[str, List[Any]]:
+    def by_direction(room: Room) -> Dict[str, set]:
+        out: Dict[str, set] = defaultdict(set)
+        for e in room.exits:
+            out[e.direction.value].add(e.target)
+        return out
+
+    before, after = by_direction(old), by_direction(new)
+    changes: Dict[str, List[Any]] = {"added": [], "removed": [], "redirected": []}
+    for direction in sorted(before.keys() | after.keys()):
+        gone = sorted(before.get(direction, set()) - after.get(direction, set()))
+        came = sorted(after.get(direction, set()) - before.get(direction, set()))
+        if len(gone) == 1 and len(came) == 1:
+            changes["redirected"].append([direction, gone[0], came[0]])
+            continue
+        changes["removed"].extend([direction, t] for t in gone)
+        changes["added"].extend([direction, t] for t in came)
+    return {k: v for k, v in changes.items() if v}
+
+
+def room_changes(old: Room, new: Room) -> Dict[str, Any]:
+    changes: Dict[str, Any] = {}
+    exits = exit_changes(old, new)
+    if exits:
+        changes["exits"] = exits
+    for key, section in LIST_SECTIONS.items():
+        before, after = _section(old, section) or [], _section(new, section) or []
+        added = [v for v in after if v not in before]
+        removed = [v for v in before if v not in after]
+        if added or removed:
+            changes[key] = {k: v for k, v in (("added", added), ("removed", removed)) if v}
+    if _section(old, DESCRIPTION_SECTION) != _section(new, DESCRIPTION_SECTION):
+        changes["description"] = "changed"
+    return changes
+
+
+def diff_directory(cat: CatFileBatch, old_blobs: Dict[str, str], new_blobs: Dict[str, str]) -> Tuple[Dict[str, Any], int]:
+    """Returns (semantic diff, number of blobs read)."""
+    reads = 0
+
+    def load(oid: str) -> Room:
+        nonlocal reads
+        data = cat.read(oid)
+        if data is None:
+            raise GitError(f"Missing blob {oid}")
+        reads += 1
+        return Room.from_dict(json.loads(data.decode("utf-8")))
+
+    changed = [p for p in old_blobs.keys() & new_blobs.keys() if old_blobs[p] != new_blobs[p]]
+    removed = {p: load(old_blobs[p]) for p in sorted(old_blobs.keys() - new_blobs.keys())}
+    added = {p: load(new_blobs[p]) for p in sorted(new_blobs.keys() - old_blobs.keys())}
+
+    result: Dict[str, Any] = {"added": [], "removed": [], "renamed": [], "changed": {}}
+
+    # Pair removals with additions by Internal ID: that is a rename. An ID carried by
+    # more than one removed or added room cannot say which is which, so those rooms
+    # keep their path pairing (reported as added and removed).
+    removed_ids = Counter(_internal_id(r) for r in removed.values())
+    added_ids = Counter(_internal_id(r) for r in added.values())
+    added_by_id = {_internal_id(r): p for p, r in added.items()}
+    for p, old in list(removed.items()):
+        room_id = _internal_id(old)
+        if not room_id or removed_ids[room_id] != 1 or added_ids[room_id] != 1:
+            continue
+        q = added_by_id[room_id]
+        new = added.pop(q)
+        del removed[p]
+        result["renamed"].append([old.title, new.title])
+        changes = room_changes(old, new)
+        if changes:
+            result["changed"][new.title] = changes
+
+    result["added"] = sorted(r.title for r in added.values())
+    result["removed"] = sorted(r.title for r in removed.values())
+
+    for p in sorted(changed):
+        old, new = load(old_blobs[p]), load(new_blobs[p])
+        changes = room_changes(old, new)
+        if changes:
+            result["changed"][new.title] = changes
+
+    return {k: v for k, v in result.items() if v}, reads
+
+
+def config_at(rev: str, config_path: Path, top: Path) -> AtlasConfig:
+    """
+    atlas.json as committed at rev (same repository-relative path as config_path), or
+    the default single-Z1 config for revisions from before atlas.json existed.
+    """
+    git("rev-parse", "--verify", f"{rev}^{{commit}}", cwd=top)  # GitError on a bad revision
+    spec = f"{rev}:{config_path.resolve().relative_to(top).as_posix()}"
+    try:
+        raw = git("show", spec, cwd=top)
+    except GitError:
+        return parse_config(DEFAULT_CONFIG, config_path.resolve().parent, f"the default config ({spec} does not exist)")
+    try:
+        data = json.loads(raw.decode("utf-8"))
+    except ValueError as e:
+        raise ConfigError(f"Atlas config JSON is invalid ({spec}): {e}") from e
+    return parse_config(data, config_path.resolve().parent, spec)
+
+
+def _out_dirs(config: AtlasConfig, top: Path) -> Dict[str, str]:
+    return {s.game: s.out_dir.resolve().relative_to(top).as_posix() for s in config.shards}
+
+
+def atlas_diff(config_path: Path, rev1: str, rev2: str) -> Tuple[Dict[str, Any], Dict[str, int]]:
+    root = config_path.resolve().parent
+    top = Path(git("rev-parse", "--show-toplevel", cwd=root).decode("utf-8").strip()).resolve()
+    old_dirs = _out_dirs(config_at(rev1, config_path, top), top)
+    new_dirs = _out_dirs(config_at(rev2, config_path, top), top)
+    report: Dict[str, Any] = {}
+    stats = {"files": 0, "unchanged": 0, "read": 0}
+    with CatFileBatch(cwd=top) as cat:
+        for game in [*new_dirs, *(g for g in old_dirs if g not in new_dirs)]:
+            old_blobs = ls_tree(rev1, old_dirs[game], cwd=top) if game in old_dirs else {}
+            new_blobs = ls_tree(rev2, new_dirs[game], cwd=top) if game in new_dirs else {}
+            if game in old_dirs and game in new_dirs and old_dirs[game] != new_dirs[game]:
+                # The shard moved: compare by path inside its output directory.
+                old_blobs = {p[len(old_dirs[game]) + 1:]: oid for p, oid in old_blobs.items()}
+                new_blobs = {p[len(new_dirs[game]) + 1:]: oid for p, oid in new_blobs.items()}
+            stats["files"] += len(old_blobs.keys() | new_blobs.keys())
+            stats["unchanged"] += sum(1 for p, oid in old_blobs.items() if new_blobs.get(p) == oid)
+            diff, reads = diff_directory(cat, old_blobs, new_blobs)
+            stats["read"] += reads
+            if diff:
+                report[game] = diff
+    return report, stats
+
+
+def render_text(report: Dict[str, Any]) -> List[str]:
+    lines: List[str] = []
+    for game, diff in report.items():
+        lines.append(f"{game}:")
+        for title in diff.get("added", []):
+            lines.append(f"  + room {title}")
+        for title in diff.get("removed", []):
+            lines.append(f"  - room {title}")
+        for old, new in diff.get("renamed", []):
+            lines.append(f"  ~ room {old} -> {new}")
+        for title, changes in diff.get("changed", {}).items():
+            lines.append(f"  * {title}")
+            exits = changes.get("exits", {})
+            for d, t in exits.get("added", []):
+                lines.append(f"      + exit {d} → [[{t}]]")
+            for d, t in exits.get("removed", []):
+                lines.append(f"      - exit {d} → [[{t}]]")
+            for d, a, b in exits.get("redirected", []):
+                lines.append(f"      ~ exit {d} → [[{a}]] now [[{b}]]")
+            for key in LIST_SECTIONS:
+                for v in changes.get(key, {}).get("added", []):
+                    lines.append(f"      + {key[:-1]} {v}")
+                for v in changes.get(key, {}).get("removed", []):
+                    lines.append(f"      - {key[:-1]} {v}")
+            if "description" in changes:
+                lines.append("      ~ description changed")
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Semantic diff of the compiled atlas between two git revisions.")
+    ap.add_argument("rev1")
+    ap.add_argument("rev2", nargs="?", default="HEAD")
+    ap.add_argument("--config", type=Path, default=DEFAULT_CONFIG_PATH, help="Atlas config (default: atlas.json)")
+    ap.add_argument("--json", action="store_true", help="Print the diff as JSON")
+    args = ap.parse_args(argv)
+
+    try:
+        report, stats = atlas_diff(args.config, args.rev1, args.rev2)
+    except (ConfigError, GitError, ValueError) as e:
+        print(f"[atlas diff] ERROR: {e}", file=sys.stderr)
+        return 2
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print("\n".join(render_text(report)) or "No semantic changes.")
+    print(
+        f"[atlas diff] {stats['files']} file(s), {stats['unchanged']} unchanged blob(s) skipped, {stats['read']} read",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
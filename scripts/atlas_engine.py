@@ -0,0 +1,498 @@
+#!/usr/bin/env python3
+"""
+The atlas compile-and-validate engine: one implementation behind every gate.
+
+Stages (any combination, run per shard of atlas.json in this order):
+
+    --compile      Markdown -> normalized JSON for the working tree
+    --validate     JSON Schema validation of the normalized output
+    --check-diff   no unstaged changes in the shard's rooms/ or normalized/ (git diff
+                   against the index: the compiled output has been staged)
+    --staged       compile the staged rooms from the index and compare them byte-for-byte
+                   with the staged JSON, then validate (the default)
+    --all          --compile --validate --check-diff
+
+A staged schema change turns --staged into --all for that shard. atlas_compile_gate.py
+(the pre-commit gate) and validate_rooms_json.py are thin wrappers around this module.
+
+Nothing is done twice within one commit, however many hooks run:
+
+- compile is skipped while the shard's input stamp (<cache_dir>/inputs.stamp, the one
+  the normalizer's no-op fast path uses) still matches; the z1-normalize-rooms hook has
+  usually just written it
+- rooms that do need compiling, and staged rooms, are looked up in the shared compile
+  store (scripts/atlas_store.py) before parsing
+- validation verdicts are kept per output file (sha256 of its bytes) in
+  <cache_dir>/validation.json for --validate, and with each staged room's entry in the
+  shared store for --staged, so jsonschema is only imported, and a file only
+  validated, when its content was never validated against this schema
+- files --validate does have to check go to the atlas daemon first when one is
+  running (scripts/atlas_daemon.py keeps the validator loaded), in-process otherwise
+
+--force ignores the stamp and the verdict caches.
+
+    python scripts/atlas_engine.py [--staged | --all | --compile --validate --check-diff]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import atlas_metrics as metrics
+from atlas_build import DEFAULT_CONFIG_PATH, AtlasConfig, ConfigError, Shard, load_config
+
+VERDICTS_NAME = "validation.json"
+STAGES = ("compile", "validate", "check-diff")
+
+
+def log(msg: str) -> None:
+    print(f"[engine] {msg}")
+
+
+def error(msg: str) -> None:
+    print(f"[engine] {msg}", file=sys.stderr)
+
+
+def _load_validator(schema_bytes: bytes) -> Tuple[Any, Any]:
+    try:
+        import jsonschema
+    except ImportError:
+        error("ERROR: Missing dependency: jsonschema")
+        print("Install with: python -m pip install jsonschema", file=sys.stderr)
+        sys.exit(1)
+    schema = json.loads(schema_bytes.decode("utf-8"))
+    return jsonschema.validators.validator_for(schema)(schema), jsonschema.exceptions.best_match
+
+
+def _error_location(err: Any) -> str:
+    return "/".join(str(x) for x in err.path) or "<root>"
+
+
+def schema_verdict(validator: Any, best_match: Any, data: bytes, *, all_errors: bool = False, instance: Any = None) -> str:
+    """"ok", or the schema error(s) of one normalized JSON file (instance: data already decoded)."""
+    if instance is None:
+        try:
+            instance = json.loads(data.decode("utf-8"))
+        except ValueError as e:
+            return f"invalid JSON: {e}"
+    if all_errors:
+        errs = sorted(validator.iter_errors(instance), key=lambda e: list(e.path))
+        return "\n".join(f"  - {_error_location(e)}: {e.message}" for e in errs) or "ok"
+    err = best_match(validator.iter_errors(instance))
+    return "ok" if err is None else f"{_error_location(err)}: {err.message}"
+
+
+@dataclass
+class ShardRun:
+    """Per-shard state shared by the stages of one run."""
+
+    shard: Shard
+    rel_in: str
+    rel_out: str
+    rel_schema: str
+    schema_bytes: bytes = b""
+    schema_digest: str = ""
+    _validator: Optional[Tuple[Any, Any]] = field(default=None, repr=False)
+
+    def validator(self) -> Tuple[Any, Any]:
+        if self._validator is None:
+            self._validator = _load_validator(self.schema_bytes)
+        return self._validator
+
+
+class Engine:
+    def __init__(self, config: AtlasConfig, root: Path, *, force: bool = False, use_daemon: bool = True,
+                 shared_cache: bool = True, all_errors: bool = False) -> None:
+        self.config = config
+        self.root = root
+        self.force = force
+        self.use_daemon = use_daemon
+        self.all_errors = all_errors
+        self._store: Any = None
+        self._shared_cache = shared_cache
+
+    # -- shared per-run resources --------------------------------------------------
+
+    def store(self) -> Any:
+        if self._store is None and self._shared_cache:
+            from atlas_store import open_store
+            from normalize_rooms_schema_authoritative import normalizer_fingerprint
+
+            self._store = open_store(normalizer_fingerprint())
+        return self._store
+
+    def shard_run(self, shard: Shard) -> ShardRun:
+        return ShardRun(
+            shard=shard,
+            rel_in=shard.in_dir.relative_to(self.root).as_posix(),
+            rel_out=shard.out_dir.relative_to(self.root).as_posix(),
+            rel_schema=shard.schema.relative_to(self.root).as_posix(),
+            schema_bytes=shard.schema.read_bytes(),
+        )
+
+    def finish(self) -> None:
+        if self._store is not None:
+            self._store.maybe_evict()
+            metrics.count(shared_hits=self._store.hits, shared_misses=self._store.misses)
+
+    # -- stages ------------------------------------------------------------------
+
+    def compile(self, run: ShardRun) -> bool:
+        from normalize_rooms_schema_authoritative import (
+            STAMP_NAME,
+            SchemaError,
+            compile_rooms,
+            compile_via_daemon,
+            input_stamp,
+            load_schema,
+            write_input_stamp,
+        )
+
+        shard = run.shard
+        stamp = input_stamp(str(shard.schema), str(shard.in_dir), str(shard.out_dir), "**/*.md")
+        if not self.force and stamp is not None:
+            try:
+                unchanged = (shard.cache_dir / STAMP_NAME).read_text(encoding="utf-8") == stamp
+            except OSError:
+                unchanged = False
+            if unchanged:
+                log(f"{shard.game}: compile skipped (inputs unchanged since the last successful compile).")
+                metrics.count(compile_skipped=True)
+                return True
+
+        try:
+            schema = load_schema(shard.schema)
+        except SchemaError as e:
+            error(f"{shard.game}: SCHEMA ERROR: {e}")
+            return False
+        if not any(shard.in_dir.glob("**/*.md")):
+            error(f"{shard.game}: ERROR: No markdown files found under {shard.in_dir}")
+            return False
+
+        result = compile_via_daemon(shard.schema, shard.in_dir, shard.out_dir, "**/*.md", True) if self.use_daemon else None
+        if result is None:
+            result = compile_rooms(
+                shard.in_dir,
+                shard.out_dir,
+                schema=schema,
+                schema_digest=run.schema_digest,
+                fail_fast=True,
+                cache_dir=shard.cache_dir,
+                store=self.store(),
+            )
+        metrics.count(files=result.count_total, cache_hits=result.count_cached,
+                      cache_misses=result.count_total - result.count_cached, written=result.count_written)
+        if result.errors:
+            for msg in result.errors:
+                error(f"{shard.game}: COMPILE ERROR: {msg}")
+            return False
+        write_input_stamp(shard.cache_dir, shard.schema, shard.in_dir, shard.out_dir, "**/*.md")
+        log(f"{shard.game}: compiled {result.count_ok} room(s) ({result.count_written} written).")
+        return True
+
+    def validate(self, run: ShardRun) -> bool:
+        shard = run.shard
+        files = sorted(shard.out_dir.glob("*.json"))
+        if not files:
+            error(f"{shard.game}: ERROR: No JSON files found in {run.rel_out}/.")
+            return False
+
+        verdicts_path = shard.cache_dir / VERDICTS_NAME
+        previous: Dict[str, List[str]] = {}
+        if not self.force:
+            try:
+                data = json.loads(verdicts_path.read_text(encoding="utf-8"))
+                if data.get("schema_sha256") == run.schema_digest:
+                    previous = data["files"]
+            except (OSError, ValueError, KeyError, TypeError):
+                previous = {}
+
+        contents = {p: p.read_bytes() for p in files}
+        digests = {p: hashlib.sha256(data).hexdigest() for p, data in contents.items()}
+        # Failures are re-validated, so their report stays complete.
+        pending = [p.name for p in files if previous.get(p.name) != [digests[p], "ok"]]
+        remote = self.daemon_verdicts(run, pending)
+
+        current: Dict[str, List[str]] = {}
+        failures = 0
+        validated = 0
+        for p in files:
+            data, digest = contents[p], digests[p]
+            if p.name not in pending:
+                verdict = "ok"
+            elif remote.get(p.name, [None])[0] == digest:
+                verdict = remote[p.name][1]
+                validated += 1
+            else:
+                validator, best_match = run.validator()
+                validated += 1
+                verdict = schema_verdict(validator, best_match, data, all_errors=self.all_errors)
+            current[p.name] = [digest, verdict]
+            if verdict != "ok":
+                failures += 1
+                sep = "\n" if self.all_errors else " "
+                error(f"SCHEMA VALIDATION FAILED: {run.rel_out}/{p.name}:{sep}{verdict}")
+
+        if current != previous:
+            shard.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp = verdicts_path.with_name(VERDICTS_NAME + ".tmp")
+            tmp.write_text(json.dumps({"schema_sha256": run.schema_digest, "files": current}, ensure_ascii=False), encoding="utf-8")
+            tmp.replace(verdicts_path)
+
+        metrics.count(validated=validated, verdicts_reused=len(files) - validated, daemon_verdicts=len(remote))
+        if failures:
+            return False
+        log(f"{shard.game}: schema validation OK: {len(files)} file(s) ({validated} validated, {len(files) - validated} unchanged).")
+        return True
+
+    def daemon_verdicts(self, run: ShardRun, names: List[str]) -> Dict[str, List[str]]:
+        """
+        name -> [sha256, verdict] for the named output files from a running atlas daemon,
+        which keeps the validator loaded; {} when there is none or it refuses.
+        """
+        if self.force or not self.use_daemon or not names:
+            return {}
+        from atlas_daemon import daemon_request
+        from normalize_rooms_schema_authoritative import normalizer_fingerprint
+
+        response = daemon_request({
+            "op": "validate",
+            "schema": str(run.shard.schema),
+            "out": str(run.shard.out_dir),
+            "files": names,
+            "all_errors": self.all_errors,
+            "fingerprint": normalizer_fingerprint(),
+        })
+        if response is None or not response.get("ok") or not isinstance(response.get("result"), dict):
+            return {}
+        files = response["result"].get("files")
+        if not isinstance(files, dict):
+            return {}
+        return {
+            name: entry for name, entry in files.items()
+            if isinstance(entry, list) and len(entry) == 2 and all(isinstance(x, str) for x in entry)
+        }
+
+    def check_diff(self, run: ShardRun) -> bool:
+        result = subprocess.run(
+            ["git", "diff", "--exit-code", "--", run.rel_in, run.rel_out],
+            cwd=self.root,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        if result.returncode != 0:
+            error(f"{run.shard.game}: ERROR: {run.rel_in}/ or {run.rel_out}/ has unstaged changes.")
+            print("Run the normalizer and stage its output.", file=sys.stderr)
+            return False
+        return True
+
+    def check_staged(self, runs: Sequence[ShardRun]) -> Tuple[bool, List[ShardRun]]:
+        """Returns (ok, shards whose staged schema change needs the full check instead)."""
+        from atlas_git import CatFileBatch, GitError, staged_changes
+        from atlas_store import StoreEntry
+        from normalize_rooms_schema_authoritative import (
+            ParseError,
+            RoomSchema,
+            decode_markdown,
+            parse_room_text,
+            render_room_json,
+        )
+
+        pathspecs = [p for run in runs for p in (run.rel_in, run.rel_out, run.rel_schema)]
+        try:
+            changes = staged_changes(pathspecs, cwd=self.root)
+        except GitError as e:
+            error(f"ERROR: {e}")
+            return False, []
+        metrics.lap("git diff")
+
+        full: List[ShardRun] = []
+        errors = 0
+        checked = 0
+        store = self.store()
+        with CatFileBatch(cwd=self.root) as cat:
+            for run in runs:
+                if any(run.rel_schema in (c.path, c.old_path) for c in changes):
+                    log(f"{run.shard.game}: schema change staged; running the full check.")
+                    full.append(run)
+                    continue
+                stems = staged_stems(changes, run.rel_in, run.rel_out)
+                if not stems:
+                    continue
+                schema_bytes = cat.read(":./" + run.rel_schema) or run.schema_bytes
+                schema_digest = hashlib.sha256(schema_bytes).hexdigest()
+                room_schema = RoomSchema.from_json_schema(json.loads(schema_bytes.decode("utf-8")))
+                validator: Optional[Tuple[Any, Any]] = None
+
+                for stem in sorted(stems):
+                    checked += 1
+                    md_path = stems[stem]
+                    json_path = f"{run.rel_out}/{stem}.json"
+                    md = cat.read(":./" + md_path)
+                    staged_json = cat.read(":./" + json_path)
+
+                    if md is None:
+                        if staged_json is not None:
+                            errors += 1
+                            error(f"ERROR: {json_path} is staged but {md_path} is not (deleted or renamed room).")
+                        continue
+
+                    key = store.key(Path(md_path).name, md, schema_digest) if store is not None else None
+                    entry = store.get(key) if store is not None else None
+                    if entry is None:
+                        try:
+                            room, _ = parse_room_text(decode_markdown(md), Path(md_path), schema=room_schema)
+                        except ParseError as e:
+                            if store is not None:
+                                store.put(key, StoreEntry(json=None, error=e.message))
+                            errors += 1
+                            error(f"ERROR: {e}")
+                            continue
+                        except UnicodeDecodeError as e:
+                            errors += 1
+                            error(f"ERROR: {ParseError(Path(md_path), f'not valid UTF-8: {e}')}")
+                            continue
+                        entry = StoreEntry(json=render_room_json(room.to_dict()))
+                        if store is not None:
+                            store.put(key, entry)
+                    elif entry.json is None:
+                        errors += 1
+                        error(f"ERROR: {ParseError(Path(md_path), entry.error or '')}")
+                        continue
+
+                    expected = entry.json.encode("utf-8")
+                    if staged_json is None:
+                        errors += 1
+                        error(f"ERROR: {json_path} is not staged for {md_path}.")
+                        continue
+                    if staged_json != expected:
+                        errors += 1
+                        error(f"ERROR: staged {json_path} differs from compiler output.")
+                        continue
+
+                    if entry.validation is None or self.force:
+                        if validator is None:
+                            validator = _load_validator(schema_bytes)
+                        err = validator[1](validator[0].iter_errors(json.loads(entry.json)))
+                        entry.validation = "ok" if err is None else err.message
+                        if store is not None:
+                            store.put(key, entry)
+                    if entry.validation != "ok":
+                        errors += 1
+                        error(f"SCHEMA VALIDATION FAILED: {json_path}: {entry.validation}")
+
+        metrics.lap("staged")
+        metrics.count(files=checked, errors=errors)
+        if store is not None:
+            metrics.count(cache_hits=store.hits, cache_misses=store.misses)
+        if errors:
+            print("Run the normalizer and stage its output.", file=sys.stderr)
+            return False, full
+        if checked:
+            log(f"Staged rooms OK: {checked} room path(s) checked.")
+        elif not full:
+            log("No staged room changes.")
+        return True, full
+
+    # -- driver ------------------------------------------------------------------
+
+    def run(self, stages: Sequence[str], staged: bool) -> bool:
+        runs = []
+        for shard in self.config.shards:
+            if not shard.in_dir.is_dir():
+                log(f"{shard.game}: skipped (input directory not found: {shard.in_dir})")
+                continue
+            if not shard.schema.exists():
+                error(f"{shard.game}: ERROR: Schema not found: {shard.schema}")
+                return False
+            run = self.shard_run(shard)
+            run.schema_digest = hashlib.sha256(run.schema_bytes).hexdigest()
+            runs.append(run)
+
+        ok = True
+        full_runs: List[Tuple[ShardRun, Sequence[str]]] = [(run, stages) for run in runs] if stages else []
+        if staged:
+            staged_ok, schema_changed = self.check_staged(runs)
+            ok = staged_ok
+            full_runs += [(run, STAGES) for run in schema_changed if not stages]
+
+        for run, run_stages in full_runs:
+            for stage in STAGES:
+                if stage not in run_stages:
+                    continue
+                passed = getattr(self, stage.replace("-", "_"))(run)
+                metrics.lap(stage)
+                if not passed:
+                    ok = False
+                    break
+        self.finish()
+        return ok
+
+
+def staged_stems(changes: Sequence[Any], rel_in: str, rel_out: str) -> Dict[str, str]:
+    """Map each affected room stem to the index path of its Markdown."""
+    stems: Dict[str, str] = {}
+    in_parts = tuple(Path(rel_in).parts)
+    for change in changes:
+        for path in (change.path, change.old_path):
+            if path is None:
+                continue
+            p = Path(path)
+            if p.suffix == ".md" and p.parts[: len(in_parts)] == in_parts:
+                stems[p.stem] = path
+            elif p.suffix == ".json" and p.parent.as_posix() == rel_out:
+                stems.setdefault(p.stem, f"{rel_in}/{p.stem}.md")
+    return stems
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Atlas compile-and-validate engine.")
+    ap.add_argument("--config", type=Path, default=DEFAULT_CONFIG_PATH, help="Atlas config (default: atlas.json)")
+    ap.add_argument("--game", action="append", help="Only the given game shard (repeatable)")
+    ap.add_argument("--staged", action="store_true", help="Check the staged rooms from the git index (default)")
+    ap.add_argument("--compile", action="store_true", help="Compile the working tree rooms")
+    ap.add_argument("--validate", action="store_true", help="Validate the normalized JSON against the schema")
+    ap.add_argument("--check-diff", action="store_true", help="Fail if rooms/ or normalized/ have unstaged changes")
+    ap.add_argument("--all", action="store_true", help="Same as --compile --validate --check-diff")
+    ap.add_argument("--force", action="store_true", help="Ignore the input stamp and cached validation verdicts")
+    ap.add_argument("--all-errors", action="store_true", help="Report every schema error, not just the most relevant")
+    ap.add_argument("--no-daemon", action="store_true", help="Compile in-process even if an atlas daemon is listening")
+    ap.add_argument("--no-shared-cache", action="store_true", help="Do not use the shared compile store")
+    args = ap.parse_args(argv)
+
+    stages = [s for s in STAGES if args.all or getattr(args, s.replace("-", "_"))]
+    staged = args.staged or not stages
+    metrics.count(mode="+".join((["staged"] if staged else []) + stages))
+
+    try:
+        config = load_config(args.config)
+    except ConfigError as e:
+        error(f"CONFIG ERROR: {e}")
+        return 2
+    if args.game:
+        unknown = sorted(set(args.game) - {s.game for s in config.shards})
+        if unknown:
+            error(f"Unknown shard(s): {unknown}")
+            return 2
+        config = AtlasConfig(shards=[s for s in config.shards if s.game in args.game], manifest=config.manifest)
+
+    engine = Engine(
+        config,
+        args.config.resolve().parent,
+        force=args.force,
+        use_daemon=not args.no_daemon,
+        shared_cache=not args.no_shared_cache,
+        all_errors=args.all_errors,
+    )
+    return 0 if engine.run(stages, staged) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(metrics.timed(main, "engine"))
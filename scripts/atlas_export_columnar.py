@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Columnar export of the compiled atlas for analytics.
+
+Reads normalized/*.json for every shard in atlas.json and writes five tables:
+
+- rooms:       room_id, game, title, family, internal_id, lit, exit_count
+- exits:       room_id, direction, target_title, target_room_id (-1 if unresolved)
+- objects:     room_id, object
+- hazards:     room_id, hazard
+- state_notes: room_id, note
+
+String columns are dictionary-encoded (int32 codes + one dictionary per column) and
+foreign keys are plain integers, so aggregations become array operations, e.g.
+exit-degree distribution = bincount(exits.room_id), lit vs dark = bincount(rooms.lit + 1).
+
+Output format:
+- Parquet (one file per table, Arrow dictionary columns) when pyarrow is installed
+- otherwise one compressed NumPy archive, atlas_columnar.npz, with keys
+  "<table>.<column>" and "<table>.<column>.dictionary"
+
+`family` is the title without a trailing letter designator (Maze A/AF -> Maze),
+the closest thing to a region the atlas records. `lit` is 1 / 0 from an exact
+"Lit" / "Dark" state note and -1 otherwise.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from atlas_build import DEFAULT_CONFIG_PATH, ConfigError, load_config
+from normalize_rooms_schema_authoritative import PLACEHOLDER_EXITS
+
+PLACEHOLDER_ITEMS = PLACEHOLDER_EXITS | {"..."}
+FAMILY_SUFFIX_RE = re.compile(r"\s+[A-Z]{1,2}$")
+EXIT_LINE_RE = re.compile(r"^(?P<direction>\S+) → \[\[(?P<target>.+)\]\]$")
+DEFAULT_OUT_DIR = Path("build/columnar")
+
+
+class DictColumn:
+    """A dictionary-encoded string column: int codes into a list of distinct values."""
+
+    __slots__ = ("codes", "values", "_index")
+
+    def __init__(self) -> None:
+        self.codes: List[int] = []
+        self.values: List[str] = []
+        self._index: Dict[str, int] = {}
+
+    def append(self, value: str) -> None:
+        code = self._index.get(value)
+        if code is None:
+            code = self._index[value] = len(self.values)
+            self.values.append(value)
+        self.codes.append(code)
+
+
+Column = Union[DictColumn, List[int]]
+Tables = Dict[str, Dict[str, Column]]
+
+
+def _new_tables() -> Tables:
+    return {
+        "rooms": {
+            "room_id": [],
+            "game": DictColumn(),
+            "title": DictColumn(),
+            "family": DictColumn(),
+            "internal_id": DictColumn(),
+            "lit": [],
+            "exit_count": [],
+        },
+        "exits": {"room_id": [], "direction": DictColumn(), "target_title": DictColumn(), "target_room_id": []},
+        "objects": {"room_id": [], "object": DictColumn()},
+        "hazards": {"room_id": [], "hazard": DictColumn()},
+        "state_notes": {"room_id": [], "note": DictColumn()},
+    }
+
+
+def _items(values: List[str]) -> List[str]:
+    return [v for v in values if v.strip() not in PLACEHOLDER_ITEMS]
+
+
+def build_tables(rooms: List[Tuple[str, dict]]) -> Tables:
+    """rooms: (game, normalized room object) pairs, in a stable order."""
+    tables = _new_tables()
+    room_ids = {obj["title"]: i for i, (_, obj) in enumerate(rooms)}
+    pending_exits: List[Tuple[int, str, str]] = []
+
+    r = tables["rooms"]
+    for room_id, (game, obj) in enumerate(rooms):
+        sections = obj["sections"]
+        title = obj["title"]
+        notes = _items(sections["State notes"])
+        lit = 1 if "Lit" in notes else 0 if "Dark" in notes else -1
+
+        exits = []
+        for line in sections["Exits (as reported)"]:
+            m = EXIT_LINE_RE.match(line)
+            if m:
+                exits.append((room_id, m.group("direction"), m.group("target")))
+        pending_exits.extend(exits)
+
+        r["room_id"].append(room_id)
+        r["game"].append(game)
+        r["title"].append(title)
+        r["family"].append(FAMILY_SUFFIX_RE.sub("", title.split(" - ", 1)[-1]))
+        r["internal_id"].append(sections["Mapping notes"].get("Internal ID", ""))
+        r["lit"].append(lit)
+        r["exit_count"].append(len(exits))
+
+        for table, column, items in (
+            ("objects", "object", _items(sections["Objects present"])),
+            ("hazards", "hazard", _items(sections["Hazards/NPCs"])),
+            ("state_notes", "note", notes),
+        ):
+            t = tables[table]
+            for item in items:
+                t["room_id"].append(room_id)
+                t[column].append(item)
+
+    e = tables["exits"]
+    for room_id, direction, target in pending_exits:
+        e["room_id"].append(room_id)
+        e["direction"].append(direction)
+        e["target_title"].append(target)
+        e["target_room_id"].append(room_ids.get(target, -1))
+
+    return tables
+
+
+def load_rooms(config_path: Path) -> List[Tuple[str, dict]]:
+    config = load_config(config_path)
+    rooms: List[Tuple[str, dict]] = []
+    for shard in config.shards:
+        for p in sorted(shard.out_dir.glob("*.json")):
+            rooms.append((shard.game, json.loads(p.read_text(encoding="utf-8"))))
+    return rooms
+
+
+def write_parquet(tables: Tables, out_dir: Path) -> List[Path]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    written = []
+    for name, columns in tables.items():
+        arrays = {}
+        for col, data in columns.items():
+            if isinstance(data, DictColumn):
+                arrays[col] = pa.DictionaryArray.from_arrays(
+                    pa.array(data.codes, type=pa.int32()), pa.array(data.values, type=pa.string())
+                )
+            else:
+                arrays[col] = pa.array(data, type=pa.int32())
+        path = out_dir / f"{name}.parquet"
+        pq.write_table(pa.table(arrays), path)
+        written.append(path)
+    return written
+
+
+def write_npz(tables: Tables, out_dir: Path) -> List[Path]:
+    import numpy as np
+
+    arrays = {}
+    for name, columns in tables.items():
+        for col, data in columns.items():
+            key = f"{name}.{col}"
+            if isinstance(data, DictColumn):
+                arrays[key] = np.asarray(data.codes, dtype=np.int32)
+                arrays[key + ".dictionary"] = np.asarray(data.values, dtype=np.str_)
+            else:
+                arrays[key] = np.asarray(data, dtype=np.int32)
+    path = out_dir / "atlas_columnar.npz"
+    np.savez_compressed(path, **arrays)
+    return [path]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Export the compiled atlas as columnar tables (Parquet or .npz).")
+    ap.add_argument("--config", type=Path, default=DEFAULT_CONFIG_PATH, help="Atlas config (default: atlas.json)")
+    ap.add_argument("--out", type=Path, default=DEFAULT_OUT_DIR, help=f"Output directory (default: {DEFAULT_OUT_DIR})")
+    ap.add_argument("--format", choices=["auto", "parquet", "npz"], default="auto", help="Output format (default: auto)")
+    args = ap.parse_args(argv)
+
+    try:
+        rooms = load_rooms(args.config)
+    except ConfigError as e:
+        print(f"[export] CONFIG ERROR: {e}", file=sys.stderr)
+        return 2
+    if not rooms:
+        print("[export] ERROR: No normalized JSON found; run the normalizer first.", file=sys.stderr)
+        return 1
+
+    fmt = args.format
+    if fmt == "auto":
+        try:
+            import pyarrow  # noqa: F401
+
+            fmt = "parquet"
+        except ImportError:
+            fmt = "npz"
+
+    tables = build_tables(rooms)
+    args.out.mkdir(parents=True, exist_ok=True)
+    try:
+        written = write_parquet(tables, args.out) if fmt == "parquet" else write_npz(tables, args.out)
+    except ImportError as e:
+        dep = "pyarrow" if fmt == "parquet" else "numpy"
+        print(f"[export] ERROR: Missing dependency: {dep} ({e})", file=sys.stderr)
+        print(f"Install with: python -m pip install {dep}", file=sys.stderr)
+        return 1
+
+    counts = ", ".join(f"{name}={len(cols['room_id'])}" for name, cols in tables.items())
+    print(f"[export] {fmt}: {counts}")
+    for path in written:
+        print(f"[export] wrote {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,134 @@
+"""
+Thin git plumbing helpers shared by the atlas tools.
+
+- staged_changes(): one `git diff --cached --name-status -z` call, renames detected
+- ls_tree():        path -> blob id for a directory at any revision
+- CatFileBatch:     one persistent `git cat-file --batch` process; read any number of
+                    blobs (":path" for the index, "REV:path" for a revision) without
+                    spawning a process per file
+
+Every helper takes cwd, the directory git runs in (default: the current one), so a
+tool can work against its config root whatever directory it was started from. Nothing
+here touches the working tree.
+"""
+
+from __future__ import annotations
+
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+EMPTY_TREE = "4b825dc642cb6eb9a060e54bf8d69288fbee4904"
+
+
+class GitError(RuntimeError):
+    pass
+
+
+def git(*args: str, cwd: Optional[Path] = None) -> bytes:
+    result = subprocess.run(["git", *args], cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        raise GitError(f"git {' '.join(args)}: {result.stderr.decode('utf-8', 'replace').strip()}")
+    return result.stdout
+
+
+@dataclass(frozen=True)
+class Change:
+    status: str                     # A, C, D, M, R, T, U (rename/copy score stripped)
+    path: str                       # new path (old path for deletions)
+    old_path: Optional[str] = None  # source path of a rename or copy
+
+
+def parse_name_status_z(data: bytes) -> List[Change]:
+    """Parse `--name-status -z` output: STATUS\\0path\\0, or STATUS\\0old\\0new\\0 for R/C."""
+    fields = data.decode("utf-8", "surrogateescape").split("\0")
+    changes: List[Change] = []
+    i = 0
+    while i < len(fields) and fields[i]:
+        status = fields[i][0]
+        if status in "RC":
+            changes.append(Change(status, fields[i + 2], fields[i + 1]))
+            i += 3
+        else:
+            changes.append(Change(status, fields[i + 1]))
+            i += 2
+    return changes
+
+
+def staged_changes(pathspecs: Sequence[str] = (), cwd: Optional[Path] = None) -> List[Change]:
+    """
+    Paths that differ between HEAD and the index (all paths in a repository without
+    commits), under cwd and relative to it, like the pathspecs.
+    """
+    try:
+        git("rev-parse", "--verify", "--quiet", "HEAD", cwd=cwd)
+        base = "HEAD"
+    except GitError:
+        base = EMPTY_TREE
+    return parse_name_status_z(
+        git("diff", "--cached", "--name-status", "-z", "-M", "--relative", base, "--", *pathspecs, cwd=cwd)
+    )
+
+
+def ls_tree(rev: str, directory: str, cwd: Optional[Path] = None) -> Dict[str, str]:
+    """Blob ids of the files under directory (repository-relative) at rev; {} if it does not exist there."""
+    out = git("ls-tree", "-r", "-z", "--full-tree", rev, "--", directory.rstrip("/") + "/", cwd=cwd)
+    blobs: Dict[str, str] = {}
+    for entry in out.decode("utf-8", "surrogateescape").split("\0"):
+        if not entry:
+            continue
+        meta, path = entry.split("\t", 1)
+        _, kind, oid = meta.split(" ")
+        if kind == "blob":
+            blobs[path] = oid
+    return blobs
+
+
+class CatFileBatch:
+    """
+    A persistent `git cat-file --batch` process.
+
+        with CatFileBatch() as cat:
+            data = cat.read(":normalized/Z1 - Kitchen.json")   # None if missing
+
+    Paths in specs are repository-relative; ":./path" is relative to cwd.
+    """
+
+    def __init__(self, cwd: Optional[Path] = None) -> None:
+        self._proc = subprocess.Popen(
+            ["git", "cat-file", "--batch"],
+            cwd=cwd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+
+    def read(self, spec: str) -> Optional[bytes]:
+        if "\n" in spec:
+            raise GitError(f"Object names may not contain newlines: {spec!r}")
+        assert self._proc.stdin is not None and self._proc.stdout is not None
+        self._proc.stdin.write(spec.encode("utf-8", "surrogateescape") + b"\n")
+        self._proc.stdin.flush()
+        header = self._proc.stdout.readline()
+        if not header:
+            raise GitError("git cat-file --batch exited unexpectedly")
+        # "<oid> <type> <size>", or "<spec> missing" / "<spec> ambiguous", where the spec
+        # itself may contain spaces: only the last field tells the two apart.
+        last = header.rstrip(b"\n").rsplit(b" ", 1)[-1]
+        if last in (b"missing", b"ambiguous"):
+            return None
+        size = int(last)
+        data = self._proc.stdout.read(size)
+        self._proc.stdout.read(1)  # trailing LF
+        return data
+
+    def close(self) -> None:
+        if self._proc.stdin:
+            self._proc.stdin.close()
+        self._proc.wait()
+
+    def __enter__(self) -> "CatFileBatch":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
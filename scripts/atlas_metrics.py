@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Runtime history for the atlas toolchain, with regression alerts.
+
+Every instrumented tool (the pre-commit hooks, atlas_build.py, atlas_site.py) appends
+one JSON line per run to .atlas-cache/metrics.jsonl (override with ATLAS_METRICS_FILE,
+disable with ATLAS_METRICS=0):
+
+    {"ts": 1760000000.123, "tool": "normalize", "rev": "aa82d12", "exit": 0, "ms": 41.2,
+     "stages": {"schema": 1.9, "compile": 36.0}, "counts": {"mode": "full", "files": 91, ...}}
+
+- stages: wall-clock milliseconds per stage (lap() attributes the time since the
+  previous lap)
+- counts: file counts, cache hits/misses, bytes written; "mode" separates runs that are
+  not comparable (a no-op stamp hit vs a full compile)
+- rev: HEAD read from .git directly, without spawning git
+
+Recording has to be cheaper than what it measures: the normalizer's no-op path runs in
+a few milliseconds, so this module imports only os/sys/time, encodes its flat records
+by hand, and appends each line with a single O_APPEND write (atomic for concurrent
+hook runs). The file is trimmed to its newest half once it exceeds MAX_BYTES.
+
+    python scripts/atlas_metrics.py report [--tool T] [--last N] [--window W] [--threshold X]
+
+prints p50/p90/p99 per tool and mode over the last N runs and flags runs slower than
+X times the median of the W runs before them (the rolling baseline).
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+
+DEFAULT_METRICS_PATH = os.path.join(".atlas-cache", "metrics.jsonl")
+MAX_BYTES = 2 * 1024 * 1024
+
+_run: dict | None = None
+
+
+def metrics_path() -> str | None:
+    if os.environ.get("ATLAS_METRICS", "1") == "0":
+        return None
+    return os.environ.get("ATLAS_METRICS_FILE") or DEFAULT_METRICS_PATH
+
+
+# ----------------------------
+# Recording (stdlib os/sys/time only; not even typing, which costs ~15 ms to import)
+# ----------------------------
+
+def start(tool: str) -> None:
+    global _run
+    now = time.perf_counter()
+    _run = {"tool": tool, "t0": now, "lap": now, "stages": {}, "counts": {}}
+
+
+def lap(stage: str) -> None:
+    """Attribute the time since the previous lap (or start) to stage. No-op outside a run."""
+    if _run is None:
+        return
+    now = time.perf_counter()
+    stages = _run["stages"]
+    stages[stage] = stages.get(stage, 0.0) + (now - _run["lap"]) * 1000
+    _run["lap"] = now
+
+
+def count(**values: object) -> None:
+    if _run is not None:
+        _run["counts"].update(values)
+
+
+def finish(code: object = 0) -> object:
+    """Write the record for the current run; returns code unchanged."""
+    global _run
+    run, _run = _run, None
+    path = metrics_path()
+    if run is None or path is None:
+        return code
+    exit_code = 0 if code is None else code if isinstance(code, int) else 1
+    record = {
+        "ts": round(time.time(), 3),
+        "tool": run["tool"],
+        "rev": git_revision(),
+        "exit": exit_code,
+        "ms": round((time.perf_counter() - run["t0"]) * 1000, 3),
+        "stages": {k: round(v, 3) for k, v in run["stages"].items()},
+        "counts": run["counts"],
+    }
+    try:
+        _append(path, _encode(record) + "\n")
+    except OSError:
+        pass  # metrics must never fail a hook
+    return code
+
+
+def timed(main, tool: str | None = None) -> object:
+    """Run main() as one recorded run (started here if tool is given); SystemExit is recorded and re-raised."""
+    if tool is not None:
+        start(tool)
+    try:
+        code = main()
+    except SystemExit as e:
+        finish(e.code)
+        raise
+    except BaseException:
+        finish(1)
+        raise
+    return finish(code)
+
+
+def _append(path: str, line: str) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line.encode("utf-8"))
+        size = os.fstat(fd).st_size
+    finally:
+        os.close(fd)
+    if size > MAX_BYTES:
+        _trim(path)
+
+
+def _trim(path: str) -> None:
+    with open(path, "rb") as f:
+        f.seek(-(MAX_BYTES // 2), os.SEEK_END)
+        tail = f.read()
+    tail = tail[tail.find(b"\n") + 1:]
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(tail)
+    os.replace(tmp, path)
+
+
+_ESCAPES = {'"': '\\"', "\\": "\\\\", "\n": "\\n", "\r": "\\r", "\t": "\\t"}
+
+
+def _encode(value: object) -> str:
+    """JSON for the flat values a record holds (json itself costs ~7 ms to import)."""
+    if value is None:
+        return "null"
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if isinstance(value, (int, float)):
+        return repr(value) if value == value and value not in (float("inf"), float("-inf")) else "null"
+    if isinstance(value, str):
+        return '"' + "".join(_ESCAPES.get(c, c if c >= " " else f"\\u{ord(c):04x}") for c in value) + '"'
+    if isinstance(value, dict):
+        return "{" + ", ".join(f"{_encode(str(k))}: {_encode(v)}" for k, v in value.items()) + "}"
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(_encode(v) for v in value) + "]"
+    return _encode(str(value))
+
+
+def _git_dir() -> str | None:
+    d = os.getcwd()
+    while True:
+        candidate = os.path.join(d, ".git")
+        if os.path.isdir(candidate):
+            return candidate
+        if os.path.isfile(candidate):  # worktree or submodule: "gitdir: <path>"
+            with open(candidate, encoding="utf-8") as f:
+                line = f.readline().strip()
+            if line.startswith("gitdir:"):
+                return os.path.join(d, line[len("gitdir:"):].strip())
+            return None
+        parent = os.path.dirname(d)
+        if parent == d:
+            return None
+        d = parent
+
+
+def git_revision() -> str | None:
+    """Short HEAD sha, read from the .git files (no subprocess). None outside a repository."""
+    try:
+        git_dir = _git_dir()
+        if git_dir is None:
+            return None
+        with open(os.path.join(git_dir, "HEAD"), encoding="utf-8") as f:
+            head = f.read().strip()
+        if not head.startswith("ref:"):
+            return head[:7]
+        ref = head[len("ref:"):].strip()
+        common = git_dir
+        if os.path.isfile(os.path.join(git_dir, "commondir")):
+            with open(os.path.join(git_dir, "commondir"), encoding="utf-8") as f:
+                common = os.path.join(git_dir, f.read().strip())
+        for base in (git_dir, common):
+            try:
+                with open(os.path.join(base, ref), encoding="utf-8") as f:
+                    return f.read().strip()[:7]
+            except FileNotFoundError:
+                continue
+        with open(os.path.join(common, "packed-refs"), encoding="utf-8") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 2 and parts[1] == ref:
+                    return parts[0][:7]
+    except OSError:
+        pass
+    return None  # unborn branch or unreadable repository
+
+
+# ----------------------------
+# Report
+# ----------------------------
+
+def load_records(path: str) -> list[dict]:
+    import json
+
+    records = []
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue  # a line cut short by a crash or a trim
+                if isinstance(rec, dict) and "tool" in rec and "ms" in rec:
+                    records.append(rec)
+    except FileNotFoundError:
+        pass
+    return records
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return float("nan")
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def _median(values: list[float]) -> float:
+    return percentile(sorted(values), 50)
+
+
+def regressions(runs: list[dict], window: int, threshold: float) -> list[dict]:
+    """Runs slower than threshold x the median of the `window` runs before them (same tool and mode)."""
+    flagged = []
+    for i in range(window, len(runs)):
+        baseline = runs[i - window:i]
+        base_ms = _median([r["ms"] for r in baseline])
+        run = runs[i]
+        if base_ms > 0 and run["ms"] > threshold * base_ms:
+            worst, worst_delta = None, 0.0
+            for stage, ms in run.get("stages", {}).items():
+                delta = ms - _median([r.get("stages", {}).get(stage, 0.0) for r in baseline])
+                if delta > worst_delta:
+                    worst, worst_delta = stage, delta
+            flagged.append({"run": run, "baseline_ms": base_ms, "stage": worst, "stage_delta_ms": worst_delta})
+    return flagged
+
+
+def _hit_rate(runs: list[dict]) -> float | None:
+    hits = sum(r.get("counts", {}).get("cache_hits", 0) for r in runs)
+    misses = sum(r.get("counts", {}).get("cache_misses", 0) for r in runs)
+    return hits / (hits + misses) if hits + misses else None
+
+
+def report(records: list[dict], *, last: int, window: int, threshold: float) -> list[str]:
+    groups: dict[tuple, list[dict]] = {}
+    for rec in records:
+        groups.setdefault((rec["tool"], str(rec.get("counts", {}).get("mode", "-"))), []).append(rec)
+
+    lines = [f"{'tool':<14} {'mode':<11} {'runs':>5} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'last ms':>9} {'hits':>6}"]
+    alerts: list[str] = []
+    for (tool, mode), runs in sorted(groups.items()):
+        recent = runs[-last:]
+        ms = sorted(r["ms"] for r in recent)
+        rate = _hit_rate(recent)
+        lines.append(
+            f"{tool:<14} {mode:<11} {len(recent):>5} {percentile(ms, 50):>9.1f} {percentile(ms, 90):>9.1f} "
+            f"{percentile(ms, 99):>9.1f} {recent[-1]['ms']:>9.1f} {'-' if rate is None else f'{rate:.0%}':>6}"
+        )
+        # Baselines may reach back before the reported window.
+        start_at = max(0, len(runs) - len(recent) - window)
+        for flag in regressions(runs[start_at:], window, threshold):
+            run = flag["run"]
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(run.get("ts", 0)))
+            where = f"; {flag['stage']} +{flag['stage_delta_ms']:.1f} ms" if flag["stage"] else ""
+            alerts.append(
+                f"REGRESSION {tool} ({mode}) {when} @{run.get('rev') or '?'}: {run['ms']:.1f} ms vs "
+                f"baseline {flag['baseline_ms']:.1f} ms (x{run['ms'] / flag['baseline_ms']:.2f}){where}"
+            )
+    return lines + ([""] + alerts if alerts else [])
+
+
+def main(argv: list[str] | None = None) -> int:
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Runtime history of the atlas tools.")
+    ap.add_argument("command", choices=["report"])
+    ap.add_argument("--file", default=None, help=f"Metrics file (default: ATLAS_METRICS_FILE or {DEFAULT_METRICS_PATH})")
+    ap.add_argument("--tool", action="append", help="Only the given tool (repeatable)")
+    ap.add_argument("--last", type=int, default=200, help="Runs per tool and mode to report (default: 200)")
+    ap.add_argument("--window", type=int, default=20, help="Rolling baseline size in runs (default: 20)")
+    ap.add_argument("--threshold", type=float, default=1.5, help="Flag runs slower than this x baseline (default: 1.5)")
+    ap.add_argument("--fail-on-regression", action="store_true", help="Exit 1 if any run was flagged")
+    args = ap.parse_args(argv)
+
+    path = args.file or os.environ.get("ATLAS_METRICS_FILE") or DEFAULT_METRICS_PATH
+    records = [r for r in load_records(path) if not args.tool or r["tool"] in args.tool]
+    if not records:
+        print(f"[metrics] No records in {path}.", file=sys.stderr)
+        return 1
+    lines = report(records, last=args.last, window=args.window, threshold=args.threshold)
+    print("\n".join(lines))
+    if args.fail_on_regression and any(line.startswith("REGRESSION") for line in lines):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,193 @@
+"""
+Compact in-memory room model for the atlas toolchain.
+
+The normalizer used to build every room as nested dicts of lists of strings. Tools that
+hold the whole atlas in memory (daemon, reachability, transforms) now use these
+__slots__ classes instead:
+
+- Direction: enum of exit tokens (one shared object per token)
+- Exit:      (direction, target title); str(exit) is the canonical "D → [[Z1 - X]]" line
+- MappingNotes: ordered key/value fields plus free notes
+- Room:      title + one value per schema section, aligned with a section order that is
+             shared by every room of a schema (never copied per room)
+
+Section values are typed by the schema section kind: str ("string"), tuple of str
+("list"), tuple of Exit ("exits") or MappingNotes ("kv"). Room.to_dict() reproduces the
+existing JSON shape exactly, so render_room_json(room.to_dict()) is byte-identical to
+the previous output. Titles, link targets and section names are interned.
+
+Room.to_markdown() / section_to_markdown() render the canonical Markdown form; parsing
+it again yields an equal room (exit conditions live in Hidden/conditional transitions,
+so exits render bare).
+"""
+
+from __future__ import annotations
+
+import sys
+from enum import Enum
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+EXITS_SECTION = "Exits (as reported)"
+
+
+class Direction(Enum):
+    N = "N"
+    S = "S"
+    E = "E"
+    W = "W"
+    NE = "NE"
+    NW = "NW"
+    SE = "SE"
+    SW = "SW"
+    U = "U"
+    D = "D"
+    WAIT = "WAIT"
+    LAND = "LAND"
+    LAUNCH = "LAUNCH"
+
+    def __str__(self) -> str:
+        return self.value
+
+
+class Exit:
+    __slots__ = ("direction", "target")
+
+    def __init__(self, direction: Direction, target: str) -> None:
+        self.direction = direction
+        self.target = sys.intern(target)  # room title, e.g. "Z1 - Kitchen"
+
+    @property
+    def link(self) -> str:
+        return f"[[{self.target}]]"
+
+    def __str__(self) -> str:
+        return f"{self.direction.value} → [[{self.target}]]"
+
+    def __repr__(self) -> str:
+        return f"Exit({self.direction.value!r}, {self.target!r})"
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Exit) and self.direction is other.direction and self.target == other.target
+
+    def __hash__(self) -> int:
+        return hash((self.direction, self.target))
+
+
+class MappingNotes:
+    __slots__ = ("fields", "notes")
+
+    def __init__(self, fields: Tuple[Tuple[str, str], ...] = (), notes: Tuple[str, ...] = ()) -> None:
+        self.fields = fields  # ordered (key, value), e.g. (("Internal ID", "Z1-R-005"), ...)
+        self.notes = notes
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MappingNotes":
+        fields = tuple((sys.intern(k), v) for k, v in data.items() if k != "Notes")
+        return cls(fields, tuple(data.get("Notes", ())))
+
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        for k, v in self.fields:
+            if k == key:
+                return v
+        return default
+
+    def to_dict(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = dict(self.fields)
+        if self.notes:
+            out["Notes"] = list(self.notes)
+        return out
+
+
+SectionValue = Union[str, Tuple[str, ...], Tuple[Exit, ...], MappingNotes]
+
+
+class Room:
+    __slots__ = ("title", "order", "values")
+
+    def __init__(self, title: str, order: Sequence[str], values: Tuple[SectionValue, ...]) -> None:
+        if len(order) != len(values):
+            raise ValueError(f"Room {title!r}: {len(values)} section values for {len(order)} sections")
+        self.title = sys.intern(title)
+        self.order = order  # the schema's section_order, shared by all rooms
+        self.values = values
+
+    def section(self, name: str) -> SectionValue:
+        return self.values[self.order.index(name)]
+
+    @property
+    def exits(self) -> Tuple[Exit, ...]:
+        if EXITS_SECTION not in self.order:
+            return ()
+        return self.section(EXITS_SECTION)  # type: ignore[return-value]
+
+    def replace_section(self, name: str, value: SectionValue) -> "Room":
+        values = list(self.values)
+        values[self.order.index(name)] = value
+        return Room(self.title, self.order, tuple(values))
+
+    def to_dict(self) -> Dict[str, Any]:
+        sections: Dict[str, Any] = {}
+        for name, value in zip(self.order, self.values):
+            sections[name] = section_to_json(value)
+        return {
+            "title": self.title,
+            "sections": sections,
+            "section_order": self.order,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], order: Optional[Sequence[str]] = None) -> "Room":
+        """Rebuild a Room from normalized JSON. Exit sections are recognised by their line form."""
+        order = order if order is not None else [sys.intern(h) for h in data["section_order"]]
+        values = tuple(section_from_json(data["sections"][name], name) for name in order)
+        return cls(data["title"], order, values)
+
+    def to_markdown(self) -> str:
+        out = [f"# {self.title}", ""]
+        for name, value in zip(self.order, self.values):
+            out.append(f"## {name}")
+            out.extend(section_to_markdown(value))
+            out.append("")
+        return "\n".join(out)
+
+    def __repr__(self) -> str:
+        return f"Room({self.title!r})"
+
+
+def section_to_json(value: SectionValue) -> Any:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, MappingNotes):
+        return value.to_dict()
+    return [str(v) for v in value]
+
+
+def section_to_markdown(value: SectionValue) -> List[str]:
+    """Canonical Markdown lines for one section body (no heading, no blank padding)."""
+    if isinstance(value, str):
+        return value.split("\n") if value else []
+    if isinstance(value, MappingNotes):
+        lines = [f"**{k}**: {v}".rstrip() for k, v in value.fields]
+        if value.notes:
+            lines.append("")
+            lines.extend(value.notes)
+        return lines
+    return [f"- {v}" for v in value]
+
+
+def section_from_json(value: Any, name: str) -> SectionValue:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        return MappingNotes.from_dict(value)
+    if name == EXITS_SECTION:
+        return tuple(parse_exit_line(line) for line in value)
+    return tuple(value)
+
+
+def parse_exit_line(line: str) -> Exit:
+    """Parse a canonical exit line ("D → [[Z1 - X]]") as written by Exit.__str__."""
+    direction, sep, link = line.partition(" → ")
+    if not sep or not (link.startswith("[[") and link.endswith("]]")):
+        raise ValueError(f"Not a canonical exit line: {line!r}")
+    return Exit(Direction(direction), link[2:-2])
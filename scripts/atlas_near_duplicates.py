@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate room detection over "Description (verbatim)".
+
+Many rooms share almost the same description (Maze A..AF, Coal Mine A..P, Forest A/B,
+Frigid River A-D, Clearing A/B); that is where mapping errors creep in. This stage:
+
+1. shingles each description into word 3-grams,
+2. builds a MinHash signature per room (NUM_PERM hash permutations),
+3. indexes signatures with LSH banding (BANDS bands of ROWS rows), so only rooms that
+   collide in at least one band are compared - no all-pairs pass,
+4. keeps candidate pairs whose estimated Jaccard similarity reaches --threshold and
+   reports connected clusters with each room's exit signature (sorted directions).
+
+Rooms whose descriptions are near-identical AND whose exit signatures are identical
+are flagged: nothing in the text tells them apart.
+
+Only the signatures are cached: per shard in <cache_dir>/<game>/minhash.json, keyed by
+the sha256 of the description, so a run only re-hashes rooms whose description changed.
+The LSH buckets and candidate comparisons are rebuilt on every run; on the current atlas
+that is about 5 ms against about 200 ms for hashing every description, so persisting
+them is not worth the invalidation logic.
+
+    python scripts/atlas_near_duplicates.py [--game Z1] [--threshold 0.6] [--fail-on-indistinguishable]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from atlas_build import DEFAULT_CONFIG_PATH, ConfigError, Shard, load_config
+from atlas_model import Room
+
+DESCRIPTION_SECTION = "Description (verbatim)"
+CACHE_NAME = "minhash.json"
+
+SHINGLE_SIZE = 3
+NUM_PERM = 128
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+SEED = 1977  # fixed: cached signatures must stay comparable across runs
+MERSENNE_61 = (1 << 61) - 1
+DEFAULT_THRESHOLD = 0.6
+
+WORD_RE = re.compile(r"[a-z0-9']+")
+
+_rng = random.Random(SEED)
+_PERMUTATIONS: List[Tuple[int, int]] = [
+    (_rng.randrange(1, MERSENNE_61), _rng.randrange(0, MERSENNE_61)) for _ in range(NUM_PERM)
+]
+PARAMS = {"shingle": SHINGLE_SIZE, "perm": NUM_PERM, "seed": SEED}
+
+
+def shingles(text: str) -> set:
+    words = WORD_RE.findall(text.lower())
+    if len(words) <= SHINGLE_SIZE:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash(text: str) -> List[int]:
+    hashed = [
+        int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big") % MERSENNE_61
+        for s in shingles(text)
+    ]
+    if not hashed:
+        return [MERSENNE_61] * NUM_PERM
+    return [min((a * x + b) % MERSENNE_61 for x in hashed) for a, b in _PERMUTATIONS]
+
+
+def estimated_jaccard(sig_a: Sequence[int], sig_b: Sequence[int]) -> float:
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_PERM
+
+
+def exit_signature(room: Room) -> str:
+    return ",".join(sorted(e.direction.value for e in room.exits)) or "(no exits)"
+
+
+class SignatureCache:
+    """Per-shard MinHash signatures keyed by title, invalidated by description sha256."""
+
+    def __init__(self, path: Optional[Path]):
+        self.path = path
+        self.entries: Dict[str, Dict[str, object]] = {}
+        self.hits = 0
+        self.misses = 0
+        if path is None:
+            return
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if data.get("params") == PARAMS:
+            self.entries = data.get("rooms", {})
+
+    def signature(self, title: str, description: str) -> List[int]:
+        digest = hashlib.sha256(description.encode("utf-8")).hexdigest()
+        entry = self.entries.get(title)
+        if entry and entry.get("sha256") == digest:
+            self.hits += 1
+            return entry["sig"]  # type: ignore[return-value]
+        self.misses += 1
+        sig = minhash(description)
+        self.entries[title] = {"sha256": digest, "sig": sig}
+        return sig
+
+    def save(self, keep: Sequence[str]) -> None:
+        if self.path is None:
+            return
+        live = set(keep)
+        self.entries = {t: e for t, e in self.entries.items() if t in live}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"params": PARAMS, "rooms": self.entries}), encoding="utf-8")
+        tmp.replace(self.path)
+
+
+def near_duplicate_clusters(signatures: Dict[str, List[int]], threshold: float) -> List[List[Tuple[str, str, float]]]:
+    """
+    LSH-band the signatures and return clusters as lists of (a, b, similarity) edges.
+    Only rooms sharing a band bucket are ever compared.
+    """
+    buckets: Dict[Tuple[int, Tuple[int, ...]], List[str]] = defaultdict(list)
+    for title, sig in signatures.items():
+        for band in range(BANDS):
+            buckets[(band, tuple(sig[band * ROWS:(band + 1) * ROWS]))].append(title)
+
+    parent: Dict[str, str] = {}
+
+    def find(x: str) -> str:
+        parent.setdefault(x, x)
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    pairs: Dict[Tuple[str, str], float] = {}
+    for members in buckets.values():
+        if len(members) < 2:
+            continue
+        for i, a in enumerate(members):
+            for b in members[i + 1:]:
+                key = (a, b) if a < b else (b, a)
+                if key in pairs:
+                    continue
+                sim = estimated_jaccard(signatures[a], signatures[b])
+                pairs[key] = sim
+                if sim >= threshold:
+                    parent[find(a)] = find(b)
+
+    clusters: Dict[str, List[Tuple[str, str, float]]] = defaultdict(list)
+    for (a, b), sim in pairs.items():
+        if sim >= threshold:
+            clusters[find(a)].append((a, b, sim))
+    return sorted(clusters.values(), key=lambda edges: min(min(a, b) for a, b, _ in edges))
+
+
+def shard_report(shard: Shard, threshold: float = DEFAULT_THRESHOLD, use_cache: bool = True) -> Tuple[List[str], int]:
+    """Return (report lines, number of indistinguishable pairs) for one shard."""
+    rooms: Dict[str, Room] = {}
+    for p in sorted(shard.out_dir.glob("*.json")):
+        room = Room.from_dict(json.loads(p.read_text(encoding="utf-8")))
+        rooms[room.title] = room
+
+    cache = SignatureCache(shard.cache_dir / CACHE_NAME if use_cache else None)
+    signatures = {t: cache.signature(t, r.section(DESCRIPTION_SECTION)) for t, r in rooms.items()}  # type: ignore[arg-type]
+    cache.save(list(rooms))
+
+    lines = [f"{shard.game}: {len(rooms)} room(s), {cache.misses} signature(s) computed, {cache.hits} cached"]
+    indistinguishable = 0
+    for edges in near_duplicate_clusters(signatures, threshold):
+        members = sorted({t for a, b, _ in edges for t in (a, b)})
+        lines.append(f"  cluster of {len(members)}:")
+        for t in members:
+            lines.append(f"    {t}  exits: {exit_signature(rooms[t])}")
+        for a, b, sim in sorted(edges):
+            same_exits = exit_signature(rooms[a]) == exit_signature(rooms[b])
+            if same_exits:
+                indistinguishable += 1
+            note = "  SAME EXIT SIGNATURE" if same_exits else ""
+            lines.append(f"      {a} ~ {b}: {sim:.2f}{note}")
+    return lines, indistinguishable
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Report near-duplicate room descriptions (MinHash + LSH).")
+    ap.add_argument("--config", type=Path, default=DEFAULT_CONFIG_PATH, help="Atlas config (default: atlas.json)")
+    ap.add_argument("--game", action="append", help="Only report the given game shard (repeatable)")
+    ap.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"Minimum estimated Jaccard similarity (default: {DEFAULT_THRESHOLD})",
+    )
+    ap.add_argument("--no-cache", action="store_true", help="Recompute every signature")
+    ap.add_argument(
+        "--fail-on-indistinguishable",
+        action="store_true",
+        help="Exit 1 if two near-duplicate rooms also have identical exit signatures",
+    )
+    args = ap.parse_args(argv)
+
+    try:
+        config = load_config(args.config)
+    except ConfigError as e:
+        print(f"[near-duplicates] CONFIG ERROR: {e}", file=sys.stderr)
+        return 2
+
+    total = 0
+    for shard in config.shards:
+        if args.game and shard.game not in args.game:
+            continue
+        if not shard.out_dir.is_dir():
+            continue
+        lines, indistinguishable = shard_report(shard, args.threshold, use_cache=not args.no_cache)
+        total += indistinguishable
+        print("\n".join(lines))
+
+    if args.fail_on_indistinguishable and total:
+        print(f"[near-duplicates] {total} near-duplicate pair(s) share an exit signature.", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+State-aware reachability over the compiled exit graph.
+
+Edges come from two places in each normalized room:
+
+- "Exits (as reported)": one edge per exit. If the normalizer extracted an
+  "Exit condition for <exit>: <text>" note for it, the edge is conditional.
+- "Hidden/conditional transitions": lines of the form
+  "[lead clause, ]MOVE [(text)] → [[Z1 - Target]] [text]", e.g.
+  "D → [[Z1 - Cellar]] (only after trapdoor opened)".
+
+Condition text is compiled into a world-state flag: stop words and one-way remarks are
+dropped, the remaining words are lightly stemmed and sorted, so "(once window is open)"
+and "(via open window)" both become the flag "open-window". Flags are numbered in sorted
+order and a world state is an int bitset; an edge is traversable when all of its required
+bits are set. `flags` lists the vocabulary for the current atlas.
+
+Some flags are values of one state variable rather than independent facts ("dark" and
+"lit" are two values of the light level). EXCLUSIVE_FLAGS lists those groups: a state
+holds at most one flag of each, --state rejects contradictory sets, `requires` never
+reports one, and --all-flags sets only the independent flags (add exclusive ones with
+--state, e.g. --all-flags --state lit).
+
+Queries (all memoized per (source, relevant state bits)):
+
+    python scripts/atlas_reachability.py flags
+    python scripts/atlas_reachability.py reachable "Z1 - West of House" "Z1 - Cellar" --state open-trapdoor
+    python scripts/atlas_reachability.py requires "Z1 - West of House" "Z1 - Cellar"
+    python scripts/atlas_reachability.py traps [--state ... | --all-flags]
+    python scripts/atlas_reachability.py scc [--state ... | --all-flags]
+
+`requires` runs a label-setting search over (room, flags-needed) and reports every
+minimal flag set under which the target is reachable. Link targets that have no room
+file are kept as "unmapped" nodes and excluded from trap reports.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+
+from atlas_build import DEFAULT_CONFIG_PATH, ConfigError, load_config
+from atlas_model import Room
+
+HIDDEN_SECTION = "Hidden/conditional transitions"
+EXIT_CONDITION_RE = re.compile(r"^Exit condition for (?P<exit>.+?): (?P<cond>.*)$")
+HIDDEN_EDGE_RE = re.compile(
+    r"^(?:(?P<lead>[^→\[,]*),\s*)?"
+    r"(?P<move>[A-Z]+(?: [A-Z]+)*)"
+    r"\s*(?:\((?P<pre>[^)]*)\))?\s*→\s*"
+    r"\[\[(?P<target>[^\]]+)\]\]"
+    r"(?P<rest>.*)$"
+)
+STALE_LINK_PREFIX_RE = re.compile(r"^Room\s*-\s*")
+ONE_WAY_RE = re.compile(r"one-way[^;,)]*|no return path[^;,)]*|upward return not possible", re.IGNORECASE)
+WORD_RE = re.compile(r"[a-z]+")
+STOP_WORDS = frozenset(
+    "a an and are at be been becomes available by has have if in is of on once only or "
+    "after before requires require the to via when while must".split()
+)
+EXCLUSIVE_FLAGS: Tuple[FrozenSet[str], ...] = (frozenset({"dark", "lit"}),)
+
+
+def _stem(word: str) -> str:
+    if len(word) > 5 and word.endswith("ed"):
+        return word[:-2]
+    if len(word) > 4 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def condition_flag(text: str) -> Optional[str]:
+    """Compile free condition text into a flag name, or None if it states no condition."""
+    text = ONE_WAY_RE.sub(" ", text.lower())
+    words = sorted({_stem(w) for w in WORD_RE.findall(text) if w not in STOP_WORDS})
+    return "-".join(words) or None
+
+
+class StateGraph:
+    """Directed exit graph whose edges carry a required-flags bitmask."""
+
+    def __init__(self, titles: Sequence[str], unmapped: Set[str], edges: List[Tuple[str, str, str, Optional[str]]]):
+        flag_names = sorted({flag for *_, flag in edges if flag})
+        self.flags: Dict[str, int] = {name: 1 << i for i, name in enumerate(flag_names)}
+        self.titles: List[str] = sorted(set(titles) | unmapped)
+        self.index: Dict[str, int] = {t: i for i, t in enumerate(self.titles)}
+        self.unmapped = frozenset(self.index[t] for t in unmapped)
+        self.adj: List[List[Tuple[int, int]]] = [[] for _ in self.titles]
+        self.labels: Dict[Tuple[int, int, int], List[str]] = {}
+        self.relevant = 0
+        for src, dst, label, flag in edges:
+            mask = self.flags[flag] if flag else 0
+            key = (self.index[src], self.index[dst], mask)
+            if key not in self.labels:
+                self.adj[key[0]].append((key[1], mask))
+                self.labels[key] = []
+            if label not in self.labels[key]:
+                self.labels[key].append(label)
+            self.relevant |= mask
+        self.exclusive: List[int] = []
+        for group in EXCLUSIVE_FLAGS:
+            group_mask = sum(self.flags[name] for name in group if name in self.flags)
+            if bin(group_mask).count("1") > 1:
+                self.exclusive.append(group_mask)
+        self.all_flags = self.relevant & ~sum(self.exclusive)
+        self._reach = lru_cache(maxsize=None)(self._reachable_uncached)
+
+    def consistent(self, mask: int) -> bool:
+        """False if mask holds two values of one exclusive group (e.g. dark and lit)."""
+        return all(bin(mask & group).count("1") <= 1 for group in self.exclusive)
+
+    def state(self, names: Iterable[str]) -> int:
+        mask = 0
+        for name in names:
+            if name not in self.flags:
+                raise KeyError(f"Unknown flag {name!r} (see the 'flags' command)")
+            mask |= self.flags[name]
+        if not self.consistent(mask):
+            raise ValueError(f"Contradictory flags: {self.describe_state(mask)}")
+        return mask
+
+    def describe_state(self, mask: int) -> str:
+        names = [n for n, bit in self.flags.items() if mask & bit]
+        return ", ".join(names) if names else "(no flags)"
+
+    def node(self, title: str) -> int:
+        try:
+            return self.index[title]
+        except KeyError:
+            raise KeyError(f"Unknown room {title!r}") from None
+
+    # -- reachability ---------------------------------------------------------
+
+    def reachable(self, src: int, state: int) -> FrozenSet[int]:
+        return self._reach(src, state & self.relevant)
+
+    def _reachable_uncached(self, src: int, state: int) -> FrozenSet[int]:
+        seen = {src}
+        stack = [src]
+        while stack:
+            u = stack.pop()
+            for v, mask in self.adj[u]:
+                if v not in seen and mask & ~state == 0:
+                    seen.add(v)
+                    stack.append(v)
+        return frozenset(seen)
+
+    def minimal_requirements(self, src: int, dst: int) -> List[int]:
+        """All minimal consistent flag sets under which dst is reachable from src (label-setting search)."""
+        labels: Dict[int, List[int]] = {src: [0]}
+        queue = [(src, 0)]
+        while queue:
+            u, need = queue.pop()
+            if need not in labels.get(u, ()):
+                continue  # superseded by a smaller label
+            for v, mask in self.adj[u]:
+                cand = need | mask
+                if not self.consistent(cand):
+                    continue  # the route needs two values of one state variable
+                current = labels.setdefault(v, [])
+                if any(m & cand == m for m in current):
+                    continue  # an existing label needs no more flags than cand
+                current[:] = [m for m in current if m & cand != cand]
+                current.append(cand)
+                queue.append((v, cand))
+        return sorted(labels.get(dst, []), key=lambda m: (bin(m).count("1"), m))
+
+    # -- components -----------------------------------------------------------
+
+    def sccs(self, state: int) -> List[List[int]]:
+        """Strongly connected components under `state` (iterative Tarjan)."""
+        state &= self.relevant
+        n = len(self.titles)
+        index = [-1] * n
+        low = [0] * n
+        on_stack = [False] * n
+        stack: List[int] = []
+        out: List[List[int]] = []
+        counter = 0
+
+        for root in range(n):
+            if index[root] != -1:
+                continue
+            work = [(root, 0)]
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            while work:
+                u, i = work[-1]
+                edges = self.adj[u]
+                while i < len(edges) and edges[i][1] & ~state:
+                    i += 1
+                if i < len(edges):
+                    work[-1] = (u, i + 1)
+                    v = edges[i][0]
+                    if index[v] == -1:
+                        index[v] = low[v] = counter
+                        counter += 1
+                        stack.append(v)
+                        on_stack[v] = True
+                        work.append((v, 0))
+                    elif on_stack[v]:
+                        low[u] = min(low[u], index[v])
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[u])
+                if low[u] == index[u]:
+                    comp = []
+                    while True:
+                        w = stack.pop()
+                        on_stack[w] = False
+                        comp.append(w)
+                        if w == u:
+                            break
+                    out.append(sorted(comp))
+        return out
+
+    def traps(self, state: int) -> List[List[int]]:
+        """Sink components you can enter but never leave under `state` (unmapped targets excluded)."""
+        state &= self.relevant
+        comps = self.sccs(state)
+        comp_of = {}
+        for ci, comp in enumerate(comps):
+            for u in comp:
+                comp_of[u] = ci
+        leaves = [False] * len(comps)
+        entered = [False] * len(comps)
+        for u in range(len(self.titles)):
+            for v, mask in self.adj[u]:
+                if mask & ~state or comp_of[u] == comp_of[v]:
+                    continue
+                leaves[comp_of[u]] = True
+                entered[comp_of[v]] = True
+        return [
+            comp
+            for ci, comp in enumerate(comps)
+            if entered[ci] and not leaves[ci] and not all(u in self.unmapped for u in comp)
+        ]
+
+
+def edges_for_room(room: Room, game: str) -> List[Tuple[str, str, str, Optional[str]]]:
+    conditions: Dict[str, str] = {}
+    hidden: List[Tuple[str, str, str]] = []
+
+    for line in room.section(HIDDEN_SECTION):
+        m = EXIT_CONDITION_RE.match(line)
+        if m:
+            conditions[m.group("exit")] = m.group("cond")
+            continue
+        m = HIDDEN_EDGE_RE.match(line)
+        if m:
+            target = STALE_LINK_PREFIX_RE.sub(f"{game} - ", m.group("target").strip())
+            cond = " ".join(filter(None, (m.group("lead"), m.group("pre"), m.group("rest"))))
+            hidden.append((m.group("move"), target, cond))
+
+    edges = []
+    for e in room.exits:
+        edges.append((room.title, e.target, e.direction.value, condition_flag(conditions.get(str(e), ""))))
+    for move, target, cond in hidden:
+        edges.append((room.title, target, move, condition_flag(cond)))
+    return edges
+
+
+def load_graph(config_path: Path, game: Optional[str]) -> StateGraph:
+    config = load_config(config_path)
+    shards = [s for s in config.shards if game is None or s.game == game]
+    if not shards:
+        raise ConfigError(f"No shard for game {game!r}")
+    shard = shards[0]
+
+    titles: List[str] = []
+    edges: List[Tuple[str, str, str, Optional[str]]] = []
+    for p in sorted(shard.out_dir.glob("*.json")):
+        room = Room.from_dict(json.loads(p.read_text(encoding="utf-8")))
+        titles.append(room.title)
+        edges.extend(edges_for_room(room, shard.game))
+
+    known = set(titles)
+    unmapped = {dst for _, dst, _, _ in edges if dst not in known}
+    return StateGraph(titles, unmapped, edges)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="State-aware reachability over the atlas exit graph.")
+    ap.add_argument("--config", type=Path, default=DEFAULT_CONFIG_PATH, help="Atlas config (default: atlas.json)")
+    ap.add_argument("--game", default=None, help="Game shard (default: first shard in atlas.json)")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    def add_state(p: argparse.ArgumentParser) -> None:
+        p.add_argument("--state", default="", help="Comma-separated flags that hold (default: none)")
+        p.add_argument(
+            "--all-flags", action="store_true", help="Assume every independent flag holds (exclusive ones via --state)"
+        )
+
+    sub.add_parser("flags", help="List condition flags and the edges they gate")
+    p = sub.add_parser("reachable", help="Is TO reachable from FROM under a state?")
+    p.add_argument("src", metavar="FROM")
+    p.add_argument("dst", metavar="TO")
+    add_state(p)
+    p = sub.add_parser("requires", help="Minimal flag sets under which TO is reachable from FROM")
+    p.add_argument("src", metavar="FROM")
+    p.add_argument("dst", metavar="TO")
+    add_state(sub.add_parser("traps", help="One-way traps: components you can enter but not leave"))
+    add_state(sub.add_parser("scc", help="Strongly connected components (size > 1)"))
+    args = ap.parse_args(argv)
+
+    try:
+        graph = load_graph(args.config, args.game)
+        state = graph.all_flags if getattr(args, "all_flags", False) else 0
+        if getattr(args, "state", ""):
+            state |= graph.state(f.strip() for f in args.state.split(",") if f.strip())
+
+        if args.command == "flags":
+            for name, bit in graph.flags.items():
+                gated = [
+                    f"{graph.titles[u]} {'/'.join(labels)} → {graph.titles[v]}"
+                    for (u, v, mask), labels in graph.labels.items()
+                    if mask == bit
+                ]
+                print(f"{name}:")
+                for g in gated:
+                    print(f"  {g}")
+            return 0
+
+        if args.command == "reachable":
+            src, dst = graph.node(args.src), graph.node(args.dst)
+            ok = dst in graph.reachable(src, state)
+            print(f"{'REACHABLE' if ok else 'NOT REACHABLE'} under {graph.describe_state(state)}")
+            return 0 if ok else 1
+
+        if args.command == "requires":
+            reqs = graph.minimal_requirements(graph.node(args.src), graph.node(args.dst))
+            if not reqs:
+                print("Not reachable under any state.")
+                return 1
+            for mask in reqs:
+                print(graph.describe_state(mask))
+            return 0
+
+        comps = graph.traps(state) if args.command == "traps" else [c for c in graph.sccs(state) if len(c) > 1]
+        print(f"{len(comps)} {'trap(s)' if args.command == 'traps' else 'component(s)'} under {graph.describe_state(state)}")
+        for comp in sorted(comps, key=lambda c: (-len(c), graph.titles[c[0]])):
+            names = [graph.titles[u] + (" (unmapped)" if u in graph.unmapped else "") for u in comp]
+            print(f"  [{len(comp)}] " + ", ".join(names))
+        return 0
+
+    except (ConfigError, KeyError, ValueError) as e:
+        print(f"[reachability] ERROR: {e.args[0] if e.args else e}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Internal ID registry (one per game shard, registry/<game>.json by default).
+
+meta/Indexing protocol.md: Internal IDs (Z1-R-###) are sequential per game and never
+reused. The normalizer only canonicalizes each ID on its own, so the registry records
+the global picture:
+
+    {
+      "game": "Z1",
+      "next": 91,                               # next number allocate-next-id hands out
+      "ids": {"Z1-R-001": "Z1 - West of House", ...},
+      "reserved": ["Z1-R-091"],                 # allocated, not yet used by a room
+      "retired": {"Z1-R-071": null, ...},       # no longer used; last title (null if never recorded)
+      "fingerprints": {"Z1-R-001": "03f1...", ...}  # sketch of each room's description
+    }
+
+reconcile() checks the compiled rooms against the registry in one pass with dict/set
+lookups only:
+
+- every ID is well-formed ({game}-R-###) and used by exactly one room
+- retired IDs are not reused
+- IDs new to the registry were reserved by allocate-next-id, or continue the sequence
+  from "next" without gaps
+- an ID that now sits on a different title is a rename only if the old title is gone
+  and the description is still similar (estimated Jaccard similarity of its word
+  3-grams at least RENAME_MIN_SIMILARITY); otherwise the ID is being reused for
+  another room, which is reported
+
+and returns the updated registry (new IDs recorded, vanished IDs retired, renamed rooms
+keep their ID). On first use, gaps below the highest ID are recorded as retired.
+
+    python scripts/atlas_registry.py check | update | allocate-next-id | lookup ID_OR_TITLE
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from atlas_build import DEFAULT_CONFIG_PATH, ConfigError, Shard, load_config
+
+INTERNAL_ID_FIELD = "Internal ID"
+DESCRIPTION_SECTION = "Description (verbatim)"
+
+# Bottom-k sketch of the description's shingle hashes. On the current atlas unrelated
+# rooms score <= 0.2 (the Maze / Coal Mine families aside), while changing a word or a
+# sentence of a description keeps it at 0.5 or above.
+FINGERPRINT_SIZE = 16
+RENAME_MIN_SIMILARITY = 0.4
+
+
+@lru_cache(maxsize=None)
+def _id_re(game: str) -> "re.Pattern[str]":
+    return re.compile(rf"^{re.escape(game)}-R-(\d{{3,}})$")
+
+
+def format_id(game: str, number: int) -> str:
+    return f"{game}-R-{number:03d}"
+
+
+def description_fingerprint(description: str) -> str:
+    """The FINGERPRINT_SIZE smallest 32-bit hashes of the description's word 3-grams, as hex."""
+    from atlas_near_duplicates import shingles
+
+    hashes = {
+        int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest(), "big")
+        for shingle in shingles(description)
+    }
+    return "".join(f"{h:08x}" for h in sorted(hashes)[:FINGERPRINT_SIZE])
+
+
+def fingerprint_similarity(a: str, b: str) -> float:
+    """Estimated Jaccard similarity of two descriptions from their bottom-k sketches."""
+    sa = {int(a[i:i + 8], 16) for i in range(0, len(a), 8)}
+    sb = {int(b[i:i + 8], 16) for i in range(0, len(b), 8)}
+    smallest = sorted(sa | sb)[:FINGERPRINT_SIZE]
+    if not smallest:
+        return 1.0
+    return sum(1 for h in smallest if h in sa and h in sb) / len(smallest)
+
+
+@dataclass
+class Registry:
+    game: str
+    next: int = 1
+    ids: Dict[str, str] = field(default_factory=dict)                  # id -> title
+    reserved: List[str] = field(default_factory=list)
+    retired: Dict[str, Optional[str]] = field(default_factory=dict)    # id -> last title
+    fingerprints: Dict[str, str] = field(default_factory=dict)         # id -> description sketch
+    _by_title: Optional[Dict[str, str]] = field(default=None, repr=False, compare=False)
+
+    def title_for(self, internal_id: str) -> Optional[str]:
+        return self.ids.get(internal_id)
+
+    def id_for(self, title: str) -> Optional[str]:
+        if self._by_title is None:
+            self._by_title = {t: i for i, t in self.ids.items()}
+        return self._by_title.get(title)
+
+    def allocate(self) -> str:
+        internal_id = format_id(self.game, self.next)
+        self.next += 1
+        self.reserved.append(internal_id)
+        return internal_id
+
+    def to_dict(self) -> Dict[str, object]:
+        key = lambda i: (len(i), i)  # noqa: E731 - numeric order for Z1-R-999 < Z1-R-1000
+        return {
+            "game": self.game,
+            "next": self.next,
+            "ids": {i: self.ids[i] for i in sorted(self.ids, key=key)},
+            "reserved": sorted(self.reserved, key=key),
+            "retired": {i: self.retired[i] for i in sorted(self.retired, key=key)},
+            "fingerprints": {i: self.fingerprints[i] for i in sorted(self.fingerprints, key=key)},
+        }
+
+
+def load_registry(path: Path, game: str) -> Tuple[Registry, bool]:
+    """Returns (registry, existed). A missing file yields an empty registry."""
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return Registry(game=game), False
+    except ValueError as e:
+        raise ConfigError(f"Registry JSON is invalid ({path}): {e}") from e
+    if data.get("game") != game:
+        raise ConfigError(f"Registry {path} is for game {data.get('game')!r}, expected {game!r}")
+    return (
+        Registry(
+            game=game,
+            next=int(data.get("next", 1)),
+            ids=dict(data.get("ids", {})),
+            reserved=list(data.get("reserved", [])),
+            retired=dict(data.get("retired", {})),
+            fingerprints=dict(data.get("fingerprints", {})),
+        ),
+        True,
+    )
+
+
+def save_registry(path: Path, registry: Registry) -> bool:
+    """Write only if the content changed. Returns True if written."""
+    data = json.dumps(registry.to_dict(), ensure_ascii=False, indent=2) + "\n"
+    try:
+        if path.read_text(encoding="utf-8") == data:
+            return False
+    except OSError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(data, encoding="utf-8")
+    tmp.replace(path)
+    return True
+
+
+def reconcile(
+    registry: Registry, rooms: Iterable[Tuple[str, str, str]], *, bootstrap: bool = False
+) -> Tuple[Registry, List[str]]:
+    """
+    rooms: (title, Internal ID, description) triples. Returns (updated registry, problems).
+    The first room to claim a duplicated ID keeps it; IDs with problems are not recorded
+    (a reused ID keeps its previous room), so they keep failing until fixed.
+    """
+    game = registry.game
+    id_re = _id_re(game)
+    reserved = set(registry.reserved)
+    rooms = list(rooms)
+    titles = {title for title, _, _ in rooms}
+    seen: Dict[str, str] = {}          # every well-formed ID claimed this pass
+    accepted: Dict[str, str] = {}      # the ones recorded in the updated registry
+    fingerprints: Dict[str, str] = {}
+    fresh: List[Tuple[int, str, str]] = []  # new, unreserved IDs: must continue the sequence
+    highest = 0
+    problems: List[str] = []
+
+    for title, internal_id, description in rooms:
+        m = id_re.match(internal_id or "")
+        if not m:
+            problems.append(f"{title}: Internal ID {internal_id!r} is not of the form {game}-R-###")
+            continue
+        number = int(m.group(1))
+        if internal_id in seen:
+            problems.append(f"{title}: duplicate Internal ID {internal_id} (already used by {seen[internal_id]})")
+            continue
+        seen[internal_id] = title
+        fingerprint = description_fingerprint(description)
+
+        previous = registry.ids.get(internal_id)
+        if previous is not None and previous != title and not bootstrap:
+            recorded = registry.fingerprints.get(internal_id)
+            if previous in titles:
+                reason = f"{previous!r} still exists"
+            elif recorded is None:
+                reason = f"no description fingerprint is recorded for {previous!r}"
+            elif fingerprint_similarity(recorded, fingerprint) < RENAME_MIN_SIMILARITY:
+                reason = f"the description does not match {previous!r}"
+            else:
+                reason = None  # a rename: same room, new title
+            if reason is not None:
+                problems.append(
+                    f"{title}: Internal ID {internal_id} belongs to {previous!r} and is being reused "
+                    f"({reason}); use allocate-next-id"
+                )
+                accepted[internal_id] = previous
+                if recorded is not None:
+                    fingerprints[internal_id] = recorded
+                highest = max(highest, number)
+                continue
+
+        if bootstrap or internal_id in registry.ids or internal_id in reserved:
+            accepted[internal_id] = title
+            fingerprints[internal_id] = fingerprint
+            highest = max(highest, number)
+        elif internal_id in registry.retired:
+            problems.append(f"{title}: Internal ID {internal_id} is retired and must not be reused")
+        else:
+            fresh.append((number, internal_id, title))
+            fingerprints[internal_id] = fingerprint
+
+    expected = registry.next
+    for number, internal_id, title in sorted(fresh):
+        if number != expected:
+            problems.append(
+                f"{title}: Internal ID {internal_id} was not allocated in sequence "
+                f"(expected {format_id(game, expected)}; use allocate-next-id)"
+            )
+            continue
+        accepted[internal_id] = title
+        highest = max(highest, number)
+        expected += 1
+
+    retired = dict(registry.retired)
+    for internal_id, title in registry.ids.items():
+        if internal_id not in seen:
+            retired[internal_id] = title
+    if bootstrap:
+        for number in range(1, highest):
+            internal_id = format_id(game, number)
+            if internal_id not in seen:
+                retired.setdefault(internal_id, None)
+
+    updated = Registry(
+        game=game,
+        next=max(registry.next, highest + 1),
+        ids=accepted,
+        reserved=[i for i in registry.reserved if i not in seen],
+        retired={i: t for i, t in retired.items() if i not in accepted},
+        fingerprints={i: f for i, f in fingerprints.items() if i in accepted},
+    )
+    return updated, problems
+
+
+def shard_rooms(shard: Shard) -> List[Tuple[str, str, str]]:
+    """(title, Internal ID, description) for every compiled room of a shard, in output order."""
+    rooms = []
+    for p in sorted(shard.out_dir.glob("*.json")):
+        obj = json.loads(p.read_text(encoding="utf-8"))
+        sections = obj["sections"]
+        rooms.append(
+            (
+                obj["title"],
+                sections.get("Mapping notes", {}).get(INTERNAL_ID_FIELD, ""),
+                sections.get(DESCRIPTION_SECTION, ""),
+            )
+        )
+    return rooms
+
+
+def update_shard_registry(shard: Shard, *, write: bool = True) -> Tuple[Registry, List[str]]:
+    registry, existed = load_registry(shard.registry, shard.game)
+    updated, problems = reconcile(registry, shard_rooms(shard), bootstrap=not existed)
+    if write:
+        save_registry(shard.registry, updated)
+    return updated, problems
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Internal ID registry per game shard.")
+    ap.add_argument("command", choices=["check", "update", "allocate-next-id", "lookup"])
+    ap.add_argument("key", nargs="?", help="lookup: an Internal ID or a room title")
+    ap.add_argument("--config", type=Path, default=DEFAULT_CONFIG_PATH, help="Atlas config (default: atlas.json)")
+    ap.add_argument("--game", action="append", help="Only the given game shard (repeatable)")
+    args = ap.parse_args(argv)
+
+    try:
+        config = load_config(args.config)
+    except ConfigError as e:
+        print(f"[registry] CONFIG ERROR: {e}", file=sys.stderr)
+        return 2
+    shards = [s for s in config.shards if not args.game or s.game in args.game]
+
+    if args.command in ("allocate-next-id", "lookup"):
+        if len(shards) != 1:
+            print(f"[registry] ERROR: {args.command} needs exactly one shard (use --game).", file=sys.stderr)
+            return 2
+        shard = shards[0]
+        try:
+            registry, existed = load_registry(shard.registry, shard.game)
+        except ConfigError as e:
+            print(f"[registry] ERROR: {e}", file=sys.stderr)
+            return 2
+        if not existed:
+            print(f"[registry] ERROR: {shard.registry} not found; run 'update' first.", file=sys.stderr)
+            return 1
+        if args.command == "allocate-next-id":
+            print(registry.allocate())
+            save_registry(shard.registry, registry)
+            return 0
+        if not args.key:
+            ap.error("lookup needs an Internal ID or a room title")
+        found = registry.title_for(args.key) or registry.id_for(args.key)
+        if found is None:
+            print(f"[registry] Not found: {args.key!r}", file=sys.stderr)
+            return 1
+        print(found)
+        return 0
+
+    failed = False
+    for shard in shards:
+        if not shard.out_dir.is_dir():
+            continue
+        try:
+            registry, problems = update_shard_registry(shard, write=args.command == "update")
+        except ConfigError as e:
+            print(f"[registry] ERROR: {e}", file=sys.stderr)
+            return 2
+        for msg in problems:
+            print(f"[registry] {shard.game}: {msg}", file=sys.stderr)
+        failed = failed or bool(problems)
+        print(
+            f"[registry] {shard.game}: {len(registry.ids)} ID(s), {len(registry.retired)} retired, "
+            f"next {format_id(shard.game, registry.next)}"
+        )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
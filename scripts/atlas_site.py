@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+Static HTML site for the compiled atlas.
+
+Reads normalized/*.json of every shard in atlas.json (never the Markdown) and writes
+
+    build/site/index.html          every room per game, with exit counts
+    build/site/map.svg             overview map; rooms link to their pages
+    build/site/rooms/<slug>.html   one page per room: sections, linked exits, "reached from"
+
+Each page is rendered from a self-contained job (the room JSON, the hrefs of the rooms
+it links to, its incoming exits). The sha256 of that job is recorded in
+build/site/.site-manifest.json, so a page is only re-rendered when something it shows
+changed: after a one-room edit that is the room itself and the pages of its exit
+neighbours. Dirty pages are rendered in a process pool once there are enough of them to
+pay for the workers. Pages of rooms that no longer exist are removed.
+
+Every file is written with precompressed siblings for static servers
+(gzip_static / brotli_static): <file>.gz always, <file>.br when the brotli module is
+installed. A file with a missing sibling counts as changed, so deleting one is enough to
+get it back.
+
+Map positions come from canvas/Zork - World.canvas; rooms the canvas does not place yet
+are positioned the way atlas_canvas_sync.py would add them (next to their exit
+neighbours), without touching the canvas file.
+
+    python scripts/atlas_site.py [--out build/site] [--force] [--jobs N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import html
+import json
+import os
+import re
+import sys
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import atlas_metrics as metrics
+from atlas_build import DEFAULT_CONFIG_PATH, AtlasConfig, ConfigError, load_config
+from atlas_canvas_sync import DEFAULT_CANVAS_PATH, NODE_SIZE, room_graph, room_prefixes, sync_canvas
+from atlas_model import EXITS_SECTION, parse_exit_line
+
+DEFAULT_OUT_DIR = Path("build/site")
+MANIFEST_NAME = ".site-manifest.json"
+RENDERER_VERSION = "1"  # bump when the page template changes, to re-render every page
+POOL_MIN_PAGES = 24     # below this, worker start-up costs more than it saves
+
+SLUG_RE = re.compile(r"[^a-z0-9]+")
+LINK_RE = re.compile(r"\[\[(?P<target>[^\[\]]+)\]\]")
+
+STYLE = """\
+body{font:16px/1.5 Georgia,serif;max-width:46em;margin:2em auto;padding:0 1em;color:#222;background:#fdfcf8}
+h1{font-size:1.7em;margin-bottom:.2em}h2{font-size:1.1em;margin-top:1.6em;border-bottom:1px solid #ddd}
+nav{font-size:.9em}.pre{white-space:pre-wrap}.missing{color:#a33}.dir{font-family:monospace;font-weight:bold}
+dl{display:grid;grid-template-columns:max-content auto;gap:.2em 1em}dt{font-weight:bold}dd{margin:0}
+td{padding:.1em .8em .1em 0}"""
+
+
+def slugify(title: str) -> str:
+    return SLUG_RE.sub("-", title.lower()).strip("-") or "room"
+
+
+# ----------------------------
+# Rendering (runs in workers; inputs are plain JSON values)
+# ----------------------------
+
+def _page(title: str, body: List[str], root: str) -> str:
+    return "\n".join(
+        [
+            "<!DOCTYPE html>",
+            '<html lang="en">',
+            "<head>",
+            '<meta charset="utf-8">',
+            '<meta name="viewport" content="width=device-width, initial-scale=1">',
+            f"<title>{html.escape(title)}</title>",
+            f"<style>{STYLE}</style>",
+            "</head>",
+            "<body>",
+            f'<nav><a href="{root}index.html">Index</a> · <a href="{root}map.svg">Map</a></nav>',
+            *body,
+            "</body>",
+            "</html>",
+            "",
+        ]
+    )
+
+
+def _link(title: str, links: Dict[str, Optional[str]]) -> str:
+    href = links.get(title)
+    if href is None:
+        return f'<span class="missing" title="No such room">{html.escape(title)}</span>'
+    return f'<a href="{html.escape(href)}">{html.escape(title)}</a>'
+
+
+def _linkify(text: str, links: Dict[str, Optional[str]]) -> str:
+    out: List[str] = []
+    pos = 0
+    for m in LINK_RE.finditer(text):
+        out.append(html.escape(text[pos:m.start()]))
+        out.append(_link(m.group("target"), links))
+        pos = m.end()
+    out.append(html.escape(text[pos:]))
+    return "".join(out)
+
+
+def _section_html(name: str, value: Any, links: Dict[str, Optional[str]]) -> List[str]:
+    if isinstance(value, str):
+        return [f'<p class="pre">{_linkify(value, links)}</p>'] if value else []
+    if isinstance(value, dict):
+        out = ["<dl>"]
+        for key, val in value.items():
+            if isinstance(val, list):
+                val = "\n".join(val)
+            out.append(f'<dt>{html.escape(key)}</dt><dd class="pre">{_linkify(str(val), links)}</dd>')
+        out.append("</dl>")
+        return out
+    if not value:
+        return []
+    items = []
+    for line in value:
+        if name == EXITS_SECTION:
+            try:
+                e = parse_exit_line(line)
+            except ValueError:
+                items.append(f"<li>{_linkify(line, links)}</li>")
+                continue
+            items.append(f'<li><span class="dir">{html.escape(e.direction.value)}</span> → {_link(e.target, links)}</li>')
+        else:
+            items.append(f"<li>{_linkify(line, links)}</li>")
+    return ["<ul>", *items, "</ul>"]
+
+
+def render_room_page(job: Dict[str, Any]) -> str:
+    room = job["room"]
+    links: Dict[str, Optional[str]] = job["links"]
+    body = [f"<h1>{html.escape(room['title'])}</h1>"]
+    for name in room["section_order"]:
+        section = _section_html(name, room["sections"].get(name), links)
+        if section:
+            body.append(f"<h2>{html.escape(name)}</h2>")
+            body.extend(section)
+    if job["incoming"]:
+        body.append("<h2>Reached from</h2>")
+        body.append("<ul>")
+        for source, direction in job["incoming"]:
+            body.append(f'<li>{_link(source, links)} <span class="dir">{html.escape(direction)}</span></li>')
+        body.append("</ul>")
+    return _page(room["title"], body, "../")
+
+
+@lru_cache(maxsize=None)
+def _brotli() -> Any:
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def sibling_paths(path: Path) -> List[Path]:
+    """The precompressed siblings written next to path."""
+    suffixes = [".gz", ".br"] if _brotli() is not None else [".gz"]
+    return [path.with_name(path.name + suffix) for suffix in suffixes]
+
+
+def write_with_siblings(path: Path, text: str) -> int:
+    """Write path, path.gz and (if brotli is installed) path.br atomically. Returns bytes written."""
+    data = text.encode("utf-8")
+    variants = [(path, data), (path.with_name(path.name + ".gz"), gzip.compress(data, compresslevel=9, mtime=0))]
+    brotli = _brotli()
+    if brotli is not None:
+        variants.append((path.with_name(path.name + ".br"), brotli.compress(data, quality=11)))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    total = 0
+    for target, payload in variants:
+        tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(payload)
+        tmp.replace(target)
+        total += len(payload)
+    return total
+
+
+def build_page(args: Tuple[str, Dict[str, Any]]) -> int:
+    path, job = args
+    return write_with_siblings(Path(path), render_room_page(job))
+
+
+def remove_with_siblings(path: Path) -> None:
+    for target in (path, path.with_name(path.name + ".gz"), path.with_name(path.name + ".br")):
+        target.unlink(missing_ok=True)
+
+
+# ----------------------------
+# Site
+# ----------------------------
+
+def load_site_rooms(config: AtlasConfig) -> List[Tuple[str, Dict[str, Any]]]:
+    rooms: List[Tuple[str, Dict[str, Any]]] = []
+    for shard in config.shards:
+        for p in sorted(shard.out_dir.glob("*.json")):
+            rooms.append((shard.game, json.loads(p.read_text(encoding="utf-8"))))
+    return rooms
+
+
+def assign_slugs(titles: List[str]) -> Dict[str, str]:
+    slugs: Dict[str, str] = {}
+    used: set = set()
+    for title in sorted(titles):
+        base = slug = slugify(title)
+        n = 2
+        while slug in used:
+            slug = f"{base}-{n}"
+            n += 1
+        used.add(slug)
+        slugs[title] = slug
+    return slugs
+
+
+def page_jobs(rooms: List[Tuple[str, Dict[str, Any]]], slugs: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+    """rooms/<slug>.html -> render job (everything the page shows, nothing else)."""
+    incoming: Dict[str, List[Tuple[str, str]]] = defaultdict(list)
+    for _, room in rooms:
+        for line in room["sections"].get(EXITS_SECTION, []):
+            try:
+                e = parse_exit_line(line)
+            except ValueError:
+                continue
+            if e.target != room["title"]:
+                incoming[e.target].append((room["title"], e.direction.value))
+
+    jobs: Dict[str, Dict[str, Any]] = {}
+    for _, room in rooms:
+        title = room["title"]
+        sources = sorted(set(incoming.get(title, ())))
+        referenced = set(LINK_RE.findall(json.dumps(room["sections"], ensure_ascii=False)))
+        referenced.update(source for source, _ in sources)
+        links = {t: (f"{slugs[t]}.html" if t in slugs else None) for t in sorted(referenced)}
+        jobs[f"rooms/{slugs[title]}.html"] = {"room": room, "links": links, "incoming": sources}
+    return jobs
+
+
+def job_digest(job: Dict[str, Any]) -> str:
+    payload = json.dumps(job, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"{RENDERER_VERSION}\0{payload}".encode("utf-8")).hexdigest()
+
+
+def render_index(rooms: List[Tuple[str, Dict[str, Any]]], slugs: Dict[str, str]) -> str:
+    by_game: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for game, room in rooms:
+        by_game[game].append(room)
+    body = ["<h1>Zork Cartographic Atlas</h1>", '<p><a href="map.svg">Overview map</a></p>']
+    for game in sorted(by_game):
+        body.append(f"<h2>{html.escape(game)} ({len(by_game[game])} rooms)</h2>")
+        body.append("<table>")
+        for room in sorted(by_game[game], key=lambda r: r["title"]):
+            exits = len(room["sections"].get(EXITS_SECTION, []))
+            body.append(
+                f'<tr><td><a href="rooms/{slugs[room["title"]]}.html">{html.escape(room["title"])}</a></td>'
+                f"<td>{exits} exit{'s' if exits != 1 else ''}</td></tr>"
+            )
+        body.append("</table>")
+    return _page("Zork Cartographic Atlas", body, "")
+
+
+def map_positions(
+    config: AtlasConfig, root: Path, rooms: List[Tuple[str, Dict[str, Any]]], canvas_path: Path
+) -> Tuple[Dict[str, Tuple[float, float]], List[Tuple[str, str]]]:
+    """Room title -> canvas (x, y) of its node's top-left corner, and undirected exit pairs."""
+    room_files, exit_edges = room_graph(config, root, rooms)
+    try:
+        canvas = json.loads(canvas_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        canvas = {"nodes": [], "edges": []}
+    sync_canvas(canvas, room_files, exit_edges, room_prefixes(config, root))
+
+    file_title = {f: Path(f).stem for f in room_files}
+    positions = {
+        file_title[n["file"]]: (n["x"], n["y"])
+        for n in canvas["nodes"]
+        if n.get("file") in file_title and "x" in n and "y" in n
+    }
+    pairs = sorted({tuple(sorted((file_title[s], file_title[t]))) for s, _, t in exit_edges})
+    return positions, pairs  # type: ignore[return-value]
+
+
+def render_map(positions: Dict[str, Tuple[float, float]], pairs: List[Tuple[str, str]], slugs: Dict[str, str]) -> str:
+    half = NODE_SIZE / 2
+    pad = NODE_SIZE / 2
+    xs = [x for x, _ in positions.values()] or [0]
+    ys = [y for _, y in positions.values()] or [0]
+    x0, y0 = min(xs) - pad, min(ys) - pad
+    width, height = max(xs) - min(xs) + NODE_SIZE + 2 * pad, max(ys) - min(ys) + NODE_SIZE + 2 * pad
+
+    out = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="{x0:g} {y0:g} {width:g} {height:g}" '
+        'font-family="Georgia,serif" font-size="40">',
+        "<title>Zork Cartographic Atlas</title>",
+        f'<rect x="{x0:g}" y="{y0:g}" width="{width:g}" height="{height:g}" fill="#fdfcf8"/>',
+        '<g stroke="#999" stroke-width="6">',
+    ]
+    for a, b in pairs:
+        if a in positions and b in positions:
+            (ax, ay), (bx, by) = positions[a], positions[b]
+            out.append(f'<line x1="{ax + half:g}" y1="{ay + half:g}" x2="{bx + half:g}" y2="{by + half:g}"/>')
+    out.append("</g>")
+    for title in sorted(positions):
+        x, y = positions[title]
+        label = title.split(" - ", 1)[-1]
+        out.append(
+            f'<a href="rooms/{slugs[title]}.html"><title>{html.escape(title)}</title>'
+            f'<rect x="{x:g}" y="{y:g}" width="{NODE_SIZE}" height="{NODE_SIZE}" rx="24" fill="#fff" stroke="#555" stroke-width="4"/>'
+            f'<text x="{x + half:g}" y="{y + half:g}" text-anchor="middle" dominant-baseline="middle">{html.escape(label)}</text></a>'
+        )
+    out.append("</svg>")
+    return "\n".join(out) + "\n"
+
+
+def _write_if_changed(path: Path, text: str) -> bool:
+    try:
+        if path.read_text(encoding="utf-8") == text and all(p.exists() for p in sibling_paths(path)):
+            return False
+    except OSError:
+        pass
+    write_with_siblings(path, text)
+    return True
+
+
+def build_site(config_path: Path, canvas_path: Path, out_dir: Path, *, force: bool = False, jobs: Optional[int] = None) -> Dict[str, int]:
+    config = load_config(config_path)
+    rooms = load_site_rooms(config)
+    slugs = assign_slugs([room["title"] for _, room in rooms])
+    pages = page_jobs(rooms, slugs)
+
+    manifest_path = out_dir / MANIFEST_NAME
+    try:
+        previous: Dict[str, str] = json.loads(manifest_path.read_text(encoding="utf-8"))["pages"]
+    except (OSError, ValueError, KeyError, TypeError):
+        previous = {}
+
+    digests = {rel: job_digest(job) for rel, job in pages.items()}
+    metrics.lap("load")
+    dirty = [
+        rel for rel in sorted(pages)
+        if force
+        or previous.get(rel) != digests[rel]
+        or not all(p.exists() for p in (out_dir / rel, *sibling_paths(out_dir / rel)))
+    ]
+    work = [(str(out_dir / rel), pages[rel]) for rel in dirty]
+    if len(work) >= POOL_MIN_PAGES and jobs != 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            written = sum(pool.map(build_page, work, chunksize=8))
+    else:
+        written = sum(build_page(w) for w in work)
+    metrics.lap("pages")
+
+    stale = sorted(previous.keys() - pages.keys())
+    for rel in stale:
+        remove_with_siblings(out_dir / rel)
+
+    index_written = _write_if_changed(out_dir / "index.html", render_index(rooms, slugs))
+    positions, pairs = map_positions(config, config_path.resolve().parent, rooms, canvas_path)
+    map_written = _write_if_changed(out_dir / "map.svg", render_map(positions, pairs, slugs))
+    metrics.lap("index+map")
+
+    if dirty or stale or previous.keys() != digests.keys():
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = manifest_path.with_name(MANIFEST_NAME + ".tmp")
+        tmp.write_text(json.dumps({"version": RENDERER_VERSION, "pages": digests}, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        tmp.replace(manifest_path)
+
+    metrics.count(
+        mode="force" if force else "incremental",
+        files=len(pages),
+        cache_hits=len(pages) - len(dirty),
+        cache_misses=len(dirty),
+        bytes_written=written,
+    )
+    return {
+        "pages": len(pages),
+        "rendered": len(dirty),
+        "skipped": len(pages) - len(dirty),
+        "removed": len(stale),
+        "bytes": written,
+        "index": int(index_written),
+        "map": int(map_written),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Render the compiled atlas as a static HTML site.")
+    ap.add_argument("--config", type=Path, default=DEFAULT_CONFIG_PATH, help="Atlas config (default: atlas.json)")
+    ap.add_argument("--canvas", type=Path, default=DEFAULT_CANVAS_PATH, help=f"Canvas with map positions (default: {DEFAULT_CANVAS_PATH})")
+    ap.add_argument("--out", type=Path, default=DEFAULT_OUT_DIR, help=f"Output directory (default: {DEFAULT_OUT_DIR})")
+    ap.add_argument("--force", action="store_true", help="Re-render every page")
+    ap.add_argument("--jobs", type=int, default=None, help="Worker processes (default: one per CPU)")
+    args = ap.parse_args(argv)
+
+    try:
+        stats = build_site(args.config, args.canvas, args.out, force=args.force, jobs=args.jobs)
+    except ConfigError as e:
+        print(f"[site] CONFIG ERROR: {e}", file=sys.stderr)
+        return 2
+    if not stats["pages"]:
+        print("[site] ERROR: No normalized JSON found; run the normalizer first.", file=sys.stderr)
+        return 1
+
+    print(
+        f"[site] {stats['pages']} page(s): {stats['rendered']} rendered, {stats['skipped']} unchanged, "
+        f"{stats['removed']} removed; index {'written' if stats['index'] else 'unchanged'}, "
+        f"map {'written' if stats['map'] else 'unchanged'} -> {args.out}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(metrics.timed(main, "site"))
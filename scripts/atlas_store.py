@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Shared content-addressed compile store, used across branches and worktrees.
+
+The per-shard compile cache (.atlas-cache/<game>/compile_cache.json) lives inside one
+working tree. This store sits in $XDG_CACHE_HOME/zork-atlas (override with
+ATLAS_STORE_DIR) and maps
+
+    sha256(normalizer fingerprint, schema sha256, file name, Markdown bytes)
+
+to the compiled room JSON, or to the parse error, plus the JSON Schema verdict once the
+pre-commit gate has validated it. Every tree on the machine shares it, so switching
+branches recompiles nothing that any tree has compiled before. The file name is part of
+the key because the title check compares H1 with the filename stem.
+
+Layout and concurrency:
+
+- one file per entry, v1/<2 hex>/<key>.json, written to a temp file and renamed into
+  place; readers never see a partial entry, and a concurrent identical write is harmless
+- a hit bumps the entry's mtime; eviction removes least recently used entries until the
+  store is below its size bound (ATLAS_STORE_MAX_MB, default 64), under an exclusive
+  flock on v1/.lock taken non-blocking, so parallel hook runs never wait on each other
+- unreadable or corrupt entries count as misses
+
+    python scripts/atlas_store.py stats | gc [--max-mb N] | clear
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: eviction runs unlocked
+    fcntl = None  # type: ignore[assignment]
+
+STORE_LAYOUT = "v1"
+DEFAULT_MAX_MB = 64
+EVICT_TO = 0.8  # evict down to this fraction of the bound, so eviction is not run on every write
+
+
+def default_store_dir() -> Path:
+    override = os.environ.get("ATLAS_STORE_DIR")
+    if override:
+        return Path(override)
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "zork-atlas"
+
+
+def default_max_bytes() -> int:
+    try:
+        return int(float(os.environ.get("ATLAS_STORE_MAX_MB", DEFAULT_MAX_MB)) * 1024 * 1024)
+    except ValueError:
+        return DEFAULT_MAX_MB * 1024 * 1024
+
+
+@dataclass
+class StoreEntry:
+    json: Optional[str]                 # rendered room JSON; None when the room failed to parse
+    error: Optional[str] = None         # ParseError message (without the path)
+    validation: Optional[str] = None    # JSON Schema verdict: "ok" or the error; None if not validated yet
+
+
+class CompileStore:
+    def __init__(self, root: Path, fingerprint: str, max_bytes: Optional[int] = None) -> None:
+        self.root = root / STORE_LAYOUT
+        self.fingerprint = fingerprint
+        self.max_bytes = default_max_bytes() if max_bytes is None else max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.written = 0
+
+    def key(self, md_name: str, md_bytes: bytes, schema_digest: str) -> str:
+        h = hashlib.sha256()
+        for part in (self.fingerprint, schema_digest, md_name):
+            h.update(part.encode("utf-8", "surrogateescape") + b"\0")
+        h.update(md_bytes)
+        return h.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / (key + ".json")
+
+    def get(self, key: str) -> Optional[StoreEntry]:
+        path = self._path(key)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            entry = StoreEntry(json=data["json"], error=data.get("error"), validation=data.get("validation"))
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError, KeyError, TypeError):
+            self.misses += 1
+            path.unlink(missing_ok=True)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass  # evicted concurrently; the entry we read is still valid
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, entry: StoreEntry) -> None:
+        path = self._path(key)
+        payload = {"json": entry.json, "error": entry.error, "validation": entry.validation}
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f".tmp-{os.getpid()}-{path.name}")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except OSError:
+            return  # the store is an optimization: a full or read-only disk only costs recompiles
+        self.written += 1
+
+    def entries(self) -> List[Tuple[float, int, Path]]:
+        """(mtime, size, path) of every entry."""
+        found: List[Tuple[float, int, Path]] = []
+        try:
+            buckets = list(os.scandir(self.root))
+        except OSError:
+            return found
+        for bucket in buckets:
+            if not bucket.is_dir():
+                continue
+            with os.scandir(bucket.path) as it:
+                for e in it:
+                    if e.name.endswith(".json"):
+                        try:
+                            st = e.stat()
+                        except OSError:
+                            continue
+                        found.append((st.st_mtime, st.st_size, Path(e.path)))
+        return found
+
+    def evict(self, max_bytes: Optional[int] = None) -> Tuple[int, int]:
+        """Drop least recently used entries while over the bound. Returns (entries, bytes) removed."""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            lock = open(self.root / ".lock", "w")
+        except OSError:
+            return 0, 0
+        with lock:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    return 0, 0  # another process is already evicting
+            entries = self.entries()
+            total = sum(size for _, size, _ in entries)
+            if total <= limit:
+                return 0, 0
+            target = int(limit * EVICT_TO)
+            removed = freed = 0
+            for _, size, path in sorted(entries):
+                if total - freed <= target:
+                    break
+                try:
+                    path.unlink()
+                except OSError:
+                    continue
+                removed += 1
+                freed += size
+            return removed, freed
+
+    def maybe_evict(self) -> None:
+        """Called after a run that wrote entries."""
+        if self.written:
+            self.evict()
+
+
+def open_store(fingerprint: str, root: Optional[Path] = None) -> CompileStore:
+    return CompileStore(root if root is not None else default_store_dir(), fingerprint)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Shared compile store maintenance.")
+    ap.add_argument("command", choices=["stats", "gc", "clear"])
+    ap.add_argument("--dir", type=Path, default=None, help="Store directory (default: $XDG_CACHE_HOME/zork-atlas)")
+    ap.add_argument("--max-mb", type=float, default=None, help="gc: size bound in MiB (default: ATLAS_STORE_MAX_MB or 64)")
+    args = ap.parse_args(argv)
+
+    store = CompileStore(args.dir if args.dir is not None else default_store_dir(), fingerprint="")
+
+    if args.command == "clear":
+        import shutil
+
+        shutil.rmtree(store.root, ignore_errors=True)
+        print(f"[atlas store] Cleared {store.root}")
+        return 0
+
+    if args.command == "gc":
+        limit = int(args.max_mb * 1024 * 1024) if args.max_mb is not None else None
+        removed, freed = store.evict(limit)
+        print(f"[atlas store] Evicted {removed} entr{'y' if removed == 1 else 'ies'} ({freed / 1024:.1f} KiB)")
+
+    entries = store.entries()
+    total = sum(size for _, size, _ in entries)
+    print(
+        f"[atlas store] {store.root}: {len(entries)} entr{'y' if len(entries) == 1 else 'ies'}, "
+        f"{total / 1024:.1f} KiB of {store.max_bytes / 1024 / 1024:.0f} MiB"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
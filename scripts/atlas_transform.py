@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Bulk transforms over every room in one pass.
+
+Rules run on the parsed room model (atlas_model.Room), not on raw text:
+
+- declarative rules from a JSON file, a list of objects:
+
+    {"op": "replace", "pattern": "[[Room - ", "replacement": "[[Z1 - "}
+    {"op": "replace", "section": "State notes", "pattern": "^lit$", "replacement": "Lit", "regex": true}
+    {"op": "map", "section": "State notes", "values": {"light": "Lit", "dark": "Dark"}, "ignore_case": true}
+    {"op": "fill", "section": "Hazards/NPCs", "value": ["(none)"]}
+
+  "section" is a heading, a list of headings or "*" (default). replace works on strings,
+  list items, exit lines and mapping-note values; map replaces whole items; fill sets a
+  list section that is empty or only placeholders ("when" overrides the placeholders).
+
+- Python rules from a .py file defining RULES, a list of callables Room -> Room
+  (return the room unchanged to skip it); Room.replace_section() builds the result.
+  An exception in a rule is reported against the room, naming the rule.
+
+Only rooms whose model changes are rewritten, and only the changed sections are
+re-rendered (canonical form, canonical order); other sections keep their bytes. Each
+rewrite is re-parsed and must give back the transformed model before anything is
+written. Files are processed in a process pool; nothing is written if any room fails,
+and each changed file is replaced atomically. Changed shards are recompiled afterwards.
+
+    python scripts/atlas_transform.py RULES.json|RULES.py [--dry-run] [--diff] [--jobs N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import difflib
+import importlib.util
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from atlas_build import DEFAULT_CONFIG_PATH, ConfigError, Shard, load_config
+from atlas_model import EXITS_SECTION, MappingNotes, Room, SectionValue, parse_exit_line, section_to_markdown
+from normalize_rooms_schema_authoritative import (
+    PLACEHOLDER_EXITS,
+    ParseError,
+    RoomSchema,
+    compile_rooms,
+    decode_markdown,
+    load_schema,
+    parse_exits,
+    parse_room_text,
+    schema_sha256,
+    split_into_blocks,
+)
+
+HIDDEN_SECTION = "Hidden/conditional transitions"
+PLACEHOLDER_ITEMS = PLACEHOLDER_EXITS | {"..."}
+
+Rule = Callable[[Room], Room]
+
+
+class TransformError(RuntimeError):
+    pass
+
+
+# ----------------------------
+# Declarative rules
+# ----------------------------
+
+def _sections(spec: Dict[str, Any], room: Room) -> Sequence[str]:
+    wanted = spec.get("section", "*")
+    if wanted == "*":
+        return room.order
+    names = [wanted] if isinstance(wanted, str) else list(wanted)
+    unknown = [n for n in names if n not in room.order]
+    if unknown:
+        raise TransformError(f"Unknown section(s) in rule {spec!r}: {unknown}")
+    return names
+
+
+def _map_value(value: SectionValue, fn: Callable[[str], str]) -> SectionValue:
+    if isinstance(value, str):
+        return fn(value)
+    if isinstance(value, MappingNotes):
+        return MappingNotes(tuple((k, fn(v)) for k, v in value.fields), tuple(fn(n) for n in value.notes))
+    if value and not isinstance(value[0], str):  # exits
+        try:
+            return tuple(parse_exit_line(fn(str(e))) for e in value)
+        except ValueError as e:
+            raise TransformError(f"Rule produced an invalid exit line: {e}") from e
+    return tuple(fn(v) for v in value)  # type: ignore[arg-type]
+
+
+def _section_rule(spec: Dict[str, Any], edit: Callable[[SectionValue], SectionValue]) -> Rule:
+    def rule(room: Room) -> Room:
+        for name in _sections(spec, room):
+            old = room.section(name)
+            new = edit(old)
+            if new != old:
+                room = room.replace_section(name, new)
+        return room
+
+    return rule
+
+
+def compile_rule(spec: Dict[str, Any]) -> Rule:
+    op = spec.get("op")
+    if op == "replace":
+        pattern = spec["pattern"]
+        replacement = spec.get("replacement", "")
+        if spec.get("regex"):
+            compiled = re.compile(pattern)
+            sub: Callable[[str], str] = lambda s: compiled.sub(replacement, s)  # noqa: E731
+        else:
+            sub = lambda s: s.replace(pattern, replacement)  # noqa: E731
+        return _section_rule(spec, lambda v: _map_value(v, sub))
+
+    if op == "map":
+        fold = (lambda s: s.casefold()) if spec.get("ignore_case") else (lambda s: s)
+        table = {fold(k): v for k, v in spec["values"].items()}
+        return _section_rule(spec, lambda v: _map_value(v, lambda s: table.get(fold(s), s)))
+
+    if op == "fill":
+        when = set(spec.get("when", PLACEHOLDER_ITEMS))
+        fill = tuple(spec["value"])
+
+        def edit(value: SectionValue) -> SectionValue:
+            if isinstance(value, tuple) and all(isinstance(v, str) and v in when for v in value):
+                return fill
+            return value
+
+        return _section_rule(spec, edit)
+
+    raise TransformError(f"Unknown rule op {op!r} in {spec!r}")
+
+
+def load_rules(path: Path) -> List[Rule]:
+    if path.suffix == ".json":
+        try:
+            specs = json.loads(path.read_text(encoding="utf-8"))
+        except ValueError as e:
+            raise TransformError(f"Rules JSON is invalid ({path}): {e}") from e
+        if not isinstance(specs, list):
+            raise TransformError(f"Rules file must contain a list of rules: {path}")
+        try:
+            return [compile_rule(spec) for spec in specs]
+        except (KeyError, TypeError, re.error) as e:
+            raise TransformError(f"Invalid rule in {path}: {e}") from e
+
+    if path.suffix == ".py":
+        spec = importlib.util.spec_from_file_location("atlas_transform_rules", path)
+        if spec is None or spec.loader is None:
+            raise TransformError(f"Cannot import rules module: {path}")
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        rules = getattr(module, "RULES", None)
+        if not isinstance(rules, (list, tuple)) or not all(callable(r) for r in rules):
+            raise TransformError(f"{path} must define RULES, a list of callables Room -> Room")
+        return list(rules)
+
+    raise TransformError(f"Rules must be a .json or .py file: {path}")
+
+
+def _rule_name(rule: Rule) -> str:
+    return getattr(rule, "__qualname__", None) or type(rule).__name__
+
+
+def apply_rules(rules: Sequence[Rule], room: Room) -> Room:
+    """Run the rules in order; any exception a rule raises becomes a TransformError naming it."""
+    for i, rule in enumerate(rules, 1):
+        try:
+            result = rule(room)
+        except TransformError:
+            raise
+        except Exception as e:
+            raise TransformError(f"rule {i} ({_rule_name(rule)}) failed: {type(e).__name__}: {e}") from e
+        if not isinstance(result, Room):
+            raise TransformError(f"rule {i} ({_rule_name(rule)}) returned {type(result).__name__}, not a Room")
+        room = result
+    return room
+
+
+# ----------------------------
+# Rendering
+# ----------------------------
+
+def render_changed_sections(text: str, before: Room, after: Room, game: str) -> Tuple[str, List[str]]:
+    """
+    Re-render only the sections that differ between before and after into text.
+
+    Exit conditions written inline ("N → [[X]] (if ...)") are extracted into Hidden/
+    conditional transitions on parse. When the exits section is kept as written, those
+    extracted notes are left out of a re-rendered hidden list (the parser adds them
+    back); if a rule touched them, both sections are rendered in canonical form.
+    """
+    changed = [n for n, a, b in zip(after.order, before.values, after.values) if a != b]
+    render = set(changed)
+
+    raw = text.splitlines(True)
+    newline = "\r\n" if raw and raw[0].endswith("\r\n") else "\n"
+    lines = [r.rstrip("\r\n") for r in raw]
+    _, blocks = split_into_blocks(lines)
+
+    overrides: Dict[str, SectionValue] = {}
+    if HIDDEN_SECTION in render and EXITS_SECTION not in render and EXITS_SECTION in blocks:
+        start, stop = blocks[EXITS_SECTION]
+        _, extracted = parse_exits(lines[start:stop], game)
+        hidden = after.section(HIDDEN_SECTION)
+        n = len(extracted)
+        if n == 0:
+            pass
+        elif tuple(hidden[-n:]) == tuple(extracted):
+            overrides[HIDDEN_SECTION] = tuple(hidden[:-n])
+        else:
+            render.add(EXITS_SECTION)
+    elif EXITS_SECTION in render and HIDDEN_SECTION in after.order:
+        render.add(HIDDEN_SECTION)
+
+    out: List[str] = []
+    pos = 0
+    for name in after.order:
+        if name not in render:
+            continue
+        start, stop = blocks[name]
+        trailing = stop
+        while trailing > start and raw[trailing - 1].strip() == "":
+            trailing -= 1
+        out.extend(raw[pos:start])
+        value = overrides.get(name, after.section(name))
+        out.extend(line + newline for line in section_to_markdown(value))
+        pos = trailing
+    out.extend(raw[pos:])
+    return "".join(out), changed
+
+
+# ----------------------------
+# Pipeline
+# ----------------------------
+
+_worker_state: Dict[str, Any] = {}
+
+
+def _worker_setup(schema_path: Path, rules_path: Path) -> Tuple[RoomSchema, List[Rule]]:
+    key = f"{schema_path}\0{rules_path}"
+    if _worker_state.get("key") != key:
+        _worker_state.update(key=key, schema=load_schema(schema_path), rules=load_rules(rules_path))
+    return _worker_state["schema"], _worker_state["rules"]
+
+
+def transform_file(job: Tuple[Path, Path, Path]) -> Dict[str, Any]:
+    """Worker: returns {"path", "error"} or {"path", "old", "new", "sections"} ("new" None if unchanged)."""
+    md_path, schema_path, rules_path = job
+    result: Dict[str, Any] = {"path": str(md_path), "display": os.path.relpath(md_path), "new": None}
+    try:
+        schema, rules = _worker_setup(schema_path, rules_path)
+        data = md_path.read_bytes()
+        text = decode_markdown(data)
+        room, _ = parse_room_text(text, md_path, schema=schema)
+        after = apply_rules(rules, room)
+        if after.to_dict() == room.to_dict():
+            return result
+
+        original = data.decode("utf-8")  # keep the file's own newlines
+        new_text, sections = render_changed_sections(original, room, after, schema.game)
+        check, _ = parse_room_text(decode_markdown(new_text.encode("utf-8")), md_path, schema=schema)
+        if check.to_dict() != after.to_dict():
+            raise TransformError("rendered Markdown does not parse back to the transformed room")
+    except (ParseError, TransformError, ValueError, OSError) as e:
+        result["error"] = str(e)
+        return result
+    result.update(old=original, new=new_text, sections=sections)
+    return result
+
+
+def write_atomically(changes: Iterable[Tuple[Path, str]]) -> int:
+    """Stage every file as a sibling temp file first, then rename each into place."""
+    staged: List[Tuple[Path, Path]] = []
+    try:
+        for path, text in changes:
+            tmp = path.with_name(f".{path.name}.tmp")
+            with open(tmp, "w", encoding="utf-8", newline="") as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            staged.append((tmp, path))
+    except OSError:
+        for tmp, _ in staged:
+            tmp.unlink(missing_ok=True)
+        raise
+    for tmp, path in staged:
+        os.replace(tmp, path)
+    return len(staged)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Apply rules to every room in one pass.")
+    ap.add_argument("rules", type=Path, help="Rules file (.json declarative, .py with RULES)")
+    ap.add_argument("--config", type=Path, default=DEFAULT_CONFIG_PATH, help="Atlas config (default: atlas.json)")
+    ap.add_argument("--game", action="append", help="Only transform the given game shard (repeatable)")
+    ap.add_argument("--dry-run", action="store_true", help="Report what would change; write nothing")
+    ap.add_argument("--diff", action="store_true", help="Print a unified diff of every change")
+    ap.add_argument("--jobs", type=int, default=None, help="Worker processes (default: CPU count)")
+    ap.add_argument("--no-compile", action="store_true", help="Do not recompile changed shards afterwards")
+    args = ap.parse_args(argv)
+
+    try:
+        config = load_config(args.config)
+        load_rules(args.rules)  # fail fast on a broken rules file, before forking workers
+    except (ConfigError, TransformError) as e:
+        print(f"[transform] ERROR: {e}", file=sys.stderr)
+        return 2
+
+    shards = [s for s in config.shards if (not args.game or s.game in args.game) and s.in_dir.is_dir()]
+    jobs: List[Tuple[Path, Path, Path]] = []
+    shard_of: Dict[str, Shard] = {}
+    for shard in shards:
+        for md in sorted(shard.in_dir.glob("**/*.md")):
+            jobs.append((md, shard.schema, args.rules.resolve()))
+            shard_of[str(md)] = shard
+
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        results = list(pool.map(transform_file, jobs, chunksize=max(1, len(jobs) // 64)))
+
+    errors = [r for r in results if r.get("error")]
+    changed = [r for r in results if r["new"] is not None]
+    for r in errors:
+        print(f"[transform] ERROR: {r['display']}: {r['error']}", file=sys.stderr)
+
+    by_section: Dict[str, int] = {}
+    for r in changed:
+        print(f"[transform] {r['display']}: {', '.join(r['sections'])}")
+        for name in r["sections"]:
+            by_section[name] = by_section.get(name, 0) + 1
+        if args.diff:
+            sys.stdout.writelines(
+                difflib.unified_diff(
+                    r["old"].splitlines(True), r["new"].splitlines(True), f"a/{r['display']}", f"b/{r['display']}"
+                )
+            )
+    summary = ", ".join(f"{name}={n}" for name, n in sorted(by_section.items())) or "none"
+    print(f"[transform] {len(changed)} of {len(results)} room(s) change; sections: {summary}")
+
+    if errors:
+        print("[transform] Nothing written.", file=sys.stderr)
+        return 1
+    if args.dry_run or not changed:
+        return 0
+
+    written = write_atomically((Path(r["path"]), r["new"]) for r in changed)
+    print(f"[transform] Wrote {written} file(s).")
+
+    if not args.no_compile:
+        for shard in {shard_of[r["path"]].game: shard_of[r["path"]] for r in changed}.values():
+            result = compile_rooms(
+                shard.in_dir,
+                shard.out_dir,
+                schema=load_schema(shard.schema),
+                schema_digest=schema_sha256(shard.schema),
+                cache_dir=shard.cache_dir,
+            )
+            for msg in result.errors:
+                print(f"[transform] {shard.game}: {msg}", file=sys.stderr)
+            print(f"[transform] {shard.game}: recompiled ({result.count_written} JSON file(s) written)")
+            if result.errors:
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for the normalizer CLI.
+
+Measures wall-clock time of the invocations pre-commit and editors actually make,
+relative to a bare interpreter start, and checks them against a startup budget:
+
+- help:  --help (argparse only; no regex compiled)
+- noop:  a run with --cache-dir where nothing changed (stat-only fast path)
+- full:  a complete compile without cache
+
+Each case is timed in runs interleaved with the bare interpreter, and the fastest run of
+each is compared: on a shared machine scheduler noise only ever adds time, so the minimum
+is the stable estimate (medians drifted by +/-10 ms between runs of the same tree).
+For each case an -X importtime report lists the most expensive top-level imports.
+Exits 1 if any case exceeds its budget, so it can gate CI:
+
+    python scripts/bench_startup.py > bench_output.txt
+"""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+NORMALIZER = "scripts/normalize_rooms_schema_authoritative.py"
+SCHEMA = "schema/room_schema_v1.0.json"
+IN_DIR = "rooms"
+OUT_DIR = "normalized"
+CACHE_DIR = ".atlas-cache/Z1"
+
+# Budgets are milliseconds on top of a bare `python -c pass`.
+DEFAULT_BUDGETS_MS: Dict[str, float] = {
+    "help": 60.0,
+    "noop": 15.0,
+    "full": 200.0,
+}
+
+
+def cases() -> Dict[str, List[str]]:
+    compile_args = ["--schema", SCHEMA, "--in", IN_DIR, "--out", OUT_DIR, "--fail-fast"]
+    return {
+        "interpreter": ["-c", "pass"],
+        "help": [NORMALIZER, "--help"],
+        "noop": [NORMALIZER, *compile_args, "--cache-dir", CACHE_DIR],
+        "full": [NORMALIZER, *compile_args],
+    }
+
+
+def _run_once(args: List[str]) -> float:
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, *args], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    return (time.perf_counter() - t0) * 1000.0
+
+
+def time_case(args: List[str], baseline: List[str], runs: int) -> Tuple[float, float]:
+    """(fastest case run, fastest baseline run) in ms, the two interleaved so load hits both."""
+    case_ms, base_ms = [], []
+    for _ in range(runs):
+        base_ms.append(_run_once(baseline))
+        case_ms.append(_run_once(args))
+    return min(case_ms), min(base_ms)
+
+
+def import_report(args: List[str], top: int) -> Tuple[float, List[Tuple[int, str]]]:
+    """Return (total self-time ms, [(cumulative us, module)] for the heaviest top-level imports)."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    total_us = 0
+    top_level: List[Tuple[int, str]] = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            total_us += int(self_us)
+            if not name[1:].startswith(" "):
+                top_level.append((int(cumulative_us), name.strip()))
+        except ValueError:
+            continue
+    top_level.sort(reverse=True)
+    return total_us / 1000.0, top_level[:top]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark normalizer CLI startup against a budget.")
+    ap.add_argument("--runs", type=int, default=15, help="Runs per case (the fastest is reported)")
+    ap.add_argument("--top", type=int, default=5, help="Top-level imports listed per case")
+    for name, budget in DEFAULT_BUDGETS_MS.items():
+        ap.add_argument(f"--budget-{name}", type=float, default=budget, help=f"Overhead budget in ms (default: {budget})")
+    args = ap.parse_args(argv)
+
+    if not Path(NORMALIZER).exists():
+        print(f"[bench] ERROR: run from the repository root ({NORMALIZER} not found)", file=sys.stderr)
+        return 2
+
+    all_cases = cases()
+    # Prime the no-op stamp so the noop case measures the fast path.
+    subprocess.run([sys.executable, *all_cases["noop"]], stdout=subprocess.DEVNULL, check=True)
+
+    baseline = all_cases["interpreter"]
+    base_ms, _ = time_case(baseline, baseline, args.runs)
+    print(f"[bench] interpreter baseline: {base_ms:.1f} ms (fastest of {args.runs})")
+
+    over_budget = []
+    for name, case_args in all_cases.items():
+        if name == "interpreter":
+            continue
+        case_ms, case_base_ms = time_case(case_args, baseline, args.runs)
+        overhead = case_ms - case_base_ms
+        budget = getattr(args, f"budget_{name}")
+        status = "OK" if overhead <= budget else "OVER BUDGET"
+        if overhead > budget:
+            over_budget.append(name)
+        print(f"\n[bench] {name}: {case_ms:.1f} ms (+{overhead:.1f} ms, budget +{budget:.0f} ms) {status}")
+
+        total_ms, heaviest = import_report(case_args, args.top)
+        print(f"  import time (self, all modules): {total_ms:.1f} ms")
+        for cumulative_us, module in heaviest:
+            print(f"  {cumulative_us / 1000.0:8.2f} ms  {module}")
+
+    if over_budget:
+        print(f"\n[bench] FAILED: startup budget exceeded for {', '.join(over_budget)}", file=sys.stderr)
+        return 1
+    print("\n[bench] Startup budget OK.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -5,6 +5,8 @@ import argparse
 import sys
 from pathlib import Path
 
+import atlas_metrics
+
 # Extensions that are almost certainly binary in your repo context.
 BINARY_EXTS = {
     ".png", ".jpg", ".jpeg", ".gif", ".ico", ".pdf", ".zip", ".db",
@@ -62,6 +64,7 @@ def main(argv: list[str]) -> int:
         if has_mixed_eols(data):
             bad.append(f)
 
+    atlas_metrics.count(mode="check", files=len(args.files), bad=len(bad))
     if bad:
         print("[EOL] Mixed line endings detected (CRLF + LF in same file).")
         for f in bad:
@@ -73,4 +76,4 @@ def main(argv: list[str]) -> int:
     return 0
 
 if __name__ == "__main__":
-    raise SystemExit(main(sys.argv[1:]))
+    raise SystemExit(atlas_metrics.timed(lambda: main(sys.argv[1:]), "mixed-eol"))
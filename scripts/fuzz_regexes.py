@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+ReDoS audit for the normalizer's parsing regexes.
+
+Every regex the parser applies to a line is checked in three steps:
+
+1. search: pumped inputs prefix + pump * k + suffix are sampled (seeded) from real room
+   lines and from the regex's own literal tokens; each is timed at a probe length and
+   the slowest family is kept
+2. growth: the slowest family is timed at doubling lengths and the growth exponent is
+   fitted (log time vs log length; ~1 linear, ~2 quadratic)
+3. differential: patterns that were rewritten for linear time are fuzzed against their
+   legacy form (LEGACY_PATTERNS) and must produce identical matches and groups
+
+Exits 1 on super-linear growth or any differential mismatch, so it can gate CI:
+
+    python scripts/fuzz_regexes.py [--legacy]
+
+--legacy audits the legacy patterns instead, to show what the rewrites fixed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import normalize_rooms_schema_authoritative as nra
+
+# The audit is about this repository's rooms and schema, wherever it is run from.
+REPO_ROOT = Path(__file__).resolve().parents[1]
+ROOMS_DIR = REPO_ROOT / "rooms"
+SCHEMA = REPO_ROOT / nra.DEFAULT_SCHEMA_PATH
+
+# Pre-rewrite sources, kept as the differential reference.
+LEGACY_PATTERNS: Dict[str, Tuple[str, int]] = {
+    "H1_RE": (r"^#\s+(?P<title>.+?)\s*$", 0),
+    "H2_RE": (r"^##\s+(?P<h2>.+?)\s*$", 0),
+    "BULLET_RE": (r"^\s*[-*]\s+(?P<item>.+?)\s*$", 0),
+    "EXIT_TOKEN_RE": (
+        r"""^\s*
+    (?P<prefix>\([^)]*\)\s*)?
+    (?P<token>NE|NW|SE|SW|N|S|E|W|U|D|WAIT|LAND|LAUNCH)
+    (?:/(?P<token2>NE|NW|SE|SW|N|S|E|W|U|D))?
+    (?P<inline>\s*\([^)]*\)\s*)?
+    (?P<colon>\s*:)?\s*
+    →\s*
+    (?P<link>\[\[Z1\s*-\s*[^\]]+\]\])
+    (?P<trailing>\s+.*)?\s*$""",
+        re.VERBOSE,
+    ),
+}
+
+# Characters lines are made of; "\n" and "\r" never survive line splitting.
+TOKENS = [
+    " ", "  ", "\t", "\x0c", " ", "a", "Z1", "Z1 - ", "-", "*", "**", ":", "#", "##",
+    "(", ")", "[[", "]]", "[", "]", "→", "N", "NE", "/", "x", "Key", "**Key**:", "(x)",
+]
+SUFFIXES = ["", "x", "!", ":", ")", "]]", "**", "→", " "]
+
+# Whitespace-only and whitespace-padded tails, where the rewrites are easiest to get wrong.
+EDGE_CASES = [
+    head + tail
+    for head in ("#", "##", "-", "*", "  -", "N (x)", "N (x) → [[Z1 - A]]", "N (x) : → [[Z1 - A]]")
+    for tail in ("", " ", "  ", " \t ", "\x0c", " \x0c ", " a", " a ", " a  b \t", "   (y)  ", " → [[Z1 - B]]  c ")
+]
+
+Matcher = Callable[[str], object]
+
+
+def targets(legacy: bool = False) -> Dict[str, Matcher]:
+    """name -> callable applying the regex exactly as the parser does."""
+    title_pattern = nra.load_schema(SCHEMA).title_pattern
+    current: Dict[str, Matcher] = {
+        "H1_RE": nra.H1_RE.match,
+        "H2_RE": nra.H2_RE.match,
+        "BULLET_RE": nra.BULLET_RE.match,
+        "EXIT_TOKEN_RE": nra.exit_token_re("Z1").match,
+        "WIKILINK_RE": nra.WIKILINK_RE.match,
+        "WIKILINK_GAME_RE": nra.wikilink_game_re("Z1").match,
+        "INTERNAL_ID_RE": nra.internal_id_re("Z1").match,
+        "TITLE_RE": nra._title_re(title_pattern).match,
+        "STRAY_ASTERISKS_RE": lambda s: nra.STRAY_ASTERISKS_RE.sub("", s),
+        "WHITESPACE_RUN_RE": lambda s: nra.WHITESPACE_RUN_RE.sub(" ", s),
+    }
+    if legacy:
+        for name, (source, flags) in LEGACY_PATTERNS.items():
+            current[name] = re.compile(source, flags).match
+    return current
+
+
+def room_lines() -> List[str]:
+    lines: List[str] = []
+    for p in sorted(ROOMS_DIR.glob("*.md")):
+        lines.extend(raw.rstrip("\n") for raw in p.read_text(encoding="utf-8").splitlines(True))
+    return [line for line in lines if line.strip()]
+
+
+# ----------------------------
+# Timing
+# ----------------------------
+
+def time_call(fn: Matcher, s: str, min_total: float = 0.005, batches: int = 3) -> float:
+    """Seconds per call, best of `batches` batches of at least min_total seconds."""
+    reps = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(reps):
+            fn(s)
+        elapsed = time.perf_counter() - t0
+        if elapsed >= min_total or reps >= 1 << 16:
+            break
+        reps *= 4
+    best = elapsed / reps
+    for _ in range(batches - 1):
+        t0 = time.perf_counter()
+        for _ in range(reps):
+            fn(s)
+        best = min(best, (time.perf_counter() - t0) / reps)
+    return best
+
+
+def pumped(prefix: str, pump: str, suffix: str, length: int) -> str:
+    return prefix + pump * max(1, (length - len(prefix) - len(suffix)) // len(pump)) + suffix
+
+
+def growth_exponent(sizes: Sequence[int], seconds: Sequence[float]) -> float:
+    xs = [math.log(n) for n in sizes]
+    ys = [math.log(max(t, 1e-9)) for t in seconds]
+    mx, my = sum(xs) / len(xs), sum(ys) / len(ys)
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / sum((x - mx) ** 2 for x in xs)
+
+
+def candidate_families(rng: random.Random, seeds: List[str], count: int) -> List[Tuple[str, str, str]]:
+    prefixes = ["", "# ", "# a", "## ", "## a", "- ", "- a", "**", "**a", "N ", "N (x)", "[[Z1", "[[Z1 - a"]
+    families = {(p, pump, s) for p in prefixes for pump in TOKENS for s in SUFFIXES[:3]}
+    target = len(families) + count
+    while len(families) < target:
+        seed = rng.choice(seeds)
+        cut = rng.randrange(len(seed) + 1)
+        pump = "".join(rng.choice(TOKENS) for _ in range(rng.randint(1, 3)))
+        families.add((seed[:cut], pump, rng.choice(SUFFIXES) + seed[cut:][: rng.randint(0, 20)]))
+    return sorted(families)
+
+
+def audit(name: str, fn: Matcher, families: List[Tuple[str, str, str]], probe: int, sizes: Sequence[int]) -> Tuple[float, Tuple[str, str, str], List[float]]:
+    worst = max(families, key=lambda f: time_call(fn, pumped(*f, probe), min_total=0.0002, batches=1))
+    seconds = [time_call(fn, pumped(*worst, n)) for n in sizes]
+    return growth_exponent(sizes, seconds), worst, seconds
+
+
+# ----------------------------
+# Differential check
+# ----------------------------
+
+def _groups(m: Optional["re.Match[str]"]) -> object:
+    return None if m is None else (m.span(), m.groupdict())
+
+
+def differential(rng: random.Random, seeds: List[str], cases: int) -> List[str]:
+    current = targets()
+    mismatches: List[str] = []
+    for name, (source, flags) in LEGACY_PATTERNS.items():
+        old = re.compile(source, flags).match
+        new = current[name]
+        inputs = seeds + EDGE_CASES
+        for _ in range(cases):
+            if rng.random() < 0.5:
+                s = "".join(rng.choice(TOKENS) for _ in range(rng.randint(0, 12)))
+            else:
+                seed = list(rng.choice(seeds))
+                for _ in range(rng.randint(1, 4)):
+                    seed.insert(rng.randrange(len(seed) + 1), rng.choice(TOKENS) * rng.randint(1, 4))
+                s = "".join(seed)
+            inputs.append(s)
+        for s in inputs:
+            if _groups(old(s)) != _groups(new(s)):  # type: ignore[arg-type]
+                mismatches.append(f"{name}: {s!r}: {_groups(old(s))} != {_groups(new(s))}")  # type: ignore[arg-type]
+                break
+    return mismatches
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="ReDoS audit and differential fuzz for the normalizer regexes.")
+    ap.add_argument("--seed", type=int, default=0, help="RNG seed (default: 0)")
+    ap.add_argument("--candidates", type=int, default=200, help="Random pumped families per regex (default: 200)")
+    ap.add_argument("--probe", type=int, default=2000, help="Input length used to rank families (default: 2000)")
+    ap.add_argument("--max-exponent", type=float, default=1.4, help="Fail above this growth exponent (default: 1.4)")
+    ap.add_argument("--diff-cases", type=int, default=20000, help="Random inputs per rewritten regex (default: 20000)")
+    ap.add_argument("--legacy", action="store_true", help="Audit the legacy (pre-rewrite) patterns instead")
+    ap.add_argument("--only", action="append", help="Only audit the named regex (repeatable)")
+    args = ap.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    seeds = room_lines()
+    families = candidate_families(rng, seeds, args.candidates)
+    sizes = [args.probe, args.probe * 2, args.probe * 4, args.probe * 8]
+
+    failed = False
+    print(f"{'regex':<20} {'exponent':>8} {'ms @' + str(sizes[-1]):>10}  worst input family (prefix, pump, suffix)")
+    for name, fn in targets(legacy=args.legacy).items():
+        if args.only and name not in args.only:
+            continue
+        exponent, worst, seconds = audit(name, fn, families, args.probe, sizes)
+        flag = ""
+        if exponent > args.max_exponent:
+            failed = True
+            flag = "  SUPER-LINEAR"
+        print(f"{name:<20} {exponent:8.2f} {seconds[-1] * 1000:10.3f}  {json.dumps(worst, ensure_ascii=False)[:70]}{flag}")
+
+    if not args.legacy:
+        mismatches = differential(rng, seeds, args.diff_cases)
+        for msg in mismatches:
+            print(f"[fuzz] DIFFERENTIAL MISMATCH: {msg}", file=sys.stderr)
+        failed = failed or bool(mismatches)
+        if not mismatches:
+            print(f"[fuzz] Differential OK: {', '.join(LEGACY_PATTERNS)} match their legacy forms.")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
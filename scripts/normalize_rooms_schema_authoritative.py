@@ -12,6 +12,16 @@ v1.0 invariants (as requested):
     Markdown H1 must equal JSON.title.
   All three must be identical, or the run fails (unless --fix-titles is used).
 
+Startup (pre-commit runs this on every commit):
+- With --cache-dir, a successful run records an input stamp (mtime/size of the schema,
+  every input .md, every output .json and the compiler's own modules, plus
+  NORMALIZER_VERSION). If nothing has changed on the next run, the script exits before
+  importing json/argparse or compiling any regex.
+- Arguments are parsed before the heavy imports, so --help and usage errors stay cheap;
+  parsing regexes are compiled lazily on first use.
+- Rooms are looked up in the shared compile store (scripts/atlas_store.py) before they
+  are parsed, so a room any branch or worktree has compiled is not parsed again.
+
 --fix-titles behavior (safe, explicit):
 - If H1 does not match canonical JSON.title, rewrite H1.
 - If filename stem does not match canonical JSON.title, rename the file to match (fails if collision).
@@ -19,31 +29,239 @@ v1.0 invariants (as requested):
 
 from __future__ import annotations
 
-import argparse
-import json
-import re
+import os
 import sys
-from dataclasses import dataclass
-from pathlib import Path
-from typing import Any, Dict, List, Tuple, Optional
+
+
+# ----------------------------
+# No-op fast path (stdlib os/sys only)
+# ----------------------------
+
+STAMP_NAME = "inputs.stamp"
+STAMP_VERSION = "v2"
+_DEFAULT_SCHEMA = "schema/room_schema_v1.0.json"
+_DEFAULT_GLOB = "**/*.md"
+
+# Part of every shared-store key (scripts/atlas_store.py) and of the input stamp. Both
+# also cover the source of the compiler itself, so editing the parser never serves stale
+# output; bump this for changes that live elsewhere (e.g. rendering in a dependency).
+NORMALIZER_VERSION = "1.0"
+
+# Modules whose code decides what a run writes (this file, the room model, the shared
+# store and the daemon's compile path). Their stat lines are part of the input stamp.
+_SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+_CODE_FILES = (
+    os.path.abspath(__file__),
+    os.path.join(_SCRIPTS_DIR, "atlas_model.py"),
+    os.path.join(_SCRIPTS_DIR, "atlas_store.py"),
+    os.path.join(_SCRIPTS_DIR, "atlas_daemon.py"),
+)
+
+
+def _collect_files(root: str, suffix: str, recursive: bool, into: list) -> None:
+    with os.scandir(root) as it:
+        for entry in it:
+            if entry.is_dir():
+                if recursive:
+                    _collect_files(entry.path, suffix, recursive, into)
+            elif entry.name.endswith(suffix):
+                into.append(entry.path)
+
+
+def input_stamp(schema: str, in_dir: str, out_dir: str, glob: str) -> str | None:
+    """
+    Text fingerprint of everything a run reads and writes, built from os.stat only.
+    Returns None when the glob is not one the fast path understands.
+    """
+    if glob == "**/*.md":
+        recursive = True
+    elif glob == "*.md":
+        recursive = False
+    else:
+        return None
+
+    schema = os.path.abspath(schema)
+    in_dir = os.path.abspath(in_dir)
+    out_dir = os.path.abspath(out_dir)
+
+    paths = [schema]
+    try:
+        _collect_files(in_dir, ".md", recursive, paths)
+        _collect_files(out_dir, ".json", False, paths)
+    except OSError:
+        return None
+    paths[1:] = sorted(paths[1:])
+    paths.extend(_CODE_FILES)
+
+    lines = [STAMP_VERSION, NORMALIZER_VERSION, "\t".join((schema, in_dir, out_dir, glob))]
+    try:
+        for path in paths:
+            st = os.stat(path)
+            lines.append(f"{st.st_mtime_ns} {st.st_size} {path}")
+    except OSError:
+        return None
+    return "\n".join(lines) + "\n"
+
+
+def _fast_path_unchanged(argv: list) -> bool:
+    """
+    True when argv is a plain compile run with --cache-dir and the recorded input stamp
+    still matches. Any other flag (--help, --fix-titles, unknown) takes the full path.
+    """
+    opts = {"--schema": _DEFAULT_SCHEMA, "--glob": _DEFAULT_GLOB}
+    valued = ("--schema", "--in", "--out", "--glob", "--cache-dir", "--shared-cache")
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg in ("--fail-fast", "--no-shared-cache", "--no-daemon"):
+            i += 1
+            continue
+        name, eq, value = arg.partition("=")
+        if name not in valued:
+            return False
+        if not eq:
+            if i + 1 >= len(argv):
+                return False
+            value = argv[i + 1]
+            i += 1
+        opts[name] = value
+        i += 1
+
+    if "--in" not in opts or "--out" not in opts or "--cache-dir" not in opts:
+        return False
+    stamp = input_stamp(opts["--schema"], opts["--in"], opts["--out"], opts["--glob"])
+    if stamp is None:
+        return False
+    try:
+        with open(os.path.join(opts["--cache-dir"], STAMP_NAME), encoding="utf-8") as f:
+            return f.read() == stamp
+    except OSError:
+        return False
+
+
+def build_parser():
+    """The CLI parser. Plain str options, so --help needs nothing beyond argparse."""
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Normalize Zork room markdown into JSON objects (schema-authoritative).")
+    ap.add_argument(
+        "--schema",
+        default=_DEFAULT_SCHEMA,
+        help=f"Path to room schema JSON Schema (default: {_DEFAULT_SCHEMA})",
+    )
+    ap.add_argument(
+        "--fix-titles",
+        action="store_true",
+        help="Rewrite Markdown H1 and/or rename file to match canonical JSON.title (strict).",
+    )
+    ap.add_argument("--in", dest="in_dir", required=True, help="Input directory containing room .md files")
+    ap.add_argument("--out", dest="out_dir", required=True, help="Output directory for normalized JSON")
+    ap.add_argument("--glob", dest="glob", default=_DEFAULT_GLOB, help=f"Glob pattern (default: {_DEFAULT_GLOB})")
+    ap.add_argument("--fail-fast", action="store_true", help="Stop on first error")
+    ap.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Per-shard cache directory; unchanged rooms are not recompiled (default: no cache)",
+    )
+    ap.add_argument(
+        "--shared-cache",
+        default=None,
+        help="Shared compile store across branches and worktrees (default: $XDG_CACHE_HOME/zork-atlas)",
+    )
+    ap.add_argument("--no-shared-cache", action="store_true", help="Do not read or write the shared compile store")
+    ap.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="Compile in-process even if an atlas daemon is listening",
+    )
+    return ap
+
+
+if __name__ == "__main__":
+    import atlas_metrics  # os/sys/time only; records this run in .atlas-cache/metrics.jsonl
+
+    atlas_metrics.start("normalize")
+    if _fast_path_unchanged(sys.argv[1:]):
+        print("Normalization skipped: inputs unchanged since last successful run.")
+        atlas_metrics.lap("stamp")
+        atlas_metrics.count(mode="noop")
+        raise SystemExit(atlas_metrics.finish(0))
+    atlas_metrics.lap("stamp")
+    try:
+        build_parser().parse_args()  # --help and usage errors exit before the imports below
+    except SystemExit as e:
+        atlas_metrics.finish(e.code)
+        raise
+
+
+import hashlib  # noqa: E402  (deferred past the fast path on purpose)
+import json  # noqa: E402
+import re  # noqa: E402
+from dataclasses import dataclass, field  # noqa: E402
+from functools import lru_cache  # noqa: E402
+from pathlib import Path  # noqa: E402
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple, Optional  # noqa: E402
+
+from atlas_model import Direction, Exit, MappingNotes, Room  # noqa: E402
+
+if TYPE_CHECKING:
+    from atlas_store import CompileStore
+
+
+class _LazyPattern:
+    """A module-level regex that compiles on first use instead of at import time."""
+
+    __slots__ = ("_source", "_flags", "_compiled")
+
+    def __init__(self, source: str, flags: int = 0) -> None:
+        self._source = source
+        self._flags = flags
+        self._compiled = None
+
+    def compiled(self) -> "re.Pattern[str]":
+        if self._compiled is None:
+            self._compiled = re.compile(self._source, self._flags)
+        return self._compiled
+
+    @property
+    def pattern(self) -> str:
+        return self._source
+
+    def match(self, string: str, *args: int):
+        return self.compiled().match(string, *args)
+
+    def search(self, string: str, *args: int):
+        return self.compiled().search(string, *args)
+
+    def sub(self, repl, string: str, count: int = 0) -> str:
+        return self.compiled().sub(repl, string, count)
+
+    def __getattr__(self, name: str):
+        return getattr(self.compiled(), name)
 
 
 # ----------------------------
 # Schema loading (authority)
 # ----------------------------
 
-DEFAULT_SCHEMA_PATH = Path("schema/room_schema_v1.0.json")
+DEFAULT_SCHEMA_PATH = Path(_DEFAULT_SCHEMA)
 
 
 class SchemaError(RuntimeError):
     pass
 
 
+# The game code (Z1, Z2, Z3) is read off the schema's title pattern, so each game shard
+# carries its own ID space and link prefix without code changes.
+GAME_FROM_TITLE_PATTERN_RE = _LazyPattern(r"^\^(?P<game>Z\d+) - ")
+
+
 @dataclass(frozen=True)
 class RoomSchema:
     title_pattern: str
     section_order: List[str]
     section_types: Dict[str, str]  # header -> "string" | "list" | "kv" | "exits"
+    game: str = "Z1"
 
     @staticmethod
     def from_json_schema(schema: dict) -> "RoomSchema":
@@ -57,6 +275,12 @@ class RoomSchema:
             raise SchemaError("Schema missing properties.title.pattern (needed for v1.0 title invariant).")
         if not isinstance(title_pattern, str) or not title_pattern.strip():
             raise SchemaError("Schema properties.title.pattern must be a non-empty string.")
+        mg = GAME_FROM_TITLE_PATTERN_RE.match(title_pattern)
+        if not mg:
+            raise SchemaError(
+                f"Schema properties.title.pattern must start with a game prefix like '^Z1 - ': {title_pattern!r}"
+            )
+        game = mg.group("game")
 
         # Canonical ordered authority: schema must provide it via properties.section_order.const
         try:
@@ -68,7 +292,7 @@ class RoomSchema:
             )
         if not (isinstance(section_order, list) and all(isinstance(x, str) for x in section_order)):
             raise SchemaError("Schema properties.section_order.const must be a list of strings.")
-        section_order = [h.strip() for h in section_order if h.strip()]
+        section_order = [sys.intern(h.strip()) for h in section_order if h.strip()]
         if len(section_order) != len(set(section_order)):
             dups = [h for h in section_order if section_order.count(h) > 1]
             raise SchemaError(f"Schema section_order contains duplicates: {sorted(set(dups))}")
@@ -117,6 +341,7 @@ class RoomSchema:
             title_pattern=title_pattern,
             section_order=section_order,
             section_types=section_types,
+            game=game,
         )
 
 
@@ -132,24 +357,34 @@ def load_schema(schema_path: Path) -> RoomSchema:
 
     return RoomSchema.from_json_schema(data)
 
-def _canonicalize_internal_id(val: str) -> str:
+def schema_sha256(schema_path: Path) -> str:
+    return hashlib.sha256(schema_path.read_bytes()).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def internal_id_re(game: str) -> "re.Pattern[str]":
+    return re.compile(rf"^{re.escape(game)}-R-(\d{{1,3}})$")
+
+
+def _canonicalize_internal_id(val: str, game: str = "Z1") -> str:
     v = val.strip()
     if not v:
         return v  # leave empty; schema will fail and force you to fill it
-    m = re.match(r"^Z1-R-(\d{1,3})$", v)
+    m = internal_id_re(game).match(v)
     if m:
-        return f"Z1-R-{int(m.group(1)):03d}"
+        return f"{game}-R-{int(m.group(1)):03d}"
     return v
 
 # ----------------------------
 # Markdown parsing
 # ----------------------------
 
-H1_RE = re.compile(r"^#\s+(?P<title>.+?)\s*$")
-H2_RE = re.compile(r"^##\s+(?P<h2>.+?)\s*$")
-BULLET_RE = re.compile(r"^\s*[-*]\s+(?P<item>.+?)\s*$")
-KV_RE = re.compile(r"^\s*\*\*(?P<key>.+?)\*\*:\s*(?P<val>.*)\s*$")       # **Key**: Value
-KV_PLAIN_RE = re.compile(r"^\s*(?P<key>[^:]{1,60}):\s*(?P<val>.*)\s*$")  # Key: Value
+# `.*\S|\s` rather than a lazy `.+?\s*$`: same captures (the `\s` branch keeps the old
+# capture for whitespace-only text), but linear time. The lazy form rescans every
+# whitespace run to the end of the line (scripts/fuzz_regexes.py).
+H1_RE = _LazyPattern(r"^#\s+(?P<title>.*\S|\s)\s*$")
+H2_RE = _LazyPattern(r"^##\s+(?P<h2>.*\S|\s)\s*$")
+BULLET_RE = _LazyPattern(r"^\s*[-*]\s+(?P<item>.*\S|\s)\s*$")
 
 
 @dataclass
@@ -187,17 +422,18 @@ def rewrite_h1_in_markdown(md_path: Path, canonical_title: str) -> bool:
     return True
 
 
-def split_into_blocks(lines: List[str]) -> Tuple[str, Dict[str, List[str]]]:
+def split_into_blocks(lines: List[str]) -> Tuple[str, Dict[str, Tuple[int, int]]]:
     """
-    Returns (h1_title, blocks_by_h2), where blocks_by_h2 maps each H2 heading to its raw lines.
+    Returns (h1_title, blocks_by_h2), where blocks_by_h2 maps each H2 heading to the
+    (start, stop) span of its content lines in `lines`; slice `lines` to read a block.
+    `lines` must already have their line endings stripped.
     Enforces: exactly one H1 near top, unique H2 headings, no content before first H2 (post-H1).
     """
     title: Optional[str] = None
-    blocks: Dict[str, List[str]] = {}
+    blocks: Dict[str, Tuple[int, int]] = {}
     current_h2: Optional[str] = None
 
-    for i, raw in enumerate(lines):
-        line = raw.rstrip("\n")
+    for i, line in enumerate(lines):
 
         if title is None:
             if line.strip() == "":
@@ -213,7 +449,9 @@ def split_into_blocks(lines: List[str]) -> Tuple[str, Dict[str, List[str]]]:
             h2 = m2.group("h2").strip()
             if h2 in blocks:
                 raise ValueError(f"Duplicate H2 heading '{h2}' (line {i+1}).")
-            blocks[h2] = []
+            if current_h2 is not None:
+                blocks[current_h2] = (blocks[current_h2][0], i)
+            blocks[h2] = (i + 1, len(lines))
             current_h2 = h2
             continue
 
@@ -222,15 +460,13 @@ def split_into_blocks(lines: List[str]) -> Tuple[str, Dict[str, List[str]]]:
                 raise ValueError(f"Content found before first H2 section (line {i+1}).")
             continue
 
-        blocks[current_h2].append(line)
-
     if title is None:
         raise ValueError("Missing H1 '# ...' title.")
 
     return title, blocks
 
 
-def enforce_h2_set_and_order(blocks: Dict[str, List[str]], *, schema: RoomSchema) -> None:
+def enforce_h2_set_and_order(blocks: Dict[str, Any], *, schema: RoomSchema) -> None:
     found = list(blocks.keys())
     allowed = set(schema.section_order)
 
@@ -287,24 +523,37 @@ def _strip_md_bold(s: str) -> str:
     return s
 
 # Exit parsing remains strict and canonicalizes to schema's regex form.
-EXIT_TOKEN_RE = re.compile(
-    r"""^\s*
+# The link prefix is per game; {game} is substituted by exit_token_re().
+EXIT_TOKEN_TEMPLATE = r"""^\s*
     (?P<prefix>\([^)]*\)\s*)?
     (?P<token>NE|NW|SE|SW|N|S|E|W|U|D|WAIT|LAND|LAUNCH)
     (?:/(?P<token2>NE|NW|SE|SW|N|S|E|W|U|D))?
-    (?P<inline>\s*\([^)]*\)\s*)?
+    (?P<inline>\s*\([^)]*\)\s*(?!\s))?
     (?P<colon>\s*:)?\s*
     →\s*
-    (?P<link>\[\[Z1\s*-\s*[^\]]+\]\])
-    (?P<trailing>\s+.*)?\s*$""",
-    re.VERBOSE,
-)
+    (?P<link>\[\[{game}\s*-\s*[^\]]+\]\])
+    (?P<trailing>\s+.*)?\s*$"""
+
+
+@lru_cache(maxsize=None)
+def exit_token_re(game: str) -> "re.Pattern[str]":
+    return re.compile(EXIT_TOKEN_TEMPLATE.replace("{game}", re.escape(game)), re.VERBOSE)
+
+
+EXIT_TOKEN_RE = _LazyPattern(EXIT_TOKEN_TEMPLATE.replace("{game}", "Z1"), re.VERBOSE)
+
 
 PLACEHOLDER_EXITS = {"None", "(none)", "*", "-"}
 
-WIKILINK_RE = re.compile(r"^\[\[(?P<inner>.+)\]\]$")
+WIKILINK_RE = _LazyPattern(r"^\[\[(?P<inner>.+)\]\]$")
+
 
-def _canonicalize_z1_wikilink(link: str) -> str:
+@lru_cache(maxsize=None)
+def wikilink_game_re(game: str) -> "re.Pattern[str]":
+    return re.compile(rf"^{re.escape(game)}\s*-\s*(?P<rest>.+)$")
+
+
+def _canonicalize_wikilink(link: str, game: str = "Z1") -> str:
     link = link.strip()
     m = WIKILINK_RE.match(link)
     if not m:
@@ -312,17 +561,22 @@ def _canonicalize_z1_wikilink(link: str) -> str:
 
     inner = m.group("inner").strip()
 
-    mz = re.match(r"^Z1\s*-\s*(?P<rest>.+)$", inner)
+    mz = wikilink_game_re(game).match(inner)
     if not mz:
         return f"[[{inner}]]"
 
     rest = mz.group("rest").strip()
-    return f"[[Z1 - {rest}]]"
+    return f"[[{game} - {rest}]]"
+
+def parse_exits_section(raw_lines: List[str], game: str = "Z1") -> Tuple[List[str], List[str]]:
+    exits, notes = parse_exits(raw_lines, game)
+    return [str(e) for e in exits], notes
 
-def parse_exits_section(raw_lines: List[str]) -> Tuple[List[str], List[str]]:
+
+def parse_exits(raw_lines: List[str], game: str = "Z1") -> Tuple[List[Exit], List[str]]:
     items = parse_list_section(raw_lines)
 
-    clean: List[str] = []
+    clean: List[Exit] = []
     notes: List[str] = []
 
     for item in items:
@@ -330,14 +584,14 @@ def parse_exits_section(raw_lines: List[str]) -> Tuple[List[str], List[str]]:
         if not s or s in PLACEHOLDER_EXITS:
             continue
 
-        m = EXIT_TOKEN_RE.match(s)
+        m = exit_token_re(game).match(s)
         if not m:
             raise ValueError(f"Exit line not in canonicalizable form: {s!r}")
 
-        direction = m.group("token")
-        link = _canonicalize_z1_wikilink(m.group("link"))
-        clean_exit = f"{direction} → {link}"
-        clean.append(clean_exit)
+        link = _canonicalize_wikilink(m.group("link"), game)
+        exit_ = Exit(Direction(m.group("token")), link[2:-2])
+        clean_exit = str(exit_)
+        clean.append(exit_)
 
         note_parts: List[str] = []
         for g in ("prefix", "inline", "trailing"):
@@ -354,20 +608,25 @@ def parse_exits_section(raw_lines: List[str]) -> Tuple[List[str], List[str]]:
 
 
 
+@lru_cache(maxsize=None)
+def _title_re(pattern: str) -> "re.Pattern[str]":
+    return re.compile(pattern)
+
+
 def _canonicalize_title_from_h1(h1: str, *, schema: RoomSchema) -> str:
     """
     Canonicalize and validate a title according to schema.title_pattern.
 
-    If H1 lacks the required 'Z1 - ' prefix but would match after prefixing, we prefix it.
+    If H1 lacks the required game prefix ('Z1 - ') but would match after prefixing, we prefix it.
     Otherwise, fail fast (v1.0 no drift).
     """
     h1 = h1.strip()
-    title_re = re.compile(schema.title_pattern)
+    title_re = _title_re(schema.title_pattern)
 
     if title_re.match(h1):
         return h1
 
-    prefixed = "Z1 - " + h1
+    prefixed = f"{schema.game} - " + h1
     if title_re.match(prefixed):
         return prefixed
 
@@ -387,7 +646,11 @@ def _rename_file_to_title(md_path: Path, canonical_title: str) -> Path:
     md_path.rename(target)
     return target
 
-def parse_mapping_notes(raw_lines: List[str]) -> Dict[str, object]:
+STRAY_ASTERISKS_RE = _LazyPattern(r"\*+")
+WHITESPACE_RUN_RE = _LazyPattern(r"\s+")
+
+
+def parse_mapping_notes(raw_lines: List[str], game: str = "Z1") -> Dict[str, object]:
     allowed_keys = {"Internal ID", "First mapped", "Revisions"}
     out: Dict[str, object] = {}
     notes: List[str] = []
@@ -407,14 +670,14 @@ def parse_mapping_notes(raw_lines: List[str]) -> Dict[str, object]:
         k_raw, v_raw = s.split(":", 1)
 
         key = strip_md(k_raw)
-        key = re.sub(r"\*+", "", key)          # remove stray asterisks
-        key = re.sub(r"\s+", " ", key).strip()
+        key = STRAY_ASTERISKS_RE.sub("", key)          # remove stray asterisks
+        key = WHITESPACE_RUN_RE.sub(" ", key).strip()
 
         val = strip_md(v_raw)
 
         if key in allowed_keys:
             if key == "Internal ID":
-                val = _canonicalize_internal_id(val)
+                val = _canonicalize_internal_id(val, game)
                 if not val:
                     raise ValueError("Mapping notes: Internal ID is empty")
             if key == "First mapped" and not val:
@@ -449,12 +712,25 @@ def parse_mapping_notes(raw_lines: List[str]) -> Dict[str, object]:
         out["Notes"] = notes
     return out
 
-def normalize_room_markdown(md_path: Path, *, schema: RoomSchema, fix_titles: bool = False) -> Tuple[Dict[str, Any], Path]:
+def decode_markdown(data: bytes) -> str:
+    """Decode Markdown bytes exactly as Path.read_text() would (UTF-8, universal newlines)."""
+    return data.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+
+
+def parse_room_markdown(md_path: Path, *, schema: RoomSchema, fix_titles: bool = False) -> Tuple[Room, Path]:
     """
-    Returns (normalized_object, effective_md_path). effective_md_path may differ if --fix-titles renames the file.
+    Returns (room, effective_md_path). effective_md_path may differ if --fix-titles renames the file.
     """
-    text = md_path.read_text(encoding="utf-8")
-    lines = text.splitlines(True)
+    return parse_room_text(md_path.read_text(encoding="utf-8"), md_path, schema=schema, fix_titles=fix_titles)
+
+
+def parse_room_text(text: str, md_path: Path, *, schema: RoomSchema, fix_titles: bool = False) -> Tuple[Room, Path]:
+    """
+    Parse room Markdown that is already in memory (e.g. a git index blob run through
+    decode_markdown). md_path supplies the filename stem check and error locations; it is
+    only touched on disk when fix_titles is set.
+    """
+    lines = [raw.rstrip("\n") for raw in text.splitlines(True)]
 
     try:
         parsed_h1, blocks = split_into_blocks(lines)
@@ -480,25 +756,29 @@ def normalize_room_markdown(md_path: Path, *, schema: RoomSchema, fix_titles: bo
             else:
                 raise ValueError(f"Filename stem does not match canonical JSON.title: {md_path.stem!r} != {canonical_title!r}")
 
-        sections_out: Dict[str, object] = {}
+        values: List[Any] = []
         exit_notes: List[str] = []
+        hidden_index: Optional[int] = None
 
         for h2 in schema.section_order:
-            raw = blocks.get(h2, [])
+            start, stop = blocks.get(h2, (0, 0))
+            raw = lines[start:stop]
             kind = schema.section_types[h2]
 
             if kind == "exits":
-                clean_exits, extracted = parse_exits_section(raw)
-                sections_out[h2] = clean_exits
+                exits, extracted = parse_exits(raw, schema.game)
+                values.append(tuple(exits))
                 exit_notes.extend(extracted)
                 continue
 
             if kind == "string":
-                sections_out[h2] = parse_string_section(raw)
+                values.append(parse_string_section(raw))
             elif kind == "list":
-                sections_out[h2] = parse_list_section(raw)
+                if h2 == "Hidden/conditional transitions":
+                    hidden_index = len(values)
+                values.append(parse_list_section(raw))
             elif kind == "kv":
-                sections_out[h2] = parse_mapping_notes(raw)
+                values.append(MappingNotes.from_dict(parse_mapping_notes(raw, schema.game)))
             else:
                 raise ValueError(f"Unknown section kind: {kind!r}")
 
@@ -506,84 +786,316 @@ def normalize_room_markdown(md_path: Path, *, schema: RoomSchema, fix_titles: bo
         # and the schema already requires that section.
         if exit_notes:
             tgt = "Hidden/conditional transitions"
-            if tgt not in sections_out or not isinstance(sections_out[tgt], list):
+            if hidden_index is None:
                 raise ValueError(f"Schema requires {tgt!r} as a list section; could not append exit notes safely.")
-            sections_out[tgt].extend(exit_notes)
-
-        return {
-            "title": canonical_title,
-            "sections": sections_out,
-            "section_order": schema.section_order,  # derived from schema, not code
-        }, md_path
+            values[hidden_index].extend(exit_notes)
 
+        values = [tuple(v) if isinstance(v, list) else v for v in values]
+        # section_order is derived from schema, not code, and shared by every room.
+        return Room(canonical_title, schema.section_order, tuple(values)), md_path
 
     except ValueError as e:
         raise ParseError(md_path, str(e))
 
 
+def normalize_room_markdown(md_path: Path, *, schema: RoomSchema, fix_titles: bool = False) -> Tuple[Dict[str, Any], Path]:
+    """
+    Returns (normalized_object, effective_md_path). effective_md_path may differ if --fix-titles renames the file.
+    """
+    room, md_path = parse_room_markdown(md_path, schema=schema, fix_titles=fix_titles)
+    return room.to_dict(), md_path
+
+
+# ----------------------------
+# Shard compilation
+# ----------------------------
+
+COMPILE_CACHE_NAME = "compile_cache.json"
+
+
+@lru_cache(maxsize=None)
+def normalizer_fingerprint() -> str:
+    import atlas_model
+
+    h = hashlib.sha256(NORMALIZER_VERSION.encode("utf-8") + b"\0")
+    for source in (__file__, atlas_model.__file__):
+        h.update(Path(source).read_bytes())
+    return h.hexdigest()
+
+
+@dataclass
+class CompileResult:
+    count_ok: int = 0
+    count_total: int = 0
+    count_cached: int = 0
+    count_shared: int = 0   # served from the shared compile store
+    count_written: int = 0
+    bytes_written: int = 0
+    errors: List[str] = field(default_factory=list)
+    outputs: Dict[str, str] = field(default_factory=dict)  # output filename -> sha256 of bytes
+
+
+def render_room_json(obj: Dict[str, Any]) -> str:
+    return json.dumps(obj, ensure_ascii=False, indent=2) + "\n"
+
+
+def _load_compile_cache(cache_dir: Optional[Path], schema_digest: str) -> Dict[str, Dict[str, str]]:
+    if cache_dir is None:
+        return {}
+    try:
+        data = json.loads((cache_dir / COMPILE_CACHE_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("schema_sha256") != schema_digest:
+        return {}
+    rooms = data.get("rooms")
+    return rooms if isinstance(rooms, dict) else {}
+
+
+def _store_compile_cache(cache_dir: Path, schema_digest: str, rooms: Dict[str, Dict[str, str]]) -> None:
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    payload = {"schema_sha256": schema_digest, "rooms": rooms}
+    tmp = cache_dir / (COMPILE_CACHE_NAME + ".tmp")
+    tmp.write_text(json.dumps(payload, ensure_ascii=False, sort_keys=True), encoding="utf-8")
+    tmp.replace(cache_dir / COMPILE_CACHE_NAME)
+
+
+def compile_rooms(
+    in_dir: Path,
+    out_dir: Path,
+    *,
+    schema: RoomSchema,
+    schema_digest: str,
+    glob: str = "**/*.md",
+    fail_fast: bool = False,
+    fix_titles: bool = False,
+    cache_dir: Optional[Path] = None,
+    store: Optional["CompileStore"] = None,
+) -> CompileResult:
+    """
+    Compile every room Markdown file under in_dir into out_dir for one game shard.
+
+    With cache_dir, rooms whose Markdown bytes and schema are unchanged since the last
+    run (and whose output file is still intact) are not reparsed. Rooms that miss it are
+    looked up in the shared store (scripts/atlas_store.py) before parsing, and parse
+    results are recorded there. --fix-titles bypasses both since it may rewrite inputs.
+    """
+    result = CompileResult()
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    md_files = sorted(in_dir.glob(glob))
+    result.count_total = len(md_files)
+
+    use_cache = cache_dir is not None and not fix_titles
+    previous = _load_compile_cache(cache_dir, schema_digest) if use_cache else {}
+    current: Dict[str, Dict[str, str]] = {}
+
+    if fix_titles:
+        store = None
+    if store is not None:
+        from atlas_store import StoreEntry
+
+    for md in md_files:
+        key = md.relative_to(in_dir).as_posix()
+        md_bytes = md.read_bytes()
+        md_digest = hashlib.sha256(md_bytes).hexdigest()
+
+        entry = previous.get(key)
+        if use_cache and entry and entry.get("md_sha256") == md_digest:
+            out_path = out_dir / entry["out"]
+            try:
+                out_digest = hashlib.sha256(out_path.read_bytes()).hexdigest()
+            except OSError:
+                out_digest = None
+            if out_digest == entry.get("out_sha256"):
+                current[key] = entry
+                result.outputs[out_path.name] = out_digest
+                result.count_ok += 1
+                result.count_cached += 1
+                continue
+
+        store_key = store.key(md.name, md_bytes, schema_digest) if store is not None else None
+        shared = store.get(store_key) if store is not None else None
+        if shared is not None:
+            if shared.json is None:
+                result.errors.append(str(ParseError(md, shared.error or "")))
+                if fail_fast:
+                    break
+                continue
+            effective_md = md
+            data = shared.json.encode("utf-8")
+            result.count_shared += 1
+        else:
+            try:
+                obj, effective_md = normalize_room_markdown(md, schema=schema, fix_titles=fix_titles)
+            except ParseError as e:
+                if store is not None:
+                    store.put(store_key, StoreEntry(json=None, error=e.message))
+                result.errors.append(str(e))
+                if fail_fast:
+                    break
+                continue
+            data = render_room_json(obj).encode("utf-8")
+            if store is not None:
+                store.put(store_key, StoreEntry(json=data.decode("utf-8")))
+
+        out_path = out_dir / (effective_md.stem + ".json")
+        try:
+            unchanged = out_path.read_bytes() == data
+        except OSError:
+            unchanged = False
+        if not unchanged:
+            out_path.write_bytes(data)
+            result.count_written += 1
+            result.bytes_written += len(data)
+
+        out_digest = hashlib.sha256(data).hexdigest()
+        current[effective_md.relative_to(in_dir).as_posix()] = {
+            "md_sha256": hashlib.sha256(effective_md.read_bytes()).hexdigest()
+            if effective_md != md
+            else md_digest,
+            "out": out_path.name,
+            "out_sha256": out_digest,
+        }
+        result.outputs[out_path.name] = out_digest
+        result.count_ok += 1
+
+    if use_cache and not result.errors:
+        _store_compile_cache(cache_dir, schema_digest, current)
+    if store is not None:
+        store.maybe_evict()
+
+    return result
+
+
 # ----------------------------
 # CLI
 # ----------------------------
 
-def main(argv: Optional[List[str]] = None) -> int:
-    ap = argparse.ArgumentParser(description="Normalize Zork room markdown into JSON objects (schema-authoritative).")
-    ap.add_argument(
-        "--schema",
-        type=Path,
-        default=DEFAULT_SCHEMA_PATH,
-        help=f"Path to room schema JSON Schema (default: {DEFAULT_SCHEMA_PATH.as_posix()})",
-    )
-    ap.add_argument(
-        "--fix-titles",
-        action="store_true",
-        help="Rewrite Markdown H1 and/or rename file to match canonical JSON.title (strict).",
+def write_input_stamp(cache_dir: Path, schema: Path, in_dir: Path, out_dir: Path, glob: str) -> None:
+    stamp = input_stamp(str(schema), str(in_dir), str(out_dir), glob)
+    stamp_path = cache_dir / STAMP_NAME
+    if stamp is None:
+        stamp_path.unlink(missing_ok=True)
+        return
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp = cache_dir / (STAMP_NAME + ".tmp")
+    tmp.write_text(stamp, encoding="utf-8")
+    tmp.replace(stamp_path)
+
+
+def compile_via_daemon(
+    schema_path: Path, in_dir: Path, out_dir: Path, glob: str, fail_fast: bool
+) -> Optional[CompileResult]:
+    """
+    Ask a running atlas daemon (scripts/atlas_daemon.py) to compile. Returns None when no
+    daemon is listening, it refuses the request (other normalizer code, paths outside
+    the directory it serves) or its reply is malformed, so the caller compiles in-process.
+    """
+    try:
+        from atlas_daemon import daemon_request
+    except ImportError:
+        return None
+
+    response = daemon_request(
+        {
+            "op": "compile",
+            "schema": str(schema_path.resolve()),
+            "in": str(in_dir),
+            "out": str(out_dir),
+            "glob": glob,
+            "fail_fast": fail_fast,
+            "fingerprint": normalizer_fingerprint(),
+        }
     )
-    ap.add_argument("--in", dest="in_dir", required=True, help="Input directory containing room .md files")
-    ap.add_argument("--out", dest="out_dir", required=True, help="Output directory for normalized JSON")
-    ap.add_argument("--glob", dest="glob", default="**/*.md", help="Glob pattern (default: **/*.md)")
-    ap.add_argument("--fail-fast", action="store_true", help="Stop on first error")
-    args = ap.parse_args(argv)
+    if response is None or response.get("refused"):
+        return None
+    if not response.get("ok"):
+        return CompileResult(errors=[f"atlas daemon: {response.get('error')}"])
+    try:
+        return CompileResult(**response["result"])
+    except (KeyError, TypeError):
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import atlas_metrics as metrics
+
+    args = build_parser().parse_args(argv)
+    args.schema = Path(args.schema)
+    args.cache_dir = Path(args.cache_dir) if args.cache_dir else None
+    args.shared_cache = Path(args.shared_cache) if args.shared_cache else None
+    metrics.lap("startup")
 
     try:
         schema = load_schema(args.schema)
+        digest = schema_sha256(args.schema)
     except SchemaError as e:
         print(f"[normalize_rooms] SCHEMA ERROR: {e}", file=sys.stderr)
         return 2
+    metrics.lap("schema")
 
     in_dir = Path(args.in_dir).resolve()
     out_dir = Path(args.out_dir).resolve()
-    out_dir.mkdir(parents=True, exist_ok=True)
 
-    md_files = sorted(in_dir.glob(args.glob))
-    if not md_files:
+    if not any(in_dir.glob(args.glob)):
         print(f"No markdown files found under {in_dir} matching {args.glob}")
         return 2
 
-    errors: List[str] = []
-    count_ok = 0
+    result = None
+    if not (args.fix_titles or args.no_daemon):
+        result = compile_via_daemon(args.schema, in_dir, out_dir, args.glob, args.fail_fast)
+        metrics.count(daemon=result is not None)
+    if result is None:
+        store = None
+        if not (args.no_shared_cache or args.fix_titles):
+            from atlas_store import open_store
+
+            store = open_store(normalizer_fingerprint(), args.shared_cache)
+        result = compile_rooms(
+            in_dir,
+            out_dir,
+            schema=schema,
+            schema_digest=digest,
+            glob=args.glob,
+            fail_fast=args.fail_fast,
+            fix_titles=args.fix_titles,
+            cache_dir=args.cache_dir.resolve() if args.cache_dir else None,
+            store=store,
+        )
+        if store is not None:
+            metrics.count(shared_hits=store.hits, shared_misses=store.misses)
+    metrics.lap("compile")
+    metrics.count(
+        mode="full",
+        files=result.count_total,
+        ok=result.count_ok,
+        cache_hits=result.count_cached,
+        cache_misses=result.count_total - result.count_cached,
+        written=result.count_written,
+        bytes_written=result.bytes_written,
+        errors=len(result.errors),
+    )
+
+    if result.errors and args.fail_fast:
+        print(result.errors[-1], file=sys.stderr)
+        return 1
 
-    for md in md_files:
-        try:
-            obj, effective_md = normalize_room_markdown(md, schema=schema, fix_titles=args.fix_titles)
-            out_path = out_dir / (effective_md.stem + ".json")
-            out_path.write_text(json.dumps(obj, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
-            count_ok += 1
-        except ParseError as e:
-            errors.append(str(e))
-            if args.fail_fast:
-                print(errors[-1], file=sys.stderr)
-                return 1
-
-    if errors:
-        print(f"\nNormalization completed with errors ({len(errors)}).", file=sys.stderr)
-        for msg in errors:
+    if result.errors:
+        print(f"\nNormalization completed with errors ({len(result.errors)}).", file=sys.stderr)
+        for msg in result.errors:
             print(" - " + msg, file=sys.stderr)
-        print(f"\nOK: {count_ok} / {len(md_files)}", file=sys.stderr)
+        print(f"\nOK: {result.count_ok} / {result.count_total}", file=sys.stderr)
         return 1
 
-    print(f"Normalization successful. OK: {count_ok} / {len(md_files)}")
+    if args.cache_dir and not args.fix_titles:
+        write_input_stamp(args.cache_dir, args.schema, in_dir, out_dir, args.glob)
+        metrics.lap("stamp")
+
+    shared = f" ({result.count_shared} from the shared cache)" if result.count_shared else ""
+    print(f"Normalization successful. OK: {result.count_ok} / {result.count_total}{shared}")
     return 0
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(atlas_metrics.timed(main))
@@ -0,0 +1,143 @@
+"""
+Shared fixtures: a throwaway atlas tree (schema, a few rooms, atlas.json) in tmp_path,
+with the scripts/ directory importable the way the CLIs import their siblings.
+"""
+
+from __future__ import annotations
+
+import json
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import pytest
+
+REPO = Path(__file__).resolve().parents[1]
+SCRIPTS = REPO / "scripts"
+SCHEMA = REPO / "schema" / "room_schema_v1.0.json"
+
+if str(SCRIPTS) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS))
+
+
+def room_md(
+    title: str,
+    internal_id: str,
+    *,
+    exits: Iterable[str] = (),
+    description: str = "A plain room.",
+    conditional: Iterable[str] = (),
+    objects: Iterable[str] = (),
+    state_notes: Iterable[str] = (),
+) -> str:
+    """Markdown for one room in canonical section order; exits are 'N → [[Z1 - X]]' lines."""
+
+    def bullets(items: Iterable[str]) -> List[str]:
+        return [f"- {item}" for item in items] or ["- ..."]
+
+    lines = [f"# {title}", "", "## Description (verbatim)", description, ""]
+    lines += ["## Exits (as reported)", *(bullets(exits) if exits else ["- None"]), ""]
+    lines += ["## Blocked movements", "- ...", ""]
+    lines += ["## Hidden/conditional transitions", *bullets(conditional), ""]
+    lines += ["## Objects present", *bullets(objects), ""]
+    lines += ["## Hazards/NPCs", "- ...", ""]
+    lines += ["## Key parser interactions", "- ...", ""]
+    lines += ["## State notes", *bullets(state_notes), ""]
+    lines += ["## Mapping notes", f"**Internal ID**: {internal_id}", "**First mapped**: 2026 Feb. 4", "**Revisions**:"]
+    return "\n".join(lines) + "\n"
+
+
+DEFAULT_ROOMS: Dict[str, str] = {
+    "Z1 - Kitchen": room_md(
+        "Z1 - Kitchen", "Z1-R-001", exits=["W → [[Z1 - Living Room]]", "E → [[Z1 - Behind House]]"],
+        description="You are in the kitchen of the white house.",
+    ),
+    "Z1 - Living Room": room_md(
+        "Z1 - Living Room", "Z1-R-002", exits=["E → [[Z1 - Kitchen]]"],
+        description="You are in the living room. There is a doorway to the east.",
+    ),
+    "Z1 - Behind House": room_md(
+        "Z1 - Behind House", "Z1-R-003", exits=["W → [[Z1 - Kitchen]]"],
+        description="You are behind the white house. A path leads into the forest to the east.",
+    ),
+}
+
+
+class AtlasTree:
+    """A minimal atlas checkout rooted at `root` (the test's working directory)."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.rooms = root / "rooms"
+        self.normalized = root / "normalized"
+        self.schema = root / "schema" / "room_schema_v1.0.json"
+        self.cache = root / ".atlas-cache" / "Z1"
+
+    def write_room(self, title: str, text: str) -> Path:
+        path = self.rooms / f"{title}.md"
+        path.write_text(text, encoding="utf-8")
+        return path
+
+    def normalize(self, *extra: str, cache: bool = True) -> subprocess.CompletedProcess:
+        args = ["--schema", str(self.schema), "--in", str(self.rooms), "--out", str(self.normalized), "--no-daemon"]
+        if cache:
+            args += ["--cache-dir", str(self.cache)]
+        return run_script("normalize_rooms_schema_authoritative.py", *args, *extra, cwd=self.root)
+
+    def git(self, *args: str) -> str:
+        return subprocess.run(
+            ["git", *args], cwd=self.root, check=True, capture_output=True, text=True
+        ).stdout
+
+    def init_git(self) -> None:
+        self.git("init", "-q")
+        self.git("config", "user.email", "atlas@example.invalid")
+        self.git("config", "user.name", "atlas")
+        self.git("config", "core.autocrlf", "false")
+        self.git("add", "-A")
+        self.git("commit", "-q", "-m", "baseline")
+
+
+def run_script(name: str, *args: str, cwd: Path, env: Optional[Dict[str, str]] = None) -> subprocess.CompletedProcess:
+    import os
+
+    full_env = dict(os.environ)
+    full_env.update(env or {})
+    return subprocess.run(
+        [sys.executable, str(SCRIPTS / name), *args], cwd=cwd, env=full_env, capture_output=True, text=True
+    )
+
+
+@pytest.fixture(autouse=True)
+def _isolated_env(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Keep tests off the real shared store, metrics file and daemon socket."""
+    monkeypatch.setenv("ATLAS_STORE_DIR", str(tmp_path / "store"))
+    monkeypatch.setenv("ATLAS_METRICS", "0")
+    monkeypatch.setenv("ATLAS_DAEMON_SOCKET", str(tmp_path / "no-daemon.sock"))
+
+
+@pytest.fixture
+def atlas(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> AtlasTree:
+    root = tmp_path / "atlas"
+    (root / "schema").mkdir(parents=True)
+    shutil.copy(SCHEMA, root / "schema" / SCHEMA.name)
+    (root / "rooms").mkdir()
+    (root / "normalized").mkdir()
+    (root / "atlas.json").write_text(
+        json.dumps(
+            {
+                "cache_dir": ".atlas-cache",
+                "manifest": "build/atlas_manifest.json",
+                "shards": [{"game": "Z1", "schema": "schema/room_schema_v1.0.json", "in": "rooms", "out": "normalized"}],
+            },
+            indent=2,
+        ),
+        encoding="utf-8",
+    )
+    tree = AtlasTree(root)
+    for title, text in DEFAULT_ROOMS.items():
+        tree.write_room(title, text)
+    monkeypatch.chdir(root)
+    return tree
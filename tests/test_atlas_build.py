@@ -0,0 +1,89 @@
+"""Game shards declared in atlas.json, each with its own schema, ID space and cache."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+import atlas_build
+from atlas_build import ConfigError, build_shard, load_config
+from conftest import room_md
+from normalize_rooms_schema_authoritative import load_schema
+
+
+def _write_config(root: Path, shards) -> Path:
+    path = root / "atlas.json"
+    path.write_text(json.dumps({"shards": shards}), encoding="utf-8")
+    return path
+
+
+def _z2_schema(atlas) -> Path:
+    schema = json.loads(atlas.schema.read_text(encoding="utf-8"))
+    schema["properties"]["title"]["pattern"] = schema["properties"]["title"]["pattern"].replace("Z1", "Z2")
+    path = atlas.root / "schema" / "room_schema_z2.json"
+    path.write_text(json.dumps(schema, indent=2), encoding="utf-8")
+    return path
+
+
+def test_load_config_resolves_paths_against_the_config(atlas):
+    config = load_config(atlas.root / "atlas.json")
+    (shard,) = config.shards
+    assert shard.game == "Z1"
+    assert shard.in_dir == atlas.rooms
+    assert shard.cache_dir == atlas.root / ".atlas-cache" / "Z1"
+    assert shard.registry == atlas.root / "registry" / "Z1.json"
+
+
+@pytest.mark.parametrize(
+    "shards, message",
+    [
+        ([], "No shards"),
+        ([{"game": "Z1", "schema": "s.json", "in": "rooms"}], "must define"),
+        ([{"game": "Z1", "schema": "s", "in": "a", "out": "b"}] * 2, "Duplicate shard"),
+    ],
+)
+def test_load_config_rejects_bad_shards(tmp_path, shards, message):
+    with pytest.raises(ConfigError, match=message):
+        load_config(_write_config(tmp_path, shards))
+
+
+def test_game_prefix_comes_from_the_schema(atlas):
+    assert load_schema(atlas.schema).game == "Z1"
+    assert load_schema(_z2_schema(atlas)).game == "Z2"
+
+
+def test_schema_game_must_match_the_shard(atlas):
+    _write_config(atlas.root, [{"game": "Z2", "schema": "schema/room_schema_v1.0.json", "in": "rooms", "out": "normalized"}])
+    (shard,) = load_config(atlas.root / "atlas.json").shards
+    entry = build_shard(shard, shared_cache=False)
+    assert any("declares game 'Z1'" in e for e in entry["errors"])
+
+
+def test_shards_build_independently(atlas):
+    _z2_schema(atlas)
+    (atlas.root / "rooms_z2").mkdir()
+    (atlas.root / "rooms_z2" / "Z2 - Inside the Barrow.md").write_text(
+        room_md("Z2 - Inside the Barrow", "Z2-R-001", exits=["S → [[Z2 - Narrow Tunnel]]"]), encoding="utf-8"
+    )
+    _write_config(
+        atlas.root,
+        [
+            {"game": "Z1", "schema": "schema/room_schema_v1.0.json", "in": "rooms", "out": "normalized"},
+            {"game": "Z2", "schema": "schema/room_schema_z2.json", "in": "rooms_z2", "out": "normalized_z2"},
+        ],
+    )
+    assert atlas_build.main(["--no-shared-cache", "--jobs", "1"]) == 0
+
+    z2 = json.loads((atlas.root / "normalized_z2" / "Z2 - Inside the Barrow.json").read_text(encoding="utf-8"))
+    assert z2["sections"]["Exits (as reported)"] == ["S → [[Z2 - Narrow Tunnel]]"]
+    assert (atlas.root / ".atlas-cache" / "Z1" / "compile_cache.json").exists()
+    assert (atlas.root / ".atlas-cache" / "Z2" / "compile_cache.json").exists()
+
+    manifest = json.loads((atlas.root / "build" / "atlas_manifest.json").read_text(encoding="utf-8"))
+    assert [(s["game"], s["rooms"]) for s in manifest["shards"]] == [("Z1", 3), ("Z2", 1)]
+
+
+def test_unknown_game_is_a_usage_error(atlas):
+    assert atlas_build.main(["--game", "Z9"]) == 2
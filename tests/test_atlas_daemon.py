@@ -0,0 +1,184 @@
+"""The compile daemon answers exactly like an in-process compile, or not at all."""
+
+from __future__ import annotations
+
+import json
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from atlas_daemon import daemon_request
+from conftest import SCRIPTS
+from normalize_rooms_schema_authoritative import compile_via_daemon
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix domain sockets")
+
+
+@pytest.fixture
+def socket_dir():
+    # AF_UNIX paths are limited to ~100 bytes, so not under pytest's tmp_path.
+    path = Path(tempfile.mkdtemp(prefix="atlasd-"))
+    yield path
+    shutil.rmtree(path, ignore_errors=True)
+
+
+@pytest.fixture
+def daemon(atlas, socket_dir, monkeypatch):
+    sock = socket_dir / "d.sock"
+    monkeypatch.setenv("ATLAS_DAEMON_SOCKET", str(sock))
+    proc = subprocess.Popen(
+        [sys.executable, str(SCRIPTS / "atlas_daemon.py"), "serve", "--socket", str(sock), "--root", str(atlas.root)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    for _ in range(200):
+        if daemon_request({"op": "ping"}, sock) is not None:
+            break
+        time.sleep(0.02)
+    else:
+        proc.kill()
+        pytest.fail("daemon did not start")
+    yield sock
+    daemon_request({"op": "shutdown"}, sock)
+    proc.wait(timeout=10)
+
+
+def _normalize(atlas, via_daemon: bool):
+    args = [] if via_daemon else ["--no-daemon"]
+    return subprocess.run(
+        [sys.executable, str(SCRIPTS / "normalize_rooms_schema_authoritative.py"),
+         "--schema", str(atlas.schema), "--in", str(atlas.rooms), "--out", str(atlas.normalized), *args],
+        cwd=atlas.root, capture_output=True, text=True,
+    )
+
+
+def _require_new_section(atlas) -> None:
+    schema = json.loads(atlas.schema.read_text(encoding="utf-8"))
+    schema["properties"]["section_order"]["const"].append("Treasure")
+    schema["properties"]["sections"]["required"].append("Treasure")
+    schema["properties"]["sections"]["properties"]["Treasure"] = {"type": "array", "items": {"type": "string"}}
+    atlas.schema.write_text(json.dumps(schema, indent=2), encoding="utf-8")
+
+
+def test_daemon_output_matches_in_process(atlas, daemon):
+    via_daemon = _normalize(atlas, via_daemon=True)
+    assert via_daemon.returncode == 0, via_daemon.stderr
+    daemon_outputs = {p.name: p.read_bytes() for p in atlas.normalized.glob("*.json")}
+
+    for p in atlas.normalized.glob("*.json"):
+        p.unlink()
+    in_process = _normalize(atlas, via_daemon=False)
+    assert in_process.returncode == 0
+    assert {p.name: p.read_bytes() for p in atlas.normalized.glob("*.json")} == daemon_outputs
+    assert daemon_request({"op": "ping"}, daemon)["result"]["rooms"] == 3
+
+
+def test_schema_change_invalidates_parsed_rooms(atlas, daemon):
+    assert _normalize(atlas, via_daemon=True).returncode == 0
+    _require_new_section(atlas)
+
+    via_daemon = _normalize(atlas, via_daemon=True)
+    in_process = _normalize(atlas, via_daemon=False)
+    assert in_process.returncode == via_daemon.returncode == 1
+    assert "OK: 0 / 3" in in_process.stderr
+    assert "OK: 0 / 3" in via_daemon.stderr
+
+
+def test_paths_outside_the_root_are_refused(atlas, daemon, tmp_path):
+    outside = tmp_path / "elsewhere"
+    response = daemon_request(
+        {"op": "compile", "schema": str(atlas.schema), "in": str(atlas.rooms), "out": str(outside),
+         "fingerprint": "x"}, daemon,
+    )
+    assert response["refused"] is True
+    assert not outside.exists()
+
+
+def test_other_normalizer_code_is_refused(atlas, daemon):
+    response = daemon_request(
+        {"op": "compile", "schema": str(atlas.schema), "in": str(atlas.rooms), "out": str(atlas.normalized),
+         "fingerprint": "0" * 64}, daemon,
+    )
+    assert response["refused"] is True
+    assert "differs" in response["error"]
+
+
+def test_compile_via_daemon_falls_back_when_refused(atlas, daemon, tmp_path):
+    result = compile_via_daemon(atlas.schema, atlas.rooms, tmp_path / "elsewhere", "**/*.md", False)
+    assert result is None
+
+
+def test_malformed_reply_falls_back_to_in_process(atlas, socket_dir, monkeypatch):
+    sock_path = socket_dir / "bad.sock"
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(str(sock_path))
+    server.listen(1)
+
+    def answer_garbage():
+        conn, _ = server.accept()
+        with conn:
+            conn.recv(65536)
+            conn.sendall(b"{not json\n")
+
+    thread = threading.Thread(target=answer_garbage, daemon=True)
+    thread.start()
+    monkeypatch.setenv("ATLAS_DAEMON_SOCKET", str(sock_path))
+    try:
+        assert compile_via_daemon(atlas.schema, atlas.rooms, atlas.normalized, "**/*.md", False) is None
+    finally:
+        thread.join(timeout=5)
+        server.close()
+
+
+def _validate(atlas, sock, **extra):
+    from normalize_rooms_schema_authoritative import normalizer_fingerprint
+
+    request = {"op": "validate", "schema": str(atlas.schema), "out": str(atlas.normalized),
+               "fingerprint": normalizer_fingerprint(), **extra}
+    return daemon_request(request, sock)
+
+
+def test_validate_reuses_the_loaded_validator_and_verdicts(atlas, daemon):
+    pytest.importorskip("jsonschema")
+    assert _normalize(atlas, via_daemon=True).returncode == 0
+    first = _validate(atlas, daemon)["result"]
+    assert first["validated"] == 3
+    assert {verdict for _, verdict in first["files"].values()} == {"ok"}
+    assert _validate(atlas, daemon)["result"]["validated"] == 0
+
+    path = atlas.normalized / "Z1 - Kitchen.json"
+    data = json.loads(path.read_text(encoding="utf-8"))
+    del data["sections"]
+    path.write_text(json.dumps(data), encoding="utf-8")
+    again = _validate(atlas, daemon, files=["Z1 - Kitchen.json"])["result"]
+    assert again["validated"] == 1
+    assert again["files"]["Z1 - Kitchen.json"][1] != "ok"
+
+
+def test_validate_refuses_other_normalizer_code(atlas, daemon):
+    assert _validate(atlas, daemon, fingerprint="0" * 64)["refused"] is True
+
+
+def test_engine_validates_through_the_daemon(atlas, daemon, capsys):
+    pytest.importorskip("jsonschema")
+    import atlas_engine
+
+    assert _normalize(atlas, via_daemon=True).returncode == 0
+    assert atlas_engine.main(["--validate"]) == 0
+    assert "(3 validated, 0 unchanged)" in capsys.readouterr().out
+    assert daemon_request({"op": "ping"}, daemon)["result"]["verdicts"] == 3
+
+    path = atlas.normalized / "Z1 - Living Room.json"
+    path.write_text(path.read_text(encoding="utf-8").replace('"title"', '"titel"'), encoding="utf-8")
+    assert atlas_engine.main(["--validate", "--all-errors"]) == 1
+    via_daemon = capsys.readouterr().err
+    assert atlas_engine.main(["--validate", "--all-errors", "--no-daemon"]) == 1
+    assert capsys.readouterr().err == via_daemon
+    assert daemon_request({"op": "ping"}, daemon)["result"]["verdicts"] == 4
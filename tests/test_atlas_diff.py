@@ -0,0 +1,116 @@
+"""Semantic atlas diff between git revisions."""
+
+from __future__ import annotations
+
+import json
+
+import atlas_diff
+from conftest import room_md
+
+
+def _commit(atlas, message):
+    assert atlas.normalize().returncode == 0
+    atlas.git("add", "-A")
+    atlas.git("commit", "-q", "-m", message)
+
+
+def _diff(atlas, rev1="HEAD~1", rev2="HEAD"):
+    report, _ = atlas_diff.atlas_diff(atlas.root / "atlas.json", rev1, rev2)
+    return report.get("Z1", {})
+
+
+def test_exit_object_and_description_changes(atlas):
+    assert atlas.normalize().returncode == 0
+    atlas.init_git()
+    atlas.write_room("Z1 - Kitchen", room_md(
+        "Z1 - Kitchen", "Z1-R-001", exits=["W → [[Z1 - Behind House]]", "U → [[Z1 - Attic]]"],
+        description="You are in a kitchen.", objects=["Sack"],
+    ))
+    _commit(atlas, "edit")
+
+    changed = _diff(atlas)["changed"]["Z1 - Kitchen"]
+    assert changed["exits"] == {
+        "added": [["U", "Z1 - Attic"]],
+        "removed": [["E", "Z1 - Behind House"]],
+        "redirected": [["W", "Z1 - Living Room", "Z1 - Behind House"]],
+    }
+    assert changed["objects"]["added"] == ["Sack"]
+    assert changed["description"] == "changed"
+
+
+def test_rename_is_paired_by_internal_id(atlas):
+    assert atlas.normalize().returncode == 0
+    atlas.init_git()
+    (atlas.rooms / "Z1 - Behind House.md").unlink()
+    (atlas.normalized / "Z1 - Behind House.json").unlink()
+    atlas.write_room("Z1 - Back Yard", room_md("Z1 - Back Yard", "Z1-R-003", exits=["W → [[Z1 - Kitchen]]"]))
+    _commit(atlas, "rename")
+
+    diff = _diff(atlas)
+    assert diff["renamed"] == [["Z1 - Behind House", "Z1 - Back Yard"]]
+    assert "added" not in diff and "removed" not in diff
+
+
+def test_duplicate_internal_ids_fall_back_to_paths(atlas):
+    atlas.write_room("Z1 - Cellar", room_md("Z1 - Cellar", "Z1-R-003"))
+    assert atlas.normalize().returncode == 0
+    atlas.init_git()
+    for title in ("Z1 - Behind House", "Z1 - Cellar"):
+        (atlas.rooms / f"{title}.md").unlink()
+        (atlas.normalized / f"{title}.json").unlink()
+    atlas.write_room("Z1 - Back Yard", room_md("Z1 - Back Yard", "Z1-R-003"))
+    _commit(atlas, "drop two, add one")
+
+    diff = _diff(atlas)
+    assert "renamed" not in diff
+    assert diff["added"] == ["Z1 - Back Yard"]
+    assert diff["removed"] == ["Z1 - Behind House", "Z1 - Cellar"]
+
+
+def test_config_is_read_at_each_revision(atlas):
+    assert atlas.normalize().returncode == 0
+    atlas.init_git()
+    atlas.git("mv", "normalized", "compiled")
+    config = json.loads((atlas.root / "atlas.json").read_text(encoding="utf-8"))
+    config["shards"][0]["out"] = "compiled"
+    (atlas.root / "atlas.json").write_text(json.dumps(config), encoding="utf-8")
+    atlas.normalized = atlas.root / "compiled"
+    atlas.write_room("Z1 - Cellar", room_md("Z1 - Cellar", "Z1-R-004"))
+    _commit(atlas, "move output")
+
+    report, stats = atlas_diff.atlas_diff(atlas.root / "atlas.json", "HEAD~1", "HEAD")
+    assert report == {"Z1": {"added": ["Z1 - Cellar"]}}
+    assert stats["unchanged"] == 3
+    # The old tree's own atlas.json names the old directory, in either direction.
+    assert atlas_diff.atlas_diff(atlas.root / "atlas.json", "HEAD", "HEAD~1")[0] == {"Z1": {"removed": ["Z1 - Cellar"]}}
+
+
+def test_unchanged_blobs_are_not_read(atlas, capsys):
+    assert atlas.normalize().returncode == 0
+    atlas.init_git()
+    atlas.git("commit", "-q", "--allow-empty", "-m", "empty")
+    assert atlas_diff.main(["HEAD~1"]) == 0
+    captured = capsys.readouterr()
+    assert captured.out.strip() == "No semantic changes."
+    assert "3 unchanged blob(s) skipped, 0 read" in captured.err
+
+
+def test_revision_without_config_is_the_default_z1_shard(atlas, capsys):
+    assert atlas.normalize().returncode == 0
+    config = (atlas.root / "atlas.json").read_text(encoding="utf-8")
+    (atlas.root / "atlas.json").unlink()
+    atlas.init_git()  # a tree from before atlas.json, like the v1.0 release
+    (atlas.root / "atlas.json").write_text(config, encoding="utf-8")
+    atlas.write_room("Z1 - Cellar", room_md("Z1 - Cellar", "Z1-R-004"))
+    _commit(atlas, "add config")
+
+    assert atlas_diff.main(["HEAD~1", "HEAD"]) == 0
+    assert "Z1 - Cellar" in capsys.readouterr().out
+    assert _diff(atlas, "HEAD", "HEAD~1") == {"removed": ["Z1 - Cellar"]}
+
+
+def test_unknown_revision_is_an_error(atlas, capsys):
+    assert atlas.normalize().returncode == 0
+    atlas.init_git()
+    assert atlas_diff.main(["no-such-rev", "HEAD"]) == 2
+    assert "no-such-rev" in capsys.readouterr().err
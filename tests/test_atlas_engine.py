@@ -0,0 +1,90 @@
+"""One engine behind the compile gate and validate_rooms_json.py."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+import atlas_engine
+from conftest import room_md, run_script
+
+pytest.importorskip("jsonschema")
+
+
+def _committed(atlas):
+    assert atlas.normalize().returncode == 0
+    atlas.init_git()
+
+
+def test_unknown_game_is_rejected(atlas, capsys):
+    assert atlas_engine.main(["--validate", "--game", "Z9"]) == 2
+    assert "Unknown shard(s): ['Z9']" in capsys.readouterr().err
+
+
+def test_validate_reuses_verdicts_until_a_file_changes(atlas, capsys):
+    assert atlas.normalize().returncode == 0
+    assert atlas_engine.main(["--validate"]) == 0
+    assert "(3 validated, 0 unchanged)" in capsys.readouterr().out
+    assert atlas_engine.main(["--validate"]) == 0
+    assert "(0 validated, 3 unchanged)" in capsys.readouterr().out
+
+    path = atlas.normalized / "Z1 - Kitchen.json"
+    data = json.loads(path.read_text(encoding="utf-8"))
+    del data["sections"]
+    path.write_text(json.dumps(data), encoding="utf-8")
+    assert atlas_engine.main(["--validate"]) == 1
+    assert "SCHEMA VALIDATION FAILED: normalized/Z1 - Kitchen.json" in capsys.readouterr().err
+
+
+def test_compile_is_skipped_while_the_stamp_matches(atlas, capsys):
+    assert atlas_engine.main(["--compile", "--no-daemon"]) == 0
+    assert "compiled 3 room(s)" in capsys.readouterr().out
+    assert atlas_engine.main(["--compile", "--no-daemon"]) == 0
+    assert "compile skipped" in capsys.readouterr().out
+
+
+def test_check_diff_compares_against_the_index_from_the_config_root(atlas, tmp_path):
+    _committed(atlas)
+    config = str(atlas.root / "atlas.json")
+    elsewhere = tmp_path / "elsewhere"
+    elsewhere.mkdir()
+
+    assert run_script("atlas_engine.py", "--config", config, "--check-diff", cwd=elsewhere).returncode == 0
+    atlas.write_room("Z1 - Kitchen", room_md("Z1 - Kitchen", "Z1-R-001", description="Edited."))
+    unstaged = run_script("atlas_engine.py", "--config", config, "--check-diff", cwd=elsewhere)
+    assert unstaged.returncode == 1
+    assert "rooms/ or normalized/ has unstaged changes" in unstaged.stderr
+
+    atlas.git("add", "rooms")  # staged but not committed: no longer a diff
+    assert run_script("atlas_engine.py", "--config", config, "--check-diff", cwd=elsewhere).returncode == 0
+
+
+def test_staged_errors_name_the_room_once(atlas, capsys):
+    _committed(atlas)
+    atlas.write_room("Z1 - Broken", "no heading\n")
+    (atlas.rooms / "Z1 - Latin.md").write_bytes(b"# Z1 - Latin\n\xff\n")
+    atlas.git("add", "rooms")
+    assert atlas_engine.main(["--staged", "--no-daemon"]) == 1
+    err = capsys.readouterr().err
+    for name in ("Z1 - Broken.md", "Z1 - Latin.md"):
+        line = next(line for line in err.splitlines() if name in line)
+        assert line.count(name) == 1, line
+    assert "not valid UTF-8" in err
+
+    # The parse error now comes from the shared store and reads the same.
+    assert atlas_engine.main(["--staged", "--no-daemon"]) == 1
+    again = capsys.readouterr().err
+    assert next(line for line in again.splitlines() if "Z1 - Broken.md" in line).count("Z1 - Broken.md") == 1
+
+
+def test_compile_gate_wraps_the_engine(atlas):
+    _committed(atlas)
+    staged = run_script("atlas_compile_gate.py", cwd=atlas.root)
+    assert staged.returncode == 0, staged.stderr
+    assert "No staged room changes." in staged.stdout
+    assert "Atlas compiler gate PASSED." in staged.stdout
+
+    full = run_script("atlas_compile_gate.py", "--all", cwd=atlas.root)
+    assert full.returncode == 0, full.stderr
+    assert "schema validation OK: 3 file(s)" in full.stdout
@@ -0,0 +1,129 @@
+"""Per-run metrics and regression report."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+import atlas_metrics as metrics
+from conftest import run_script
+
+
+@pytest.fixture
+def metrics_file(tmp_path, monkeypatch):
+    path = tmp_path / "metrics.jsonl"
+    monkeypatch.setenv("ATLAS_METRICS", "1")
+    monkeypatch.setenv("ATLAS_METRICS_FILE", str(path))
+    return path
+
+
+@pytest.mark.parametrize("value", [
+    None, True, False, 0, -3, 1.5, "plain", 'quo"te\\back\nline\ttab\x01', "héllo →",
+    {"a": [1, "b", None], "n": {"x": 2.25}}, [],
+])
+def test_encode_matches_json(value):
+    assert json.loads(metrics._encode(value)) == value
+
+
+def test_encode_non_finite_and_unknown_values():
+    assert metrics._encode(float("nan")) == "null"
+    assert metrics._encode(float("inf")) == "null"
+    assert json.loads(metrics._encode(("t", 1))) == ["t", 1]
+    assert json.loads(metrics._encode({1: object}))["1"].startswith("<class")
+
+
+def test_timed_records_one_line_per_run(metrics_file, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # outside any repository
+
+    def tool():
+        metrics.lap("load")
+        metrics.count(mode="full", files=3)
+        return 0
+
+    assert metrics.timed(tool, "demo") == 0
+    with pytest.raises(SystemExit):
+        metrics.timed(lambda: (_ for _ in ()).throw(SystemExit(2)), "demo")
+
+    first, second = [json.loads(line) for line in metrics_file.read_text(encoding="utf-8").splitlines()]
+    assert (first["tool"], first["exit"], first["rev"]) == ("demo", 0, None)
+    assert set(first["stages"]) == {"load"} and first["counts"] == {"mode": "full", "files": 3}
+    assert second["exit"] == 2
+
+
+def test_disabled_and_outside_a_run(metrics_file, monkeypatch):
+    metrics.lap("ignored")
+    metrics.count(x=1)
+    assert metrics.finish(0) == 0
+    monkeypatch.setenv("ATLAS_METRICS", "0")
+    assert metrics.timed(lambda: 0, "demo") == 0
+    assert not metrics_file.exists()
+
+
+def test_trim_keeps_whole_newest_lines(metrics_file, monkeypatch):
+    monkeypatch.setattr(metrics, "MAX_BYTES", 4096)
+    for i in range(200):
+        metrics._append(str(metrics_file), metrics._encode({"tool": "t", "ms": i}) + "\n")
+    lines = metrics_file.read_text(encoding="utf-8").splitlines()
+    assert metrics_file.stat().st_size <= 4096
+    assert [json.loads(line)["ms"] for line in lines] == list(range(200 - len(lines), 200))
+
+
+def test_git_revision(atlas, monkeypatch):
+    atlas.init_git()
+    head = atlas.git("rev-parse", "HEAD").strip()
+    assert metrics.git_revision() == head[:7]
+
+    atlas.git("pack-refs", "--all")  # the branch ref now only lives in packed-refs
+    assert metrics.git_revision() == head[:7]
+
+    atlas.git("checkout", "-q", "--detach")
+    assert metrics.git_revision() == head[:7]
+
+    worktree = atlas.root.parent / "wt"
+    atlas.git("worktree", "add", "-q", "-b", "side", str(worktree))
+    (atlas.root / "x").write_text("x", encoding="utf-8")
+    atlas.git("add", "x")
+    atlas.git("commit", "-q", "-m", "x")
+    monkeypatch.chdir(worktree)
+    assert metrics.git_revision() == head[:7]
+
+
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 11))
+    assert [metrics.percentile(values, p) for p in (0, 10, 50, 90, 99, 100)] == [1, 1, 5, 9, 10, 10]
+    assert metrics.percentile([], 50) != metrics.percentile([], 50)  # nan
+
+
+def _run(ms, **stages):
+    return {"tool": "t", "ms": ms, "stages": stages, "counts": {"mode": "full"}}
+
+
+def test_regressions_blame_the_slowest_stage():
+    runs = [_run(10, load=2, compile=8) for _ in range(5)] + [_run(30, load=3, compile=27), _run(11, load=2, compile=9)]
+    flagged = metrics.regressions(runs, window=5, threshold=1.5)
+    assert len(flagged) == 1
+    assert flagged[0]["run"]["ms"] == 30 and flagged[0]["baseline_ms"] == 10
+    assert flagged[0]["stage"] == "compile" and flagged[0]["stage_delta_ms"] == 19
+
+
+def test_report_groups_by_mode_and_cli(metrics_file, capsys):
+    records = [_run(10) for _ in range(5)] + [_run(40)] + [{"tool": "t", "ms": 1, "counts": {"mode": "noop"}}]
+    lines = metrics.report(records, last=50, window=5, threshold=1.5)
+    assert [line.split()[:3] for line in lines[1:3]] == [["t", "full", "6"], ["t", "noop", "1"]]
+    assert lines[-1].startswith("REGRESSION t (full)")
+
+    metrics_file.write_text("\n".join(json.dumps(r) for r in records) + "\n{cut", encoding="utf-8")
+    assert metrics.main(["report", "--window", "5"]) == 0
+    assert metrics.main(["report", "--window", "5", "--fail-on-regression"]) == 1
+    assert metrics.main(["report", "--tool", "other"]) == 1
+    assert "No records" in capsys.readouterr().err
+
+
+def test_validate_entry_point_records_a_run(atlas, metrics_file):
+    assert atlas.normalize().returncode == 0
+    metrics_file.unlink()
+    result = run_script("validate_rooms_json.py", "--no-daemon", cwd=atlas.root)
+    assert result.returncode == 0, result.stderr
+    records = [json.loads(line) for line in metrics_file.read_text(encoding="utf-8").splitlines()]
+    assert [r["tool"] for r in records] == ["validate"]
@@ -0,0 +1,60 @@
+"""The __slots__ room model reproduces the normalized JSON exactly."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from atlas_model import EXITS_SECTION, Direction, Exit, Room, parse_exit_line
+from conftest import REPO, SCHEMA
+from normalize_rooms_schema_authoritative import load_schema, parse_room_markdown, render_room_json
+
+ROOMS = sorted((REPO / "rooms").glob("*.md"))
+
+
+@pytest.fixture(scope="module")
+def schema():
+    return load_schema(SCHEMA)
+
+
+def test_parsed_rooms_render_the_committed_json(schema):
+    for md in ROOMS:
+        room, _ = parse_room_markdown(md, schema=schema)
+        committed = (REPO / "normalized" / f"{md.stem}.json").read_text(encoding="utf-8")
+        assert render_room_json(room.to_dict()) == committed, md.name
+
+
+def test_rooms_share_the_schema_section_order(schema):
+    first, _ = parse_room_markdown(ROOMS[0], schema=schema)
+    second, _ = parse_room_markdown(ROOMS[1], schema=schema)
+    assert first.order is second.order
+    assert EXITS_SECTION in first.order
+
+
+def test_from_dict_round_trip(schema):
+    for md in ROOMS[:10]:
+        data = json.loads((REPO / "normalized" / f"{md.stem}.json").read_text(encoding="utf-8"))
+        assert Room.from_dict(data).to_dict() == data
+
+
+def test_markdown_round_trip(schema, tmp_path):
+    for md in ROOMS:
+        room, _ = parse_room_markdown(md, schema=schema)
+        copy = tmp_path / md.name
+        copy.write_text(room.to_markdown(), encoding="utf-8")
+        again, _ = parse_room_markdown(copy, schema=schema)
+        assert again.to_dict() == room.to_dict(), md.name
+
+
+def test_exit_lines():
+    exit_ = parse_exit_line("D → [[Z1 - Cave A]]")
+    assert exit_ == Exit(Direction.D, "Z1 - Cave A")
+    assert str(exit_) == "D → [[Z1 - Cave A]]"
+    with pytest.raises(ValueError):
+        parse_exit_line("D -> Z1 - Cave A")
+
+
+def test_section_count_must_match_the_order(schema):
+    with pytest.raises(ValueError):
+        Room("Z1 - Kitchen", schema.section_order, ())
@@ -0,0 +1,59 @@
+"""State-aware reachability over conditional exits."""
+
+from __future__ import annotations
+
+import pytest
+
+import atlas_reachability as reach
+from atlas_reachability import StateGraph, condition_flag
+
+
+def _graph(edges):
+    titles = sorted({e[0] for e in edges} | {e[1] for e in edges})
+    return StateGraph(titles, set(), edges)
+
+
+def test_condition_text_compiles_to_one_flag():
+    assert condition_flag("(once window is open)") == "open-window"
+    assert condition_flag("(via open window)") == "open-window"
+    assert condition_flag("(one-way drop)") is None
+
+
+def test_gated_edges_need_their_flag():
+    g = _graph([("A", "B", "N", None), ("B", "C", "D", "open-trapdoor")])
+    a, c = g.node("A"), g.node("C")
+    assert c not in g.reachable(a, 0)
+    assert c in g.reachable(a, g.state(["open-trapdoor"]))
+    assert [g.describe_state(m) for m in g.minimal_requirements(a, c)] == ["open-trapdoor"]
+
+
+def test_exclusive_flags_are_never_required_together():
+    g = _graph([
+        ("A", "B", "E", "lit"),
+        ("B", "C", "N", "dark"),
+        ("A", "C", "W", "rope"),
+    ])
+    reqs = [g.describe_state(m) for m in g.minimal_requirements(g.node("A"), g.node("C"))]
+    assert reqs == ["rope"]
+
+
+def test_contradictory_state_is_rejected():
+    g = _graph([("A", "B", "E", "lit"), ("B", "A", "W", "dark")])
+    with pytest.raises(ValueError, match="Contradictory"):
+        g.state(["dark", "lit"])
+    assert g.all_flags == 0  # exclusive flags are only set explicitly
+
+
+def test_traps_and_components():
+    g = _graph([("A", "B", "N", None), ("B", "A", "S", None), ("B", "Pit", "D", None)])
+    assert [[g.titles[u] for u in comp] for comp in g.traps(0)] == [["Pit"]]
+    assert sorted(len(c) for c in g.sccs(0)) == [1, 2]
+
+
+def test_cli_on_the_committed_atlas(capsys):
+    from conftest import REPO
+
+    config = str(REPO / "atlas.json")
+    assert reach.main(["--config", config, "reachable", "Z1 - Kitchen", "Z1 - Living Room"]) == 0
+    assert reach.main(["--config", config, "traps", "--state", "dark,lit"]) == 2
+    assert "Contradictory flags" in capsys.readouterr().err
@@ -0,0 +1,79 @@
+"""The Internal ID registry catches duplicates, gaps and reuse."""
+
+from __future__ import annotations
+
+import atlas_build
+from atlas_build import load_config
+from atlas_registry import Registry, description_fingerprint, load_registry, reconcile
+from conftest import room_md
+
+KITCHEN = "You are in the kitchen of the white house. A table seems to have been used recently for the preparation of food."
+ATTIC = "This is the attic. The only exit is a stairway leading down. A large coil of rope is lying in the corner."
+
+
+def _registry(**ids):
+    titles = {i: t for i, (t, _) in ids.items()}
+    return Registry(
+        game="Z1",
+        next=len(ids) + 1,
+        ids=titles,
+        fingerprints={i: description_fingerprint(d) for i, (_, d) in ids.items()},
+    )
+
+
+def test_bootstrap_records_ids_and_retires_gaps():
+    registry, problems = reconcile(
+        Registry(game="Z1"), [("Z1 - Kitchen", "Z1-R-001", KITCHEN), ("Z1 - Attic", "Z1-R-003", ATTIC)], bootstrap=True
+    )
+    assert problems == []
+    assert registry.ids == {"Z1-R-001": "Z1 - Kitchen", "Z1-R-003": "Z1 - Attic"}
+    assert registry.retired == {"Z1-R-002": None}
+    assert registry.next == 4
+    assert set(registry.fingerprints) == {"Z1-R-001", "Z1-R-003"}
+
+
+def test_new_ids_must_continue_the_sequence_and_not_repeat():
+    base = _registry(**{"Z1-R-001": ("Z1 - Kitchen", KITCHEN)})
+    _, problems = reconcile(base, [("Z1 - Kitchen", "Z1-R-001", KITCHEN), ("Z1 - Attic", "Z1-R-005", ATTIC)])
+    assert any("not allocated in sequence" in p for p in problems)
+    _, problems = reconcile(base, [("Z1 - Kitchen", "Z1-R-001", KITCHEN), ("Z1 - Attic", "Z1-R-001", ATTIC)])
+    assert any("duplicate Internal ID Z1-R-001" in p for p in problems)
+
+
+def test_rename_keeps_the_id():
+    base = _registry(**{"Z1-R-001": ("Z1 - Kitchen", KITCHEN)})
+    updated, problems = reconcile(base, [("Z1 - Scullery", "Z1-R-001", KITCHEN + " It smells of soap.")])
+    assert problems == []
+    assert updated.ids == {"Z1-R-001": "Z1 - Scullery"}
+
+
+def test_id_reused_by_a_different_room_is_reported():
+    base = _registry(**{"Z1-R-001": ("Z1 - Kitchen", KITCHEN)})
+    updated, problems = reconcile(base, [("Z1 - Attic", "Z1-R-001", ATTIC)])
+    assert len(problems) == 1 and "reused" in problems[0] and "does not match" in problems[0]
+    assert updated.ids == {"Z1-R-001": "Z1 - Kitchen"}  # keeps failing until fixed
+    assert updated.fingerprints == base.fingerprints
+
+
+def test_id_taken_from_a_room_that_still_exists_is_reported():
+    base = _registry(**{"Z1-R-001": ("Z1 - Kitchen", KITCHEN), "Z1-R-002": ("Z1 - Attic", ATTIC)})
+    _, problems = reconcile(base, [("Z1 - Kitchen", "Z1-R-002", KITCHEN), ("Z1 - Attic", "Z1-R-001", ATTIC)])
+    assert len(problems) == 2
+    assert all("still exists" in p for p in problems)
+
+
+def test_build_writes_the_registry_only_after_a_clean_compile(atlas):
+    assert atlas_build.main(["--no-shared-cache"]) == 0
+    (shard,) = load_config(atlas.root / "atlas.json").shards
+    written = shard.registry.read_bytes()
+    mtime = shard.registry.stat().st_mtime_ns
+
+    assert atlas_build.main(["--no-shared-cache"]) == 0
+    assert shard.registry.stat().st_mtime_ns == mtime  # unchanged content is not rewritten
+
+    atlas.write_room("Z1 - Attic", room_md("Z1 - Attic", "Z1-R-004", description=ATTIC))
+    (atlas.rooms / "Z1 - Kitchen.md").write_text("# Z1 - Kitchen\n\n## Nonsense\n", encoding="utf-8")
+    assert atlas_build.main(["--no-shared-cache"]) == 1
+    assert shard.registry.read_bytes() == written
+    registry, _ = load_registry(shard.registry, "Z1")
+    assert "Z1-R-004" not in registry.ids
@@ -0,0 +1,75 @@
+"""Incremental static site."""
+
+from __future__ import annotations
+
+import shutil
+
+import pytest
+
+import atlas_site as site
+from atlas_build import load_config
+from atlas_canvas_sync import room_prefixes
+from conftest import room_md
+
+
+@pytest.fixture
+def compiled(atlas):
+    assert atlas.normalize().returncode == 0
+    return atlas
+
+
+def _build(atlas, **kwargs):
+    return site.build_site(atlas.root / "atlas.json", atlas.root / "no.canvas", atlas.root / "site", jobs=1, **kwargs)
+
+
+def test_edit_rerenders_the_room_and_its_neighbours(compiled):
+    first = _build(compiled)
+    assert (first["pages"], first["rendered"], first["index"], first["map"]) == (3, 3, 1, 1)
+    assert _build(compiled)["rendered"] == 0
+
+    compiled.write_room("Z1 - Living Room", room_md("Z1 - Living Room", "Z1-R-002", exits=["E → [[Z1 - Kitchen]]"],
+                                                    description="A different living room."))
+    assert compiled.normalize().returncode == 0
+    assert _build(compiled)["rendered"] == 1  # only the description changed
+
+    compiled.write_room("Z1 - Living Room", room_md("Z1 - Living Room", "Z1-R-002", exits=["N → [[Z1 - Behind House]]"]))
+    assert compiled.normalize().returncode == 0
+    second = _build(compiled)
+    assert second["rendered"] == 3  # the room, the room it no longer reaches, the one it now reaches
+    page = (compiled.root / "site" / "rooms" / "z1-behind-house.html").read_text(encoding="utf-8")
+    assert '<a href="z1-living-room.html">Z1 - Living Room</a> <span class="dir">N</span>' in page
+
+
+def test_deleted_siblings_are_regenerated(compiled):
+    _build(compiled)
+    out = compiled.root / "site"
+    (out / "index.html.gz").unlink()
+    (out / "rooms" / "z1-kitchen.html.gz").unlink()
+
+    stats = _build(compiled)
+    assert (stats["rendered"], stats["index"], stats["map"]) == (1, 1, 0)
+    assert (out / "index.html.gz").exists() and (out / "rooms" / "z1-kitchen.html.gz").exists()
+
+
+def test_removed_rooms_lose_their_pages(compiled):
+    _build(compiled)
+    (compiled.rooms / "Z1 - Behind House.md").unlink()
+    (compiled.normalized / "Z1 - Behind House.json").unlink()
+    assert _build(compiled)["removed"] == 1
+    assert not list((compiled.root / "site" / "rooms").glob("z1-behind-house.*"))
+
+
+def test_map_positions_use_the_loaded_rooms(compiled):
+    config = load_config(compiled.root / "atlas.json")
+    rooms = site.load_site_rooms(config)
+    shutil.rmtree(compiled.normalized)  # nothing left to reload
+
+    positions, pairs = site.map_positions(config, compiled.root, rooms, compiled.root / "no.canvas")
+    assert set(positions) == {"Z1 - Kitchen", "Z1 - Living Room", "Z1 - Behind House"}
+    assert ("Z1 - Kitchen", "Z1 - Living Room") in pairs
+    assert room_prefixes(config, compiled.root) == ("rooms/",)
+
+
+def test_no_compiled_rooms_is_an_error(atlas, capsys):
+    assert site.main(["--out", str(atlas.root / "site"), "--jobs", "1"]) == 1
+    assert "run the normalizer first" in capsys.readouterr().err
@@ -0,0 +1,89 @@
+"""The shared content-addressed compile store."""
+
+from __future__ import annotations
+
+import os
+
+import atlas_store
+from atlas_store import CompileStore, StoreEntry
+from conftest import room_md
+from normalize_rooms_schema_authoritative import compile_rooms, load_schema, schema_sha256
+
+
+def test_key_covers_fingerprint_schema_name_and_bytes(tmp_path):
+    store = CompileStore(tmp_path, "fp")
+    base = store.key("A.md", b"# A\n", "s1")
+    assert store.key("A.md", b"# A\n", "s1") == base
+    assert len({
+        base,
+        store.key("B.md", b"# A\n", "s1"),
+        store.key("A.md", b"# A \n", "s1"),
+        store.key("A.md", b"# A\n", "s2"),
+        CompileStore(tmp_path, "fp2").key("A.md", b"# A\n", "s1"),
+    }) == 5
+
+
+def test_put_get_and_corrupt_entries(tmp_path):
+    store = CompileStore(tmp_path, "fp")
+    key = store.key("A.md", b"# A\n", "s")
+    assert store.get(key) is None
+    store.put(key, StoreEntry(json='{"title": "A"}\n', validation="ok"))
+    assert store.get(key) == StoreEntry(json='{"title": "A"}\n', validation="ok")
+    assert (store.hits, store.misses, store.written) == (1, 1, 1)
+
+    path = store.root / key[:2] / f"{key}.json"
+    path.write_text("{truncated", encoding="utf-8")
+    assert store.get(key) is None
+    assert not path.exists()
+
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    store = CompileStore(tmp_path, "fp")
+    keys = [store.key(f"R{i}.md", b"x", "s") for i in range(10)]
+    for i, key in enumerate(keys):
+        store.put(key, StoreEntry(json="x" * 1000))
+        os.utime(store.root / key[:2] / f"{key}.json", (1000 + i, 1000 + i))
+    store.get(keys[0])  # a hit makes the oldest entry the most recent
+
+    size = sum(s for _, s, _ in store.entries())
+    removed, _ = store.evict(max_bytes=size // 2)
+    assert removed >= 5
+    left = {p.stem for _, _, p in store.entries()}
+    assert keys[0] in left and keys[1] not in left
+    assert sum(s for _, s, _ in store.entries()) <= int(size // 2 * atlas_store.EVICT_TO)
+    assert store.evict(max_bytes=size) == (0, 0)
+
+
+def test_second_tree_compiles_from_the_store(atlas, tmp_path):
+    atlas.write_room("Z1 - Broken", "no heading\n")
+    schema = load_schema(atlas.schema)
+    digest = schema_sha256(atlas.schema)
+
+    first = compile_rooms(atlas.rooms, atlas.normalized, schema=schema, schema_digest=digest,
+                          store=CompileStore(tmp_path / "store", "fp"))
+    assert first.count_shared == 0 and len(first.errors) == 1
+
+    other = tmp_path / "other-normalized"
+    store = CompileStore(tmp_path / "store", "fp")
+    second = compile_rooms(atlas.rooms, other, schema=schema, schema_digest=digest, store=store)
+    assert second.count_shared == 3 and store.misses == 0
+    assert second.errors == first.errors  # parse errors are cached too
+    assert {p.name: p.read_bytes() for p in other.iterdir()} == {
+        p.name: p.read_bytes() for p in atlas.normalized.iterdir()
+    }
+
+    atlas.write_room("Z1 - Kitchen", room_md("Z1 - Kitchen", "Z1-R-001", description="Changed."))
+    third = compile_rooms(atlas.rooms, other, schema=schema, schema_digest=digest,
+                          store=CompileStore(tmp_path / "store", "fp"))
+    assert third.count_shared == 2
+
+
+def test_cli_stats_gc_and_clear(tmp_path, capsys):
+    store = CompileStore(tmp_path, "fp")
+    store.put(store.key("A.md", b"x", "s"), StoreEntry(json="x" * 4096))
+    assert atlas_store.main(["stats", "--dir", str(tmp_path)]) == 0
+    assert ": 1 entry, 4.0 KiB" in capsys.readouterr().out
+    assert atlas_store.main(["gc", "--dir", str(tmp_path), "--max-mb", "0.001"]) == 0
+    assert "Evicted 1 entry" in capsys.readouterr().out
+    assert atlas_store.main(["clear", "--dir", str(tmp_path)]) == 0
+    assert not store.root.exists()
@@ -0,0 +1,126 @@
+"""Bulk transforms over the room model."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+import atlas_transform as transform
+from conftest import room_md
+
+
+def _rules(tmp_path, *specs, name="rules.json"):
+    path = tmp_path / name
+    path.write_text(json.dumps(list(specs)), encoding="utf-8")
+    return path
+
+
+def test_only_changed_sections_are_rerendered(atlas, tmp_path):
+    path = atlas.write_room("Z1 - Cellar", room_md("Z1 - Cellar", "Z1-R-004", state_notes=["light"],
+                                                   objects=["lamp  (brass)"]))
+    rules = _rules(tmp_path, {"op": "map", "section": "State notes", "values": {"LIGHT": "Lit"}, "ignore_case": True})
+
+    result = transform.transform_file((path, atlas.schema, rules))
+    assert "error" not in result
+    assert result["sections"] == ["State notes"]
+    old, new = result["old"].splitlines(), result["new"].splitlines()
+    assert [(a, b) for a, b in zip(old, new) if a != b] == [("- light", "- Lit")]
+    assert len(old) == len(new)
+
+
+def test_unchanged_rooms_are_not_rewritten(atlas, tmp_path):
+    rules = _rules(tmp_path, {"op": "replace", "pattern": "no such text", "replacement": "x"})
+    result = transform.transform_file((atlas.rooms / "Z1 - Kitchen.md", atlas.schema, rules))
+    assert result["new"] is None and "error" not in result
+
+
+def test_replace_on_exit_lines_must_stay_valid(atlas, tmp_path):
+    kitchen = atlas.rooms / "Z1 - Kitchen.md"
+    ok = _rules(tmp_path, {"op": "replace", "section": "Exits (as reported)", "pattern": "Living Room",
+                           "replacement": "Parlour"})
+    result = transform.transform_file((kitchen, atlas.schema, ok))
+    assert "- W → [[Z1 - Parlour]]" in result["new"]
+
+    broken = _rules(tmp_path, {"op": "replace", "section": "Exits (as reported)", "pattern": "→", "replacement": "->"},
+                    name="broken.json")
+    assert "invalid exit line" in transform.transform_file((kitchen, atlas.schema, broken))["error"]
+
+
+def test_fill_only_touches_placeholder_sections(atlas, tmp_path):
+    path = atlas.write_room("Z1 - Troll Room", room_md("Z1 - Troll Room", "Z1-R-004", objects=["Axe"]))
+    rules = _rules(tmp_path, {"op": "fill", "section": ["Objects present", "Hazards/NPCs"], "value": ["(none)"]})
+    result = transform.transform_file((path, atlas.schema, rules))
+    assert result["sections"] == ["Hazards/NPCs"]
+    assert "## Hazards/NPCs\n- (none)\n" in result["new"]
+    assert "## Objects present\n- Axe\n" in result["new"]
+
+
+def test_python_rules(atlas, tmp_path):
+    rules = tmp_path / "rules.py"
+    rules.write_text(
+        "def shout(room):\n"
+        "    return room.replace_section('Description (verbatim)', room.section('Description (verbatim)').upper())\n"
+        "RULES = [shout]\n",
+        encoding="utf-8",
+    )
+    result = transform.transform_file((atlas.rooms / "Z1 - Kitchen.md", atlas.schema, rules))
+    assert "YOU ARE IN THE KITCHEN OF THE WHITE HOUSE." in result["new"]
+
+
+@pytest.mark.parametrize("specs", [[{"op": "frobnicate"}], {"op": "map"}, [{"op": "replace"}]])
+def test_broken_rule_files_exit_2(atlas, tmp_path, specs):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps(specs), encoding="utf-8")
+    assert transform.main([str(path), "--jobs", "1"]) == 2
+
+
+def test_unknown_section_is_an_error(atlas, tmp_path):
+    rules = _rules(tmp_path, {"op": "fill", "section": "Treasure", "value": ["x"]})
+    assert transform.main([str(rules), "--jobs", "1", "--dry-run"]) == 1
+
+
+def test_dry_run_writes_nothing_and_a_run_recompiles(atlas, tmp_path, capsys):
+    assert atlas.normalize().returncode == 0
+    before = {p: p.read_bytes() for p in (*atlas.rooms.glob("*.md"), *atlas.normalized.glob("*.json"))}
+    rules = _rules(tmp_path, {"op": "replace", "section": "Description (verbatim)", "pattern": "white",
+                              "replacement": "red"})
+
+    assert transform.main([str(rules), "--jobs", "1", "--dry-run", "--diff"]) == 0
+    out = capsys.readouterr().out
+    assert "-You are in the kitchen of the white house." in out
+    assert "2 of 3 room(s) change" in out
+    assert {p: p.read_bytes() for p in before} == before
+
+    assert transform.main([str(rules), "--jobs", "1"]) == 0
+    assert "red house" in (atlas.rooms / "Z1 - Kitchen.md").read_text(encoding="utf-8")
+    compiled = json.loads((atlas.normalized / "Z1 - Behind House.json").read_text(encoding="utf-8"))
+    assert "red house" in compiled["sections"]["Description (verbatim)"]
+    assert not list(atlas.rooms.glob(".*.tmp"))
+
+
+def test_a_failing_python_rule_is_reported_and_nothing_is_written(atlas, tmp_path, capsys):
+    rules = tmp_path / "rules.py"
+    rules.write_text(
+        "def keep(room):\n"
+        "    return room\n"
+        "def broken(room):\n"
+        "    return room.nope\n"
+        "RULES = [keep, broken]\n",
+        encoding="utf-8",
+    )
+    result = transform.transform_file((atlas.rooms / "Z1 - Kitchen.md", atlas.schema, rules))
+    assert result["error"] == "rule 2 (broken) failed: AttributeError: 'Room' object has no attribute 'nope'"
+
+    before = {p: p.read_bytes() for p in atlas.rooms.glob("*.md")}
+    assert transform.main([str(rules), "--jobs", "1"]) == 1
+    err = capsys.readouterr().err
+    assert "rule 2 (broken) failed" in err and "Nothing written." in err
+    assert {p: p.read_bytes() for p in atlas.rooms.glob("*.md")} == before
+
+
+def test_a_rule_must_return_a_room(atlas, tmp_path):
+    rules = tmp_path / "none.py"
+    rules.write_text("def forgot(room):\n    room.section('State notes')\nRULES = [forgot]\n", encoding="utf-8")
+    result = transform.transform_file((atlas.rooms / "Z1 - Kitchen.md", atlas.schema, rules))
+    assert result["error"] == "rule 1 (forgot) returned NoneType, not a Room"
@@ -0,0 +1,70 @@
+"""Incremental world canvas sync."""
+
+from __future__ import annotations
+
+import json
+
+import atlas_canvas_sync as sync
+from conftest import room_md
+
+PREFIXES = ("rooms/",)
+
+
+def _node(node_id, f, x, y):
+    return {"id": node_id, "type": "file", "file": f, "x": x, "y": y, "width": 400, "height": 400}
+
+
+def test_duplicates_stale_nodes_and_edges():
+    canvas = {
+        "nodes": [
+            _node("a", "rooms/A.md", 0, 0),
+            _node("a2", "rooms/A.md", 900, 900),
+            _node("gone", "rooms/Gone.md", 500, 0),
+            {"id": "t", "type": "text", "text": "legend", "x": 0, "y": -500},
+        ],
+        "edges": [{"id": "e1", "fromNode": "a2", "toNode": "gone", "label": "E"}],
+    }
+    summary = sync.sync_canvas(canvas, ["rooms/A.md", "rooms/B.md"], {("rooms/A.md", "E", "rooms/B.md")}, PREFIXES)
+
+    assert summary["duplicate nodes removed"] == ["rooms/A.md (a2)"]
+    assert summary["stale nodes removed"] == ["rooms/Gone.md"]
+    assert summary["nodes added"] == ["rooms/B.md"]
+    b = next(n for n in canvas["nodes"] if n.get("file") == "rooms/B.md")
+    assert (b["x"], b["y"]) == (sync.GRID_STEP, 0)  # east of A
+    assert [(e["fromNode"], e["label"], e["toNode"]) for e in canvas["edges"]] == [("a", "E", b["id"])]
+    assert any(n["id"] == "t" for n in canvas["nodes"])  # unmanaged nodes are kept
+
+
+def test_sync_is_idempotent():
+    files = ["rooms/A.md", "rooms/B.md", "rooms/C.md"]
+    edges = {("rooms/A.md", "N", "rooms/B.md"), ("rooms/B.md", "S", "rooms/A.md")}
+    canvas = {"nodes": [_node("a", "rooms/A.md", 0, 0)], "edges": []}
+    sync.sync_canvas(canvas, files, edges, PREFIXES)
+    first = sync.render_canvas(canvas)
+
+    again = json.loads(first)
+    summary = sync.sync_canvas(again, files, edges, PREFIXES)
+    assert not any(summary.values())
+    assert sync.render_canvas(again) == first
+
+
+def test_disconnected_rooms_go_below_the_layout_without_overlap():
+    files = [f"rooms/R{i:04d}.md" for i in range(300)]
+    canvas = {"nodes": [_node("a", files[0], 0, 0)], "edges": []}
+    sync.sync_canvas(canvas, files, set(), PREFIXES)
+
+    added = [n for n in canvas["nodes"] if n["id"] != "a"]
+    assert len(added) == 299
+    assert all(n["y"] >= 400 for n in added)
+    assert len({(n["x"], n["y"]) for n in canvas["nodes"]}) == 300
+
+
+def test_node_paths_follow_nested_room_files(atlas):
+    nested = atlas.rooms / "house"
+    nested.mkdir()
+    (atlas.rooms / "Z1 - Kitchen.md").rename(nested / "Z1 - Kitchen.md")
+    assert atlas.normalize().returncode == 0
+
+    files, edges = sync.load_room_files(atlas.root / "atlas.json")
+    assert "rooms/house/Z1 - Kitchen.md" in files
+    assert ("rooms/house/Z1 - Kitchen.md", "W", "rooms/Z1 - Living Room.md") in edges
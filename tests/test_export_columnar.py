@@ -0,0 +1,57 @@
+"""Columnar export (dictionary-encoded strings, integer room keys)."""
+
+from __future__ import annotations
+
+import pytest
+
+import atlas_export_columnar as export
+from conftest import room_md
+
+
+def _decode(column):
+    return [column.values[c] for c in column.codes]
+
+
+@pytest.fixture
+def compiled(atlas):
+    atlas.write_room(
+        "Z1 - Maze A",
+        room_md("Z1 - Maze A", "Z1-R-004", exits=["N → [[Z1 - Maze B]]"], objects=["Skeleton"], state_notes=["Dark"]),
+    )
+    assert atlas.normalize().returncode == 0
+    return export.load_rooms(atlas.root / "atlas.json")
+
+
+def test_rooms_and_exits_use_integer_keys(compiled):
+    tables = export.build_tables(compiled)
+    rooms, exits = tables["rooms"], tables["exits"]
+    titles = _decode(rooms["title"])
+    assert rooms["room_id"] == list(range(len(titles)))
+
+    by_pair = {
+        (titles[rid], target): target_id
+        for rid, target, target_id in zip(exits["room_id"], _decode(exits["target_title"]), exits["target_room_id"])
+    }
+    assert by_pair[("Z1 - Kitchen", "Z1 - Living Room")] == titles.index("Z1 - Living Room")
+    assert by_pair[("Z1 - Maze A", "Z1 - Maze B")] == -1  # no such room compiled
+    assert sum(rooms["exit_count"]) == len(exits["room_id"])
+
+
+def test_family_lit_and_placeholders(compiled):
+    tables = export.build_tables(compiled)
+    rooms = tables["rooms"]
+    row = _decode(rooms["title"]).index("Z1 - Maze A")
+    assert _decode(rooms["family"])[row] == "Maze"
+    assert rooms["lit"][row] == 0
+    assert _decode(tables["objects"]["object"]) == ["Skeleton"]  # "- ..." placeholders are dropped
+
+
+def test_npz_round_trip(atlas, compiled, tmp_path):
+    np = pytest.importorskip("numpy")
+    out = tmp_path / "columnar"
+    assert export.main(["--config", str(atlas.root / "atlas.json"), "--out", str(out), "--format", "npz"]) == 0
+
+    with np.load(out / "atlas_columnar.npz") as data:
+        titles = data["rooms.title.dictionary"][data["rooms.title"]].tolist()
+        assert sorted(titles) == sorted(obj["title"] for _, obj in compiled)
+        assert data["exits.room_id"].dtype == np.int32
@@ -0,0 +1,68 @@
+"""The rewritten parser regexes stay linear and match their legacy forms."""
+
+from __future__ import annotations
+
+import random
+import re
+
+import pytest
+
+import fuzz_regexes as fuzz
+
+
+@pytest.fixture
+def seeds():
+    return fuzz.room_lines()
+
+
+def test_rewrites_match_legacy_patterns(seeds):
+    assert seeds
+    assert fuzz.differential(random.Random(0), seeds, 2000) == []
+
+
+def test_differential_reports_a_changed_pattern(seeds, monkeypatch):
+    monkeypatch.setitem(fuzz.LEGACY_PATTERNS, "H1_RE", (r"^#\s+(?P<title>.+)$", 0))
+    mismatches = fuzz.differential(random.Random(0), seeds, 0)
+    assert len(mismatches) == 1 and mismatches[0].startswith("H1_RE: ")
+
+
+def test_growth_exponent_fits_the_power_law():
+    sizes = [100, 200, 400, 800]
+    assert fuzz.growth_exponent(sizes, [n * 1e-6 for n in sizes]) == pytest.approx(1.0)
+    assert fuzz.growth_exponent(sizes, [n * n * 1e-9 for n in sizes]) == pytest.approx(2.0)
+
+
+def test_pumped_keeps_prefix_and_suffix():
+    s = fuzz.pumped("## ", " ", "x", 20)
+    assert s.startswith("## ") and s.endswith("x") and len(s) == 20
+    assert fuzz.pumped("abc", "xy", "", 1) == "abcxy"  # always at least one pump
+
+
+# Worst families found by `fuzz_regexes.py --legacy`: a whitespace run before a tail
+# that makes the lazy title/item group give up.
+WORST_LEGACY_FAMILIES = {
+    "H1_RE": ("# a", " ", "!"),
+    "H2_RE": ("## a", " ", "!"),
+    "BULLET_RE": ("- a", " ", "!"),
+    "EXIT_TOKEN_RE": ("N (x)", " ", ""),
+}
+
+
+@pytest.mark.parametrize("name", list(fuzz.LEGACY_PATTERNS))
+def test_rewritten_regex_is_linear_where_the_legacy_one_was_not(name):
+    family = WORST_LEGACY_FAMILIES[name]
+    sizes = [250, 500, 1000, 2000]
+    source, flags = fuzz.LEGACY_PATTERNS[name]
+    legacy = re.compile(source, flags).match
+    new = fuzz.targets()[name]
+    exponent = {
+        label: fuzz.growth_exponent(sizes, [fuzz.time_call(fn, fuzz.pumped(*family, n)) for n in sizes])
+        for label, fn in (("legacy", legacy), ("new", new))
+    }
+    assert exponent["legacy"] > 1.6
+    assert exponent["new"] < 1.5
+
+
+def test_main_passes_on_a_small_run(seeds):
+    assert fuzz.main(["--candidates", "5", "--probe", "200", "--diff-cases", "200", "--only", "H1_RE",
+                      "--max-exponent", "3"]) == 0
@@ -0,0 +1,43 @@
+"""MinHash/LSH near-duplicate detection with cached signatures."""
+
+from __future__ import annotations
+
+import json
+
+import atlas_near_duplicates as nd
+from atlas_build import load_config
+from conftest import room_md
+
+MAZE = "This is part of a maze of twisty little passages, all alike. There is a faint draft from the north."
+
+
+def test_similar_descriptions_cluster():
+    sigs = {
+        "Maze A": nd.minhash(MAZE),
+        "Maze B": nd.minhash(MAZE + " A skeleton lies here."),
+        "Kitchen": nd.minhash("You are in the kitchen of the white house. A table seems to have been used recently."),
+    }
+    clusters = nd.near_duplicate_clusters(sigs, 0.6)
+    assert [sorted({t for a, b, _ in edges for t in (a, b)}) for edges in clusters] == [["Maze A", "Maze B"]]
+    assert nd.estimated_jaccard(sigs["Maze A"], sigs["Maze A"]) == 1.0
+
+
+def test_only_changed_descriptions_are_rehashed(atlas):
+    for name, iid in (("Z1 - Maze A", "Z1-R-010"), ("Z1 - Maze B", "Z1-R-011")):
+        atlas.write_room(name, room_md(name, iid, exits=["N → [[Z1 - Maze A]]"], description=MAZE))
+    assert atlas.normalize().returncode == 0
+    (shard,) = load_config(atlas.root / "atlas.json").shards
+
+    lines, indistinguishable = nd.shard_report(shard)
+    assert lines[0] == "Z1: 5 room(s), 5 signature(s) computed, 0 cached"
+    assert indistinguishable == 1  # same description and same exit directions
+
+    path = atlas.rooms / "Z1 - Kitchen.md"
+    path.write_text(path.read_text(encoding="utf-8").replace("kitchen", "scullery"), encoding="utf-8")
+    assert atlas.normalize().returncode == 0
+    lines, _ = nd.shard_report(shard)
+    assert lines[0] == "Z1: 5 room(s), 1 signature(s) computed, 4 cached"
+
+    cache = json.loads((shard.cache_dir / nd.CACHE_NAME).read_text(encoding="utf-8"))
+    assert cache["params"] == nd.PARAMS
+    assert sorted(cache["rooms"]) == sorted(p.stem for p in atlas.rooms.glob("*.md"))
@@ -0,0 +1,71 @@
+"""The stat-only no-op stamp and the cheap --help path of the normalizer CLI."""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+
+import normalize_rooms_schema_authoritative as nra
+from conftest import SCRIPTS
+
+
+def _stamp(atlas):
+    return nra.input_stamp(str(atlas.schema), str(atlas.rooms), str(atlas.normalized), "**/*.md")
+
+
+def test_second_run_takes_the_fast_path(atlas):
+    first = atlas.normalize()
+    assert first.returncode == 0, first.stderr
+    assert "Normalization successful. OK: 3 / 3" in first.stdout
+
+    second = atlas.normalize()
+    assert second.returncode == 0
+    assert "skipped: inputs unchanged" in second.stdout
+
+
+def test_editing_a_room_invalidates_the_stamp(atlas):
+    assert atlas.normalize().returncode == 0
+    path = atlas.rooms / "Z1 - Kitchen.md"
+    path.write_text(path.read_text(encoding="utf-8").replace("kitchen", "big kitchen"), encoding="utf-8")
+
+    rerun = atlas.normalize()
+    assert "Normalization successful" in rerun.stdout
+
+
+def test_stamp_covers_the_compiler_code(atlas):
+    before = _stamp(atlas)
+    for code_file in nra._CODE_FILES:
+        assert code_file in before
+    model = SCRIPTS / "atlas_model.py"
+    st = os.stat(model)
+    try:
+        os.utime(model, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        assert _stamp(atlas) != before
+    finally:
+        os.utime(model, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+
+def test_stamp_covers_the_normalizer_version(atlas, monkeypatch):
+    before = _stamp(atlas)
+    monkeypatch.setattr(nra, "NORMALIZER_VERSION", nra.NORMALIZER_VERSION + ".1")
+    assert _stamp(atlas) != before
+
+
+def test_failed_run_writes_no_stamp(atlas):
+    atlas.write_room("Z1 - Broken", "# Z1 - Broken\n\n## Nonsense\n- x\n")
+    result = atlas.normalize()
+    assert result.returncode == 1
+    assert not (atlas.cache / nra.STAMP_NAME).exists()
+
+
+def test_help_does_not_import_the_compiler():
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", str(SCRIPTS / "normalize_rooms_schema_authoritative.py"), "--help"],
+        capture_output=True,
+        text=True,
+    )
+    assert proc.returncode == 0
+    assert "--cache-dir" in proc.stdout
+    imported = {line.rsplit("|", 1)[-1].strip() for line in proc.stderr.splitlines() if line.startswith("import time:")}
+    assert not imported & {"json", "dataclasses", "pathlib", "atlas_model"}
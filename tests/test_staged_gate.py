@@ -0,0 +1,113 @@
+"""The compile gate checks staged rooms through the git index."""
+
+from __future__ import annotations
+
+import subprocess
+
+import atlas_engine
+from atlas_git import CatFileBatch, parse_name_status_z, staged_changes
+from conftest import room_md
+
+
+def _committed(atlas):
+    assert atlas.normalize().returncode == 0
+    atlas.init_git()
+
+
+def test_name_status_parsing():
+    data = b"M\0rooms/A.md\0R087\0rooms/B.md\0rooms/C.md\0D\0normalized/D.json\0"
+    changes = parse_name_status_z(data)
+    assert [(c.status, c.path, c.old_path) for c in changes] == [
+        ("M", "rooms/A.md", None),
+        ("R", "rooms/C.md", "rooms/B.md"),
+        ("D", "normalized/D.json", None),
+    ]
+
+
+def test_cat_file_batch_handles_specs_with_spaces(atlas):
+    _committed(atlas)
+    with CatFileBatch() as cat:
+        assert cat.read(":rooms/Z1 - Kitchen.md").startswith(b"# Z1 - Kitchen")
+        assert cat.read(":dir/A B.json") is None
+        assert cat.read("HEAD:normalized/No Such Room.json") is None
+        assert cat.read(":rooms/Z1 - Living Room.md").startswith(b"# Z1 - Living Room")
+
+
+def test_staged_room_needs_its_staged_json(atlas):
+    _committed(atlas)
+    atlas.write_room("Z1 - Cellar", room_md("Z1 - Cellar", "Z1-R-004", exits=["U → [[Z1 - Living Room]]"]))
+    atlas.git("add", "rooms")
+    assert atlas_engine.main(["--staged", "--no-daemon"]) == 1
+
+    assert atlas.normalize().returncode == 0
+    atlas.git("add", "normalized")
+    assert atlas_engine.main(["--staged", "--no-daemon"]) == 0
+
+
+def test_stale_staged_json_fails(atlas):
+    _committed(atlas)
+    path = atlas.rooms / "Z1 - Kitchen.md"
+    path.write_text(path.read_text(encoding="utf-8").replace("kitchen", "scullery"), encoding="utf-8")
+    atlas.git("add", "rooms")  # JSON not recompiled
+    assert atlas_engine.main(["--staged", "--no-daemon"]) == 1
+
+
+def test_deleted_room_must_take_its_json_along(atlas):
+    _committed(atlas)
+    atlas.git("rm", "-q", "--cached", "rooms/Z1 - Behind House.md")
+    assert atlas_engine.main(["--staged", "--no-daemon"]) == 1
+
+    atlas.git("rm", "-q", "--cached", "normalized/Z1 - Behind House.json")
+    assert atlas_engine.main(["--staged", "--no-daemon"]) == 0
+
+
+def test_renamed_room(atlas):
+    _committed(atlas)
+    old, new = "Z1 - Behind House", "Z1 - Back of House"
+    atlas.git("mv", f"rooms/{old}.md", f"rooms/{new}.md")
+    atlas.write_room(new, room_md(new, "Z1-R-003", exits=["W → [[Z1 - Kitchen]]"],
+                                  description="You are behind the white house. A path leads into the forest to the east."))
+    atlas.git("add", "rooms")
+    assert any(c.status == "R" for c in staged_changes(["rooms"]))
+    assert atlas_engine.main(["--staged", "--no-daemon"]) == 1  # old JSON still staged, new one missing
+
+    (atlas.normalized / f"{old}.json").unlink()
+    assert atlas.normalize().returncode == 0
+    atlas.git("add", "-A", "normalized")
+    assert atlas_engine.main(["--staged", "--no-daemon"]) == 0
+
+
+def test_staged_check_from_another_directory(atlas, monkeypatch):
+    _committed(atlas)
+    monkeypatch.chdir(atlas.rooms)
+    config = str(atlas.root / "atlas.json")
+    atlas.write_room("Z1 - Cellar", room_md("Z1 - Cellar", "Z1-R-004", exits=["U → [[Z1 - Living Room]]"]))
+    atlas.git("add", "rooms")
+    assert atlas_engine.main(["--config", config, "--staged", "--no-daemon"]) == 1
+
+    assert atlas.normalize().returncode == 0
+    atlas.git("add", "normalized")
+    assert atlas_engine.main(["--config", config, "--staged", "--no-daemon"]) == 0
+
+
+def test_atlas_in_a_subdirectory_of_the_repository(atlas):
+    assert atlas.normalize().returncode == 0
+    top = atlas.root.parent  # the atlas is "atlas/" inside this repository
+
+    def git(*args):
+        subprocess.run(["git", *args], cwd=top, check=True, capture_output=True)
+
+    git("init", "-q")
+    git("config", "user.email", "atlas@example.invalid")
+    git("config", "user.name", "atlas")
+    git("add", "-A")
+    git("commit", "-q", "-m", "baseline")
+
+    path = atlas.rooms / "Z1 - Kitchen.md"
+    path.write_text(path.read_text(encoding="utf-8").replace("kitchen", "scullery"), encoding="utf-8")
+    git("add", "-A")
+    assert atlas_engine.main(["--staged", "--no-daemon"]) == 1  # JSON not recompiled
+
+    assert atlas.normalize().returncode == 0
+    git("add", "-A")
+    assert atlas_engine.main(["--staged", "--no-daemon"]) == 0